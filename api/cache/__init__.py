@@ -0,0 +1,6 @@
+"""Generation-versioned caches and their invalidation helpers."""
+from api.cache.fragments import FragmentCache, product_cards
+from api.cache.generations import bump_generation, get_generation
+from api.cache.results import ResultCache
+
+__all__ = ["bump_generation", "get_generation", "ResultCache", "FragmentCache", "product_cards"]
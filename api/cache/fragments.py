@@ -0,0 +1,66 @@
+"""Rendered HTML fragment caches keyed by (row id, row version).
+
+The version is whatever the renderer derives from the row it was given
+(e.g. a tuple of the rendered fields), so a fragment is only reused for
+identical input even if another worker changed the row. Repository writes
+evict the row's entry so edits don't leave dead fragments around.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class FragmentCache:
+    """Bounded LRU of rendered fragments with hit/miss counters."""
+
+    def __init__(self, name: str, max_entries: int = 4096):
+        self.name = name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, id: Hashable, version: Hashable) -> Optional[str]:
+        """Fragment rendered for this id and version, or None."""
+        with self._lock:
+            entry = self._data.get(id)
+            if entry is not None and entry[0] == version:
+                self._data.move_to_end(id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, id: Hashable, version: Hashable, fragment: str) -> None:
+        """Store the fragment for id, replacing any other version."""
+        with self._lock:
+            self._data[id] = (version, fragment)
+            self._data.move_to_end(id)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def evict(self, id: Hashable) -> None:
+        """Drop the fragment of a written or deleted row."""
+        with self._lock:
+            if self._data.pop(id, None) is not None:
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters since process start."""
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Product cards on the SSR home page (HomeViews._render_products).
+product_cards = FragmentCache("product_cards")
@@ -0,0 +1,38 @@
+"""Per-table generation counters.
+
+Repository write methods bump the counter of the table they touch; caches
+store the generation their entry was computed under and treat any other
+value as stale, so invalidation never relies on TTLs.
+"""
+import threading
+from typing import Callable, Dict, List
+
+_lock = threading.Lock()
+_generations: Dict[str, int] = {}
+_listeners: List[Callable[[str], None]] = []
+
+
+def get_generation(table: str) -> int:
+    """Current generation of a table (0 until first write in this process)."""
+    return _generations.get(table, 0)
+
+
+def bump_generation(table: str, propagate: bool = True) -> int:
+    """Mark a table as written. Returns the new generation.
+
+    `propagate=False` skips the listeners, for bumps that mirror a write
+    another process has already propagated (see api.cache.invalidation).
+    """
+    with _lock:
+        value = _generations.get(table, 0) + 1
+        _generations[table] = value
+    if propagate:
+        for listener in list(_listeners):
+            listener(table)
+    return value
+
+
+def on_bump(listener: Callable[[str], None]) -> None:
+    """Call `listener(table)` after every bump (e.g. to propagate to shared caches)."""
+    if listener not in _listeners:
+        _listeners.append(listener)
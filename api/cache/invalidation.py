@@ -0,0 +1,315 @@
+"""Cross-process cache invalidation bus.
+
+Process-local caches only see the writes made by their own process. A row
+trigger on each watched table (migrations 0009, 0011 and 0012) reports every
+write, with the table, the row id and the writer token, in two ways:
+
+- ``NOTIFY cache_invalidation`` (delivered on commit)
+- a row in cache_events tagged with the writing transaction's id, kept for
+  an hour
+
+Each worker dispatches these events to the invalidators registered here,
+after bumping the table's generation locally. The bump is propagated (to the
+shared result cache, see api.cache.results) only for untagged writes: a
+repository in another process has already propagated its own.
+Repositories write inside ``InvalidationBus.writes()``, which tags the
+transaction with this process's token (``app.cache_writer``, transaction
+local, so it holds behind PgBouncer too); the events of those writes are
+skipped here, as the repository has already patched this process's caches.
+Untagged writes (scripts, ``psql``) are dispatched by every process.
+
+- ``poll`` (CACHE_INVALIDATION, default) – at most every
+  CACHE_INVALIDATION_POLL_INTERVAL seconds a request reads the cache_events
+  committed since its last check; needs no persistent connection
+  (serverless, pooled setups).
+- ``listen`` – for long-running workers: a daemon thread per worker holds a
+  dedicated connection with LISTEN, started on the first request. While it
+  is disconnected, requests fall back to polling.
+- ``off`` – no cross-process invalidation.
+"""
+import json
+import logging
+import os
+import secrets
+import select
+import socket
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from django.conf import settings
+from django.db import connection, transaction
+from api.cache.generations import bump_generation
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+# Oldest transaction still running: events of older ones are all visible
+_XMIN_SQL = "SELECT txid_snapshot_xmin(txid_current_snapshot())"
+_EVENTS_SQL = "SELECT id, table_name, row_id, writer, txid FROM cache_events WHERE txid >= %s ORDER BY id"
+_PRUNE_SQL = "DELETE FROM cache_events WHERE created_at < now() - %s * interval '1 second'"
+# Read by the triggers; local to the transaction
+_WRITER_SQL = "SELECT set_config('app.cache_writer', %s, true)"
+# Seconds cache_events are kept; a worker that has not read them for longer
+# invalidates every table
+_EVENT_RETENTION = 3600
+_PRUNE_INTERVAL = 600
+# Row events for one table in a batch above which the whole table is invalidated
+_MAX_ROW_EVENTS = 100
+
+# Watched table -> generation counter of the caches built from it
+TABLE_GENERATIONS = {
+    "products": "products",
+    "news": "news",
+    "pages": "pages",
+    "hero": "site",
+    "site_config": "site",
+    "categories": "site",
+    "category_brochures": "site",
+}
+
+# callback(table, id or None for "any row")
+Invalidator = Callable[[str, Optional[str]], None]
+# (table, row id, writer token or None)
+Event = Tuple[str, Optional[str], Optional[str]]
+
+
+class InvalidationBus:
+    """Per-process dispatcher of database write events."""
+
+    _lock = threading.Lock()
+    _invalidators: Dict[str, List[Invalidator]] = {}
+    _thread: Optional[threading.Thread] = None
+    _pid: Optional[int] = None
+    _listening = False
+    _last_poll = 0.0
+
+    # (os pid, token) of this process's writes
+    _writer: Optional[Tuple[int, str]] = None
+
+    # cache_events read position: events of transactions from _xmin on may
+    # still commit; _recent holds the ones among them already handled
+    _poll_lock = threading.Lock()
+    _xmin: Optional[int] = None
+    _recent: Set[int] = set()
+    _checked_at = 0.0
+    _pruned_at = 0.0
+
+    @staticmethod
+    def mode() -> str:
+        return getattr(settings, 'CACHE_INVALIDATION', 'poll')
+
+    @staticmethod
+    def register(tables: Sequence[str], invalidator: Invalidator) -> None:
+        """Call `invalidator(table, id)` when another process writes one of `tables`."""
+        with InvalidationBus._lock:
+            for table in tables:
+                InvalidationBus._invalidators.setdefault(table, []).append(invalidator)
+
+    @staticmethod
+    def dispatch(table: str, ident: Optional[str], propagate: bool = False) -> None:
+        """Invalidate everything cached from a row (or, with ident None, a whole table).
+
+        `propagate` also bumps the shared generations, for writes made
+        outside a repository.
+        """
+        generation = TABLE_GENERATIONS.get(table)
+        if generation is None:
+            return
+        bump_generation(generation, propagate=propagate)
+        for invalidator in list(InvalidationBus._invalidators.get(table, ())):
+            try:
+                invalidator(table, ident)
+            except Exception as e:
+                logger.warning(f"Cache invalidator failed for {table}/{ident}: {e}")
+
+    @staticmethod
+    def on_request() -> None:
+        """Per-request hook (CacheInvalidationMiddleware)."""
+        mode = InvalidationBus.mode()
+        if mode == 'listen':
+            InvalidationBus._ensure_listener()
+            if not InvalidationBus._listening:
+                InvalidationBus.poll()
+        elif mode == 'poll':
+            InvalidationBus.poll()
+
+    # Own writes
+
+    @staticmethod
+    def writer() -> str:
+        """Token tagging this process's writes (a forked worker gets its own)."""
+        pid = os.getpid()
+        writer = InvalidationBus._writer
+        if writer is None or writer[0] != pid:
+            writer = (pid, f"{socket.gethostname()}:{pid}:{secrets.token_hex(4)}")
+            InvalidationBus._writer = writer
+        return writer[1]
+
+    @staticmethod
+    @contextmanager
+    def writes() -> Iterator[None]:
+        """Transaction whose writes are reported as this process's (skipped by its own bus)."""
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(_WRITER_SQL, [InvalidationBus.writer()])
+            yield
+
+    @staticmethod
+    def _is_own(writer: Optional[str]) -> bool:
+        """Whether an event was written inside writes() by this process."""
+        return writer is not None and writer == InvalidationBus.writer()
+
+    @staticmethod
+    def _dispatch_events(events: Iterable[Event]) -> None:
+        """Dispatch other processes' events, one table-wide invalidation per table past _MAX_ROW_EVENTS."""
+        by_table: Dict[str, List[Optional[str]]] = defaultdict(list)
+        untagged: Set[str] = set()
+        for table, ident, writer in events:
+            if writer is None:
+                untagged.add(table)
+            if not InvalidationBus._is_own(writer):
+                by_table[table].append(ident)
+        for table, idents in by_table.items():
+            idents = list(dict.fromkeys(idents))
+            if None in idents or len(idents) > _MAX_ROW_EVENTS:
+                idents = [None]
+            for i, ident in enumerate(idents):
+                # One shared bump per table and batch
+                InvalidationBus.dispatch(table, ident, propagate=i == 0 and table in untagged)
+
+    # Polling
+
+    @staticmethod
+    def _read_events(cursor, dispatch: bool) -> None:
+        """Handle the cache_events committed since the last read (caller holds _poll_lock).
+
+        The first read only records the position. With `dispatch` False the
+        position just moves on (the listener has had them through NOTIFY).
+        """
+        cursor.execute(_XMIN_SQL)
+        xmin = cursor.fetchone()[0]
+        now = time.monotonic()
+        previous = InvalidationBus._xmin
+        if previous is None or now - InvalidationBus._checked_at > _EVENT_RETENTION:
+            InvalidationBus._xmin, InvalidationBus._recent, InvalidationBus._checked_at = xmin, set(), now
+            if previous is not None and dispatch:
+                # Events may have been pruned since the last read
+                for table in TABLE_GENERATIONS:
+                    InvalidationBus.dispatch(table, None)
+            return
+        cursor.execute(_EVENTS_SQL, [previous])
+        rows = cursor.fetchall()
+        events = [(table, ident, writer) for id, table, ident, writer, _ in rows if id not in InvalidationBus._recent]
+        InvalidationBus._xmin = xmin
+        InvalidationBus._recent = {id for id, *_, txid in rows if txid >= xmin}
+        InvalidationBus._checked_at = now
+        if dispatch:
+            InvalidationBus._dispatch_events(events)
+
+    @staticmethod
+    def _prune(cursor) -> None:
+        """Delete expired cache_events (at most every _PRUNE_INTERVAL seconds per process)."""
+        now = time.monotonic()
+        if now - InvalidationBus._pruned_at < _PRUNE_INTERVAL:
+            return
+        InvalidationBus._pruned_at = now
+        cursor.execute(_PRUNE_SQL, [_EVENT_RETENTION])
+
+    @staticmethod
+    def poll(force: bool = False) -> None:
+        """Read new cache_events, at most once per CACHE_INVALIDATION_POLL_INTERVAL."""
+        now = time.monotonic()
+        interval = getattr(settings, 'CACHE_INVALIDATION_POLL_INTERVAL', 5)
+        with InvalidationBus._lock:
+            if not force and now - InvalidationBus._last_poll < interval:
+                return
+            InvalidationBus._last_poll = now
+        # Another thread is already reading them
+        if not InvalidationBus._poll_lock.acquire(blocking=False):
+            return
+        try:
+            with connection.cursor() as cursor:
+                InvalidationBus._read_events(cursor, dispatch=True)
+                InvalidationBus._prune(cursor)
+        except Exception as e:
+            logger.warning(f"Cache invalidation poll failed: {e}")
+        finally:
+            InvalidationBus._poll_lock.release()
+
+    # LISTEN
+
+    @staticmethod
+    def _ensure_listener() -> None:
+        pid = os.getpid()
+        thread = InvalidationBus._thread
+        if thread is not None and thread.is_alive() and InvalidationBus._pid == pid:
+            return
+        with InvalidationBus._lock:
+            thread = InvalidationBus._thread
+            # A forked worker inherits the attributes but not the thread
+            if thread is None or not thread.is_alive() or InvalidationBus._pid != pid:
+                InvalidationBus._pid = pid
+                InvalidationBus._listening = False
+                InvalidationBus._thread = threading.Thread(
+                    target=InvalidationBus._listen_forever, name="cache-invalidation", daemon=True
+                )
+                InvalidationBus._thread.start()
+
+    @staticmethod
+    def _connect():
+        """Dedicated autocommit connection with the default database's parameters."""
+        from django.db import connections
+        wrapper = connections['default']
+        conn = wrapper.Database.connect(**wrapper.get_connection_params())
+        conn.autocommit = True
+        return conn
+
+    @staticmethod
+    def _listen_forever() -> None:
+        failures = 0
+        while True:
+            conn = None
+            try:
+                conn = InvalidationBus._connect()
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                    # Catch up on writes missed while disconnected
+                    with InvalidationBus._poll_lock:
+                        InvalidationBus._read_events(cursor, dispatch=True)
+                InvalidationBus._listening = True
+                failures = 0
+                while True:
+                    if select.select([conn], [], [], 60)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            InvalidationBus._receive(conn.notifies.pop(0).payload)
+                    else:
+                        # Idle: check the connection, keep the catch-up position recent
+                        with conn.cursor() as cursor, InvalidationBus._poll_lock:
+                            InvalidationBus._read_events(cursor, dispatch=False)
+                            InvalidationBus._prune(cursor)
+            except Exception as e:
+                failures += 1
+                logger.warning(f"Cache invalidation listener disconnected ({e}); polling until it reconnects")
+            finally:
+                InvalidationBus._listening = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            time.sleep(min(60, 2 ** min(failures, 6)))
+
+    @staticmethod
+    def _receive(payload: str) -> None:
+        try:
+            event = json.loads(payload)
+            table, ident, writer = event["table"], event.get("id"), event.get("writer")
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed cache invalidation payload: {payload!r}")
+            return
+        if InvalidationBus._is_own(writer):
+            return
+        InvalidationBus.dispatch(table, None if ident is None else str(ident), propagate=writer is None)
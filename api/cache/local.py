@@ -0,0 +1,54 @@
+"""Bounded in-process cache tied to table generations."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from api.cache.generations import get_generation
+
+
+class GenerationCache:
+    """LRU cache whose entries go stale when the table's generation changes.
+
+    `ttl` (seconds) additionally bounds how long an entry can miss a write
+    made by another process that this one has not heard about.
+    """
+
+    def __init__(self, table: str, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def generation(self) -> int:
+        """Current generation; capture it before computing a value to store."""
+        return get_generation(self.table)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value for key, or None if missing or stale."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            generation, stored_at, value = entry
+            expired = self.ttl is not None and time.monotonic() - stored_at >= self.ttl
+            if expired or generation != get_generation(self.table):
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """Store value computed under `generation` (default: current)."""
+        if generation is None:
+            generation = get_generation(self.table)
+        with self._lock:
+            self._data[key] = (generation, time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,155 @@
+"""Full-page cache for server-rendered detail pages.
+
+Entries hold the final response body plus validators (a strong ETag from the
+body hash and the row's updated_at as Last-Modified), keyed by (route, id or
+slug, scheme://host/path): query strings (utm_*, fbclid) share one entry. Repository writes purge the edited item; routes whose output
+also depends on other rows (news detail lists related articles) are tied to
+their table generation as well. Other workers' edits arrive through the
+invalidation bus (api.cache.invalidation); PAGE_CACHE_TTL still bounds how
+long one can go unnoticed if the bus is off (0 disables the cache).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Hashable, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from django.conf import settings
+from api.cache.generations import get_generation
+from api.cache.invalidation import InvalidationBus
+
+# Table generation each route's output depends on beyond its own row.
+_ROUTE_TABLES = {
+    "news": "news",
+}
+
+
+class CachedPage(NamedTuple):
+    body: bytes
+    content_type: str
+    etag: str
+    last_modified: int
+    stored_at: float
+    generation: int
+
+
+class PageCache:
+    """Process-local LRU of rendered detail pages."""
+
+    _lock = threading.Lock()
+    _data: "OrderedDict[tuple, CachedPage]" = OrderedDict()
+    # scheme://host of URLs served so far, so pages can be re-rendered for them
+    _origins: Set[str] = set()
+
+    @staticmethod
+    def _ttl() -> int:
+        return getattr(settings, 'PAGE_CACHE_TTL', 300)
+
+    @staticmethod
+    def generation(route: str) -> int:
+        """Dependency generation of a route; capture it before fetching the row."""
+        table = _ROUTE_TABLES.get(route)
+        return get_generation(table) if table else 0
+
+    @staticmethod
+    def _key(route: str, ident: Hashable, url: str) -> tuple:
+        parts = urlsplit(url)
+        return (route, ident, f"{parts.scheme}://{parts.netloc}{parts.path}")
+
+    @staticmethod
+    def get(route: str, ident: Hashable, url: str) -> Optional[CachedPage]:
+        """Cached page, or None if missing, expired or its dependencies changed."""
+        ttl = PageCache._ttl()
+        if ttl <= 0:
+            return None
+        key = PageCache._key(route, ident, url)
+        with PageCache._lock:
+            entry = PageCache._data.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.stored_at >= ttl or entry.generation != PageCache.generation(route):
+                del PageCache._data[key]
+                return None
+            PageCache._data.move_to_end(key)
+            return entry
+
+    @staticmethod
+    def set(
+        route: str,
+        ident: Hashable,
+        url: str,
+        html: str,
+        content_type: str,
+        generation: int,
+        updated_at: Optional[str] = None,
+    ) -> CachedPage:
+        """Store a rendered page (when enabled) and return it with its validators.
+
+        `updated_at` (ISO, the row's) becomes Last-Modified, the same in every
+        worker; the render time is used when it is unknown.
+        """
+        body = html.encode('utf-8')
+        try:
+            last_modified = int(datetime.fromisoformat(updated_at).timestamp())
+        except (TypeError, ValueError):
+            last_modified = int(time.time())
+        entry = CachedPage(
+            body=body,
+            content_type=content_type,
+            etag='"' + hashlib.sha1(body).hexdigest() + '"',
+            last_modified=last_modified,
+            stored_at=time.monotonic(),
+            generation=generation,
+        )
+        if PageCache._ttl() > 0:
+            max_entries = getattr(settings, 'PAGE_CACHE_MAX_ENTRIES', 1000)
+            parts = urlsplit(url)
+            key = PageCache._key(route, ident, url)
+            with PageCache._lock:
+                if len(PageCache._origins) < 8:
+                    PageCache._origins.add(f"{parts.scheme}://{parts.netloc}")
+                PageCache._data[key] = entry
+                PageCache._data.move_to_end(key)
+                while len(PageCache._data) > max_entries:
+                    PageCache._data.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def origins() -> List[str]:
+        """scheme://host prefixes pages have been cached under."""
+        with PageCache._lock:
+            return sorted(PageCache._origins)
+
+    @staticmethod
+    def items() -> List[Tuple[str, Hashable]]:
+        """Distinct (route, ident) pairs currently cached."""
+        with PageCache._lock:
+            return list(dict.fromkeys((route, ident) for route, ident, _ in PageCache._data))
+
+    @staticmethod
+    def purge(route: str, ident: Optional[Hashable]) -> None:
+        """Drop every cached URL of one item (after an admin edit or delete); ident None: the whole route."""
+        with PageCache._lock:
+            for key in [k for k in PageCache._data if k[0] == route and (ident is None or k[1] == ident)]:
+                del PageCache._data[key]
+
+    @staticmethod
+    def clear() -> None:
+        with PageCache._lock:
+            PageCache._data.clear()
+
+
+# Table written by another process -> detail route it feeds
+_TABLE_ROUTES = {"products": "product", "news": "news", "pages": "page"}
+
+
+def _invalidate(table: str, ident: Optional[str]) -> None:
+    if table == "pages" or ident is None or not ident.isdigit():
+        # Page rows are cached by slug, events carry the id
+        PageCache.purge(_TABLE_ROUTES[table], None)
+    else:
+        PageCache.purge(_TABLE_ROUTES[table], int(ident))
+
+
+InvalidationBus.register(tuple(_TABLE_ROUTES), _invalidate)
@@ -0,0 +1,184 @@
+"""Versioned cache for serialized service results.
+
+Entries are keyed by (namespace, table generation, normalized arguments), so
+a repository write makes every older entry unreachable and no TTL is needed.
+Two backends are available via RESULT_CACHE_BACKEND:
+
+- ``local``  – bounded LRU per process, generations from api.cache.generations
+- ``django`` – Django's cache framework (RESULT_CACHE_ALIAS); generations are
+  stored in the same cache so every worker sees every bump. The alias must
+  be a shared cache (Redis, Memcached, database): with a per-process one
+  (LocMem, the default when CACHES is unset) ``local`` is used instead
+- ``off``    – always compute
+
+Cached values are shared between requests and must not be mutated by callers.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from django.conf import settings
+
+from api.cache.generations import get_generation, on_bump
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LocalResultBackend:
+    """Size-bounded LRU in this process."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+
+    def generation(self, table: str) -> int:
+        return get_generation(table)
+
+    def bump(self, table: str) -> None:
+        """Nothing to do: the process-local counter is already bumped."""
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is not _MISSING:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class DjangoResultBackend:
+    """Django cache framework backend shared by all workers."""
+
+    def __init__(self, alias: str = "default"):
+        from django.core.cache import caches
+        self.cache = caches[alias]
+
+    @staticmethod
+    def is_shared(alias: str) -> bool:
+        """Whether a cache alias is visible to other processes (not LocMem/Dummy)."""
+        from django.core.cache import caches
+        from django.core.cache.backends.dummy import DummyCache
+        from django.core.cache.backends.locmem import LocMemCache
+        return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+    def _generation_key(self, table: str) -> str:
+        return f"results:gen:{table}"
+
+    def generation(self, table: str) -> int:
+        key = self._generation_key(table)
+        value = self.cache.get(key)
+        if value is None:
+            # Seed from the clock: if the counter was evicted, a restart at 0
+            # could revive entries cached under an old generation.
+            self.cache.add(key, time.time_ns(), timeout=None)
+            value = self.cache.get(key, 0)
+        return value
+
+    def bump(self, table: str) -> None:
+        key = self._generation_key(table)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, time.time_ns(), timeout=None)
+
+    def get(self, key: str) -> Any:
+        return self.cache.get(key, _MISSING)
+
+    def set(self, key: str, value: Any) -> None:
+        self.cache.set(key, value, timeout=None)
+
+    def clear(self) -> None:
+        """Entries are unreachable after a bump; nothing to clear eagerly."""
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Configured result backend (None when caching is off)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                kind = getattr(settings, "RESULT_CACHE_BACKEND", "local")
+                alias = getattr(settings, "RESULT_CACHE_ALIAS", "default")
+                if kind == "django" and not DjangoResultBackend.is_shared(alias):
+                    # Other workers would never see a bump of a per-process cache
+                    logger.warning(
+                        f"RESULT_CACHE_BACKEND=django needs a shared cache, CACHES['{alias}'] is per-process; "
+                        "using the local backend"
+                    )
+                    kind = "local"
+                if kind == "django":
+                    _backend = DjangoResultBackend(alias)
+                elif kind == "off":
+                    _backend = False
+                else:
+                    _backend = LocalResultBackend(getattr(settings, "RESULT_CACHE_MAX_ENTRIES", 2048))
+    return _backend or None
+
+
+def _propagate_bump(table: str) -> None:
+    backend = get_backend()
+    if backend is None:
+        return
+    try:
+        backend.bump(table)
+    except Exception as e:
+        logger.warning(f"Result cache bump failed for {table}: {e}")
+
+
+on_bump(_propagate_bump)
+
+class ResultCache:
+    """Cache of one service method's results, invalidated by a table generation."""
+
+    def __init__(self, namespace: str, table: str):
+        self.namespace = namespace
+        self.table = table
+
+    def _key(self, generation: int, key: Hashable) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return f"results:{self.namespace}:{generation}:{digest}"
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached result for `key`, computing and storing it on a miss.
+
+        Backend failures fall through to `compute` so a cache outage never
+        breaks a page.
+        """
+        backend = get_backend()
+        if backend is None:
+            return compute()
+        try:
+            # Captured before computing so a concurrent write is never hidden.
+            cache_key = self._key(backend.generation(self.table), key)
+            value = backend.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Result cache read failed for {self.namespace}: {e}")
+            return compute()
+        if value is not _MISSING:
+            return value
+        value = compute()
+        try:
+            backend.set(cache_key, value)
+        except Exception as e:
+            logger.warning(f"Result cache write failed for {self.namespace}: {e}")
+        return value
@@ -0,0 +1,15 @@
+"""Recompute derived news content columns (content_html, excerpt, reading time, ...)."""
+from django.core.management.base import BaseCommand
+from api.repositories.news_repository import NewsRepository
+
+
+class Command(BaseCommand):
+    help = "Recompute stored derived content fields for news (all, or only --id ones)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--id', type=int, action='append', dest='ids', help='News id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        count = NewsRepository.backfill_derived(ids=options.get('ids'), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {count} news item(s)."))
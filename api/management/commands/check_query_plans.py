@@ -0,0 +1,88 @@
+"""EXPLAIN the repository read queries and fail on sequential scans of large tables."""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.repositories.news_repository import NewsRepository
+from api.repositories.product_count import ProductCount
+from api.repositories.product_repository import ProductRepository
+
+
+def _seq_scans(plan: dict):
+    """Yield relation names of every Seq Scan node in an EXPLAIN (FORMAT JSON) plan."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on each product/news repository query and fail if any plans "
+        "a sequential scan over a table with more than --rows rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Largest table a seq scan may read')
+        parser.add_argument('--term', default='tra', help='Search term used for search queries')
+
+    def _workload(self, term: str):
+        """Yield (label, callable) for every repository read shape."""
+        categories = ProductRepository.get_categories()
+        category = categories[0] if categories else "x"
+        filters = {
+            "all": {},
+            "category": {"category": category},
+            "price": {"price": "50-200"},
+            "standard": {"standard": "organic"},
+            "search": {"search": term},
+        }
+        sorts = list(ProductRepository.ORDER_MAP)
+        yield "products.get_categories", ProductRepository.get_categories
+        for fname, kwargs in filters.items():
+            for sort in sorts:
+                yield f"products.get_all[{fname},{sort}]", lambda k=kwargs, s=sort: ProductRepository.get_all(sort=s, page=3, **k)
+                yield f"products.get_page_after[{fname},{sort}]", lambda k=kwargs, s=sort: ProductRepository.get_page_after(sort=s, **k)
+        for sort in ("newest", "oldest", "price_asc", "price_desc", "name"):
+            yield f"products.search[{sort}]", lambda s=sort: ProductRepository.search(category=category, search=term, sort=s)
+            yield f"products.search[all,{sort}]", lambda s=sort: ProductRepository.search(sort=s)
+        yield "news.get_all", lambda: NewsRepository.get_all(page=3)
+        yield "news.get_page_after", NewsRepository.get_page_after
+        yield "news.get_related", lambda: NewsRepository.get_related(0)
+        yield "news.search", lambda: NewsRepository.search(search=term)
+        yield "news.search[all]", NewsRepository.search
+
+    def _table_rows(self, table: str) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            row = cursor.fetchone()
+        return max(row[0], 0) if row else 0
+
+    def handle(self, *args, **options):
+        threshold = options['rows']
+        failures = []
+        checked = 0
+        for label, call in self._workload(options['term']):
+            # Cached counts would hide the COUNT(*) query from the capture.
+            ProductCount._cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                call()
+            statements = [q['sql'] for q in captured.captured_queries if not q['sql'].startswith('EXPLAIN')]
+            for sql in statements:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+                    plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                checked += 1
+                for table in _seq_scans(plan[0]["Plan"]):
+                    rows = self._table_rows(table)
+                    if rows > threshold:
+                        failures.append(f"{label}: Seq Scan on {table} (~{rows} rows)\n    {sql}")
+        for failure in failures:
+            self.stderr.write(failure)
+        if failures:
+            raise CommandError(f"{len(failures)} of {checked} planned queries scan large tables sequentially.")
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} queries; no seq scans above {threshold} rows."))
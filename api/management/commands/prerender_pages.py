@@ -0,0 +1,140 @@
+"""Pre-render every product, news and page detail page into a static tree.
+
+The tree is meant for a web server in front of Django that serves
+DIR/<path>/index.html when present (with its precompressed .gz/.br variants)
+and proxies to Django otherwise. It is kept out of the static directories:
+they are published as-is, manifest.json included, and static hosts such as
+Vercel do not negotiate .gz/.br files.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from api.views.detail_pages import ROUTES, DetailPages
+from api.views.frontend_views import _get_index_html
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+_SLUG_RE = re.compile(r'^[\w-]+$')
+_MANIFEST = "manifest.json"
+
+# Set in each worker by _init_worker (and in-process for --workers 1).
+_worker = {}
+
+
+def _init_worker(base_html: str, base_url: str, output: str) -> None:
+    _worker.update(base_html=base_html, base_url=base_url, output=Path(output))
+
+
+def _write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _render_task(task: tuple) -> int:
+    """Render one page and write index.html (+ .gz/.br). Returns bytes written (uncompressed)."""
+    route, ident, row = task
+    url_path = DetailPages.path(route, ident)
+    body = DetailPages.render(_worker["base_html"], route, row, _worker["base_url"] + url_path).encode("utf-8")
+    target = _worker["output"] / url_path.strip("/")
+    target.mkdir(parents=True, exist_ok=True)
+    _write(target / "index.html", body)
+    _write(target / "index.html.gz", gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write(target / "index.html.br", brotli.compress(body, quality=11))
+    return len(body)
+
+
+class Command(BaseCommand):
+    help = "Render all detail pages to static files (index.html + .gz/.br) using a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(Path(settings.BASE_DIR) / 'prerendered'))
+        parser.add_argument('--base-url', default=os.getenv("SITE_URL", "https://mountainharvest.vn"),
+                            help='Absolute site URL used for canonical/og:url (default: $SITE_URL)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--incremental', action='store_true',
+                            help='Only re-render pages whose rows changed since the last run')
+        parser.add_argument('--route', action='append', choices=ROUTES, dest='routes',
+                            help='Limit to a route (repeatable; default: all)')
+
+    def handle(self, *args, **options):
+        base_html = _get_index_html()
+        if not base_html:
+            raise CommandError("public/index.html not found")
+        output = Path(options['output'])
+        resolved = output.resolve()
+        for static_dir in list(getattr(settings, 'STATICFILES_DIRS', [])) + [settings.STATIC_ROOT]:
+            static_dir = Path(static_dir).resolve()
+            if resolved == static_dir or static_dir in resolved.parents:
+                raise CommandError(
+                    f"--output {output} is inside the static directory {static_dir}: "
+                    "manifest.json and the .gz/.br files would be published as assets"
+                )
+        output.mkdir(parents=True, exist_ok=True)
+        base_url = options['base_url'].rstrip('/')
+        routes = options['routes'] or ROUTES
+        started = time.perf_counter()
+
+        manifest_path = output / _MANIFEST
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            manifest = {}
+        template_hash = hashlib.sha1(base_html.encode("utf-8")).hexdigest()
+        previous = manifest.get("pages", {})
+        if manifest.get("template") != template_hash or manifest.get("base_url") != base_url:
+            previous = {}
+        if not options['incremental']:
+            previous = {k: v for k, v in previous.items() if k.split("/", 1)[0] not in routes}
+
+        tasks, signatures = [], {}
+        for route in routes:
+            for ident, signature, row in DetailPages.rows(route):
+                if route == "page" and not _SLUG_RE.match(str(ident)):
+                    self.stderr.write(f"Skipping page with unsafe slug {ident!r}")
+                    continue
+                key = f"{route}/{ident}"
+                signatures[key] = signature
+                if previous.get(key) != signature:
+                    tasks.append((route, ident, row))
+
+        # Pages whose rows are gone (only within the routes handled this run)
+        stale = [k for k in manifest.get("pages", {}) if k.split("/", 1)[0] in routes and k not in signatures]
+        for key in stale:
+            route, ident = key.split("/", 1)
+            shutil.rmtree(output / DetailPages.path(route, ident).strip("/"), ignore_errors=True)
+
+        workers = max(1, options['workers'])
+        initargs = (base_html, base_url, str(output))
+        if workers == 1 or len(tasks) < 2:
+            _init_worker(*initargs)
+            sizes = [_render_task(task) for task in tasks]
+        else:
+            # Forked workers must open their own database connections.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+                sizes = list(pool.map(_render_task, tasks, chunksize=max(1, len(tasks) // (workers * 8))))
+
+        pages = {k: v for k, v in manifest.get("pages", {}).items() if k.split("/", 1)[0] not in routes}
+        pages.update(signatures)
+        manifest = {"template": template_hash, "base_url": base_url, "pages": pages}
+        _write(manifest_path, json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {len(tasks)} page(s) ({sum(sizes) // 1024} KB), {len(signatures) - len(tasks)} unchanged, "
+            f"{len(stale)} removed in {elapsed:.1f}s" + ("" if brotli else " (brotli not installed, .br skipped)")
+        ))
@@ -0,0 +1,17 @@
+"""Recompute the related-news lists (news_related table)."""
+from django.core.management.base import BaseCommand, CommandError
+from api.cache.generations import bump_generation
+from api.repositories.news_related import RelatedNews
+
+
+class Command(BaseCommand):
+    help = "Recompute TF-IDF related news for every article (requires NumPy)."
+
+    def handle(self, *args, **options):
+        try:
+            count = RelatedNews.rebuild()
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        if count:
+            bump_generation('news')
+        self.stdout.write(self.style.SUCCESS(f"Updated related news of {count} article(s)."))
@@ -0,0 +1,15 @@
+"""Rebuild derived product search columns (search_text / search_vector)."""
+from django.core.management.base import BaseCommand
+from api.repositories.product_search import ProductSearch
+
+
+class Command(BaseCommand):
+    help = "Rebuild full-text search columns for products (all, or only --id ones)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--id', type=int, action='append', dest='ids', help='Product id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = ProductSearch.reindex(ids=options.get('ids'), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {count} product(s)."))
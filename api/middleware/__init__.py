@@ -1,4 +1,5 @@
 """Middleware package."""
 from api.middleware.auth import AdminAuthMiddleware
+from api.middleware.invalidation import CacheInvalidationMiddleware
 
-__all__ = ["AdminAuthMiddleware"]
+__all__ = ["AdminAuthMiddleware", "CacheInvalidationMiddleware"]
@@ -0,0 +1,13 @@
+"""Cross-process cache invalidation middleware."""
+from api.cache.invalidation import InvalidationBus
+
+
+class CacheInvalidationMiddleware:
+    """Start the invalidation listener (or poll) before serving a request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        InvalidationBus.on_request()
+        return self.get_response(request)
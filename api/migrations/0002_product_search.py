@@ -0,0 +1,55 @@
+import re
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import Value
+
+from api.utils.text import fold_diacritics
+
+
+def backfill_search_columns(apps, schema_editor):
+    Product = apps.get_model('api', 'Product')
+    rows = Product.objects.order_by('id').values_list('id', 'name', 'description').iterator(chunk_size=500)
+    for pid, name, description in rows:
+        folded_name = fold_diacritics(name or "")
+        folded_desc = fold_diacritics(re.sub(r'<[^>]+>', ' ', description or ""))
+        Product.objects.filter(id=pid).update(
+            search_text=f"{folded_name} {folded_desc}".strip(),
+            search_vector=(
+                SearchVector(Value(folded_name), weight='A', config='simple')
+                + SearchVector(Value(folded_desc), weight='B', config='simple')
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='product',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_search_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='products_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='products_search_text_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+from api.utils.news_content import derive_news_fields
+
+
+def backfill_derived_content(apps, schema_editor):
+    News = apps.get_model('api', 'News')
+    for nid, content in News.objects.order_by('id').values_list('id', 'content').iterator(chunk_size=200):
+        News.objects.filter(id=nid).update(**derive_news_fields(content))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='word_count',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='reading_minutes',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='description_auto',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_derived_content, migrations.RunPython.noop),
+    ]
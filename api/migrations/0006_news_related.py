@@ -0,0 +1,29 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_product_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsRelation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relations', to='api.news')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_from', to='api.news')),
+            ],
+            options={
+                'db_table': 'news_related',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='newsrelation',
+            constraint=models.UniqueConstraint(fields=('news', 'rank'), name='news_related_news_rank_uniq'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+from api.utils.news_content import parse_news_date
+
+
+def backfill_published_at(apps, schema_editor):
+    News = apps.get_model('api', 'News')
+    for nid, date, created_at in News.objects.order_by('id').values_list('id', 'date', 'created_at').iterator(chunk_size=500):
+        published = parse_news_date(date) or created_at or django.utils.timezone.now()
+        News.objects.filter(id=nid).update(published_at=published)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_news_related'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='published_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_published_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='news',
+            name='published_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterModelOptions(
+            name='news',
+            options={'ordering': ['-published_at', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['-published_at', '-id'], name='news_published_id_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+"""Triggers feeding the cache invalidation bus (api.cache.invalidation)."""
+from django.db import migrations
+
+TABLES = ('products', 'news', 'pages', 'hero', 'site_config', 'categories', 'category_brochures')
+
+FUNCTIONS = """
+CREATE OR REPLACE FUNCTION cache_invalidation_notify() RETURNS trigger AS $$
+DECLARE
+    row_data jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := to_jsonb(OLD);
+    ELSE
+        row_data := to_jsonb(NEW);
+    END IF;
+    PERFORM pg_notify('cache_invalidation', json_build_object(
+        'table', TG_TABLE_NAME,
+        'id', COALESCE(row_data->>'id', row_data->>'key')
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION cache_invalidation_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO cache_versions (name, version) VALUES ('table:' || TG_TABLE_NAME, 1)
+    ON CONFLICT (name) DO UPDATE SET version = cache_versions.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGERS = "".join(f"""
+CREATE TRIGGER {table}_cache_notify
+    AFTER INSERT OR UPDATE OR DELETE ON {table}
+    FOR EACH ROW EXECUTE PROCEDURE cache_invalidation_notify();
+CREATE TRIGGER {table}_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+    FOR EACH STATEMENT EXECUTE PROCEDURE cache_invalidation_version();
+""" for table in TABLES)
+
+DROP = "".join(f"""
+DROP TRIGGER IF EXISTS {table}_cache_notify ON {table};
+DROP TRIGGER IF EXISTS {table}_cache_version ON {table};
+""" for table in TABLES) + """
+DROP FUNCTION IF EXISTS cache_invalidation_notify();
+DROP FUNCTION IF EXISTS cache_invalidation_version();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_cache_versions'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FUNCTIONS + TRIGGERS, DROP),
+    ]
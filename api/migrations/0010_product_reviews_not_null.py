@@ -0,0 +1,25 @@
+"""products.reviews is nullable in databases created from sql/init.sql.
+
+It is the leading key of the bestseller ordering: a NULL would end up in a
+keyset cursor and sort first under DESC, unlike the catalog snapshot (which
+reads it as 0). The model already declares it NOT NULL DEFAULT 0.
+"""
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_cache_invalidation_triggers'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            UPDATE products SET reviews = 0 WHERE reviews IS NULL;
+            ALTER TABLE products ALTER COLUMN reviews SET DEFAULT 0;
+            ALTER TABLE products ALTER COLUMN reviews SET NOT NULL;
+            """,
+            "ALTER TABLE products ALTER COLUMN reviews DROP NOT NULL;",
+        ),
+    ]
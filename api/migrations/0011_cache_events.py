@@ -0,0 +1,90 @@
+"""Per-row cache invalidation events.
+
+Replaces the per-statement table:<name> counters of migration 0009 with a
+cache_events log (row id, writer pid and transaction id), so polling workers
+can invalidate single rows and skip their own writes, and adds the writer's
+pid to the NOTIFY payload for the same reason.
+"""
+import importlib
+from django.db import migrations, models
+
+_0009 = importlib.import_module('api.migrations.0009_cache_invalidation_triggers')
+TABLES = _0009.TABLES
+
+FUNCTIONS = """
+CREATE OR REPLACE FUNCTION cache_invalidation_notify() RETURNS trigger AS $$
+DECLARE
+    row_data jsonb;
+    row_id text;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := to_jsonb(OLD);
+    ELSE
+        row_data := to_jsonb(NEW);
+    END IF;
+    row_id := COALESCE(row_data->>'id', row_data->>'key');
+    INSERT INTO cache_events (table_name, row_id, backend_pid, txid, created_at)
+    VALUES (TG_TABLE_NAME, row_id, pg_backend_pid(), txid_current(), now());
+    PERFORM pg_notify('cache_invalidation', json_build_object(
+        'table', TG_TABLE_NAME, 'id', row_id, 'pid', pg_backend_pid()
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION cache_invalidation_truncate() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO cache_events (table_name, row_id, backend_pid, txid, created_at)
+    VALUES (TG_TABLE_NAME, NULL, pg_backend_pid(), txid_current(), now());
+    PERFORM pg_notify('cache_invalidation', json_build_object(
+        'table', TG_TABLE_NAME, 'id', NULL, 'pid', pg_backend_pid()
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+FORWARD = FUNCTIONS + "".join(f"""
+DROP TRIGGER IF EXISTS {table}_cache_version ON {table};
+CREATE TRIGGER {table}_cache_truncate
+    AFTER TRUNCATE ON {table}
+    FOR EACH STATEMENT EXECUTE PROCEDURE cache_invalidation_truncate();
+""" for table in TABLES) + """
+DROP FUNCTION IF EXISTS cache_invalidation_version();
+DELETE FROM cache_versions WHERE name LIKE 'table:%';
+"""
+
+REVERSE = _0009.FUNCTIONS + "".join(f"""
+DROP TRIGGER IF EXISTS {table}_cache_truncate ON {table};
+CREATE TRIGGER {table}_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+    FOR EACH STATEMENT EXECUTE PROCEDURE cache_invalidation_version();
+""" for table in TABLES) + """
+DROP FUNCTION IF EXISTS cache_invalidation_truncate();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_product_reviews_not_null'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.CharField(max_length=63)),
+                ('row_id', models.CharField(max_length=255, null=True)),
+                ('backend_pid', models.IntegerField()),
+                ('txid', models.BigIntegerField()),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'cache_events',
+                'indexes': [models.Index(fields=['txid'], name='cache_events_txid_idx')],
+            },
+        ),
+        migrations.RunSQL(FORWARD, REVERSE),
+    ]
@@ -0,0 +1,66 @@
+"""Identify the writer of a cache event by a token instead of the backend pid.
+
+Behind a transaction-mode pooler (PgBouncer) many worker processes share the
+same server backends, so pg_backend_pid() cannot tell one worker's writes
+from another's. The triggers now report the transaction-local
+app.cache_writer setting (set by InvalidationBus.writes(), NULL otherwise).
+"""
+import importlib
+from django.db import migrations, models
+
+_0011 = importlib.import_module('api.migrations.0011_cache_events')
+
+FUNCTIONS = """
+CREATE OR REPLACE FUNCTION cache_invalidation_notify() RETURNS trigger AS $$
+DECLARE
+    row_data jsonb;
+    row_id text;
+    writer text := NULLIF(current_setting('app.cache_writer', true), '');
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := to_jsonb(OLD);
+    ELSE
+        row_data := to_jsonb(NEW);
+    END IF;
+    row_id := COALESCE(row_data->>'id', row_data->>'key');
+    INSERT INTO cache_events (table_name, row_id, writer, txid, created_at)
+    VALUES (TG_TABLE_NAME, row_id, writer, txid_current(), now());
+    PERFORM pg_notify('cache_invalidation', json_build_object(
+        'table', TG_TABLE_NAME, 'id', row_id, 'writer', writer
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION cache_invalidation_truncate() RETURNS trigger AS $$
+DECLARE
+    writer text := NULLIF(current_setting('app.cache_writer', true), '');
+BEGIN
+    INSERT INTO cache_events (table_name, row_id, writer, txid, created_at)
+    VALUES (TG_TABLE_NAME, NULL, writer, txid_current(), now());
+    PERFORM pg_notify('cache_invalidation', json_build_object(
+        'table', TG_TABLE_NAME, 'id', NULL, 'writer', writer
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_cache_events'),
+    ]
+
+    operations = [
+        # Events are only read for an hour; the old pids mean nothing to the new code
+        migrations.RunSQL("DELETE FROM cache_events", migrations.RunSQL.noop),
+        migrations.RemoveField(model_name='cacheevent', name='backend_pid'),
+        migrations.AddField(
+            model_name='cacheevent',
+            name='writer',
+            field=models.CharField(max_length=128, null=True),
+        ),
+        migrations.RunSQL(FUNCTIONS, _0011.FUNCTIONS + "DELETE FROM cache_events;"),
+    ]
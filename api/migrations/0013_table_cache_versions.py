@@ -0,0 +1,41 @@
+"""Shared write counters for products, news and pages.
+
+A statement trigger increments the "table:<name>" row of cache_versions on
+every write (also from scripts and psql), so HTTP validators built from them
+(the /api/bootstrap ETag) are the same in every worker and across restarts.
+"""
+from django.db import migrations
+
+TABLES = ('products', 'news', 'pages')
+
+FORWARD = """
+CREATE OR REPLACE FUNCTION cache_invalidation_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO cache_versions (name, version) VALUES ('table:' || TG_TABLE_NAME, 1)
+    ON CONFLICT (name) DO UPDATE SET version = cache_versions.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+""" + "".join(f"""
+CREATE TRIGGER {table}_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+    FOR EACH STATEMENT EXECUTE PROCEDURE cache_invalidation_version();
+""" for table in TABLES)
+
+REVERSE = "".join(f"""
+DROP TRIGGER IF EXISTS {table}_cache_version ON {table};
+""" for table in TABLES) + """
+DROP FUNCTION IF EXISTS cache_invalidation_version();
+DELETE FROM cache_versions WHERE name LIKE 'table:%';
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_cache_events_writer'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD, REVERSE),
+    ]
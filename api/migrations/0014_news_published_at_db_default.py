@@ -0,0 +1,21 @@
+"""Database default for news.published_at.
+
+0007 made the column NOT NULL with only a Python-side default, so raw
+inserts that omit it (sql/init.sql and sql/seed_extra.sql seeds, external
+scripts) failed. Such rows are now published at their insert time.
+"""
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_table_cache_versions'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "ALTER TABLE news ALTER COLUMN published_at SET DEFAULT now();",
+            "ALTER TABLE news ALTER COLUMN published_at DROP DEFAULT;",
+        ),
+    ]
@@ -1,11 +1,15 @@
 """Models package."""
 from api.models.product import Product
+from api.models.product_card import ProductCard
 from api.models.news import News
+from api.models.news_relation import NewsRelation
 from api.models.hero import Hero
 from api.models.site_config import SiteConfig
 from api.models.category import Category
 from api.models.page import Page
 from api.models.newsletter import NewsletterSubscriber
 from api.models.category_brochure import CategoryBrochure
+from api.models.cache_version import CacheVersion
+from api.models.cache_event import CacheEvent
 
-__all__ = ["Product", "News", "Hero", "SiteConfig", "Category", "Page", "NewsletterSubscriber", "CategoryBrochure"]
+__all__ = ["Product", "ProductCard", "News", "NewsRelation", "Hero", "SiteConfig", "Category", "Page", "NewsletterSubscriber", "CategoryBrochure", "CacheVersion", "CacheEvent"]
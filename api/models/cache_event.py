@@ -0,0 +1,25 @@
+"""Log of writes to cached tables."""
+from django.db import models
+
+
+class CacheEvent(models.Model):
+    """One row written to a watched table (see api.cache.invalidation).
+
+    Inserted by the cache_invalidation_notify() trigger, never by Django;
+    workers that poll read the events committed since their last check.
+    """
+    table_name = models.CharField(max_length=63)
+    # id (or key) of the written row; NULL for a TRUNCATE
+    row_id = models.CharField(max_length=255, null=True)
+    # app.cache_writer of the writing transaction (InvalidationBus.writes()),
+    # NULL for writes made outside it
+    writer = models.CharField(max_length=128, null=True)
+    # txid_current() of the writer
+    txid = models.BigIntegerField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'cache_events'
+        indexes = [
+            models.Index(fields=['txid'], name='cache_events_txid_idx'),
+        ]
@@ -0,0 +1,15 @@
+"""Shared cache version counters."""
+from django.db import models
+
+
+class CacheVersion(models.Model):
+    """Version of a group of rows cached in every worker (e.g. "site" chrome).
+
+    Writers increment it; readers compare it with the version their
+    in-process copy was loaded at (one primary-key lookup).
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'cache_versions'
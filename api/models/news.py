@@ -1,5 +1,8 @@
 """News model."""
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
 
 
 class News(models.Model):
@@ -9,6 +12,8 @@ class News(models.Model):
     content = models.TextField(null=True, blank=True)
     author = models.CharField(max_length=255, null=True, blank=True)
     date = models.CharField(max_length=20, null=True, blank=True)
+    # Parsed from `date` on write (api.utils.news_content.parse_news_date); public listing order
+    published_at = models.DateTimeField(default=timezone.now)
     sort_order = models.IntegerField(default=0)
     meta_title = models.CharField(max_length=255, null=True, blank=True)
     meta_description = models.TextField(null=True, blank=True)
@@ -16,15 +21,31 @@ class News(models.Model):
     h2_custom = models.CharField(max_length=255, null=True, blank=True)
     h3_custom = models.CharField(max_length=255, null=True, blank=True)
     slug = models.CharField(max_length=255, null=True, blank=True)
+    # Derived from content on every write (api.utils.news_content); null until backfilled
+    content_html = models.TextField(null=True, blank=True, editable=False)
+    excerpt = models.TextField(null=True, blank=True, editable=False)
+    word_count = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    reading_minutes = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    description_auto = models.TextField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'news'
-        ordering = ['-id']
+        ordering = ['-published_at', '-id']
+        indexes = [
+            # Public listing order (NewsRepository.LIST_ORDER) and its keyset pagination.
+            models.Index(fields=['-published_at', '-id'], name='news_published_id_idx'),
+            # Admin listing order.
+            models.Index(fields=['sort_order', '-id'], name='news_sort_order_id_idx'),
+            # Admin search ORs icontains over these three columns; each branch needs its own index.
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='news_title_trgm'),
+            GinIndex(OpClass(Upper('author'), name='gin_trgm_ops'), name='news_author_trgm'),
+            GinIndex(OpClass(Upper('content'), name='gin_trgm_ops'), name='news_content_trgm'),
+        ]
 
-    def to_dict(self):
-        """Convert to dictionary for JSON response."""
+    def to_dict(self, rendered: bool = False):
+        """Convert to dictionary for JSON response (`rendered` adds the detail page fields)."""
         from datetime import datetime
         d = {
             "id": self.id,
@@ -33,12 +54,19 @@ class News(models.Model):
             "content": self.content,
             "author": self.author,
             "date": self.date,
+            "published_at": timezone.localtime(self.published_at).isoformat(timespec='seconds') if self.published_at else None,
             "meta_title": self.meta_title,
             "meta_description": self.meta_description,
             "h1_custom": self.h1_custom,
             "h2_custom": self.h2_custom,
             "h3_custom": self.h3_custom,
+            "excerpt": self.excerpt,
+            "reading_minutes": self.reading_minutes,
         }
+        if rendered:
+            d["content_html"] = self.content_html
+            d["word_count"] = self.word_count
+            d["description_auto"] = self.description_auto
         if self.updated_at:
             d["updated_at"] = self.updated_at.isoformat()
         return d
@@ -0,0 +1,21 @@
+"""Precomputed related-news neighbours."""
+from django.db import models
+
+
+class NewsRelation(models.Model):
+    """One entry of an article's related list (rank 0 = most similar).
+
+    Maintained by api.repositories.news_related.RelatedNews; rows cascade
+    away with either article.
+    """
+    news = models.ForeignKey('api.News', on_delete=models.CASCADE, related_name='relations')
+    related = models.ForeignKey('api.News', on_delete=models.CASCADE, related_name='related_from')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        db_table = 'news_related'
+        constraints = [
+            # Also the index serving NewsRepository.get_related
+            models.UniqueConstraint(fields=['news', 'rank'], name='news_related_news_rank_uniq'),
+        ]
@@ -28,4 +28,5 @@ class Page(models.Model):
             "meta_description": self.meta_description,
             "sort_order": self.sort_order,
             "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
@@ -1,6 +1,9 @@
 """Product model."""
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Upper
 
 
 class Product(models.Model):
@@ -25,14 +28,32 @@ class Product(models.Model):
     h3_custom = models.CharField(max_length=255, null=True, blank=True)
     slug = models.CharField(max_length=255, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Derived search columns, maintained by ProductSearch on write.
+    search_text = models.TextField(null=True, blank=True, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         db_table = 'products'
         ordering = ['-id']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='products_search_vector_gin'),
+            GinIndex(fields=['search_text'], name='products_search_text_trgm', opclasses=['gin_trgm_ops']),
+            # Listing orders (ProductRepository.ORDER_MAP), with and without a category filter.
+            # (price, id) also serves price_desc by scanning backwards and the price-range filters.
+            models.Index(fields=['category', '-id'], name='products_category_id_idx'),
+            models.Index(fields=['-reviews', '-id'], name='products_reviews_id_idx'),
+            models.Index(fields=['category', '-reviews', '-id'], name='products_cat_reviews_id_idx'),
+            models.Index(fields=['price', 'id'], name='products_price_id_idx'),
+            models.Index(fields=['category', 'price', 'id'], name='products_cat_price_id_idx'),
+            GinIndex(fields=['tags'], name='products_tags_gin'),
+            # Admin search: name__icontains compiles to UPPER(name) LIKE UPPER(...).
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='products_name_trgm'),
+        ]
 
-    def to_dict(self):
-        """Convert to dictionary for JSON response."""
-        return {
+    def to_dict(self, rendered: bool = False):
+        """Convert to dictionary for JSON response (`rendered` adds the detail page fields)."""
+        d = {
             "id": self.id,
             "name": self.name,
             "category": self.category,
@@ -52,3 +73,6 @@ class Product(models.Model):
             "h2_custom": self.h2_custom,
             "h3_custom": self.h3_custom,
         }
+        if rendered and self.updated_at:
+            d["updated_at"] = self.updated_at.isoformat()
+        return d
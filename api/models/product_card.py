@@ -0,0 +1,62 @@
+"""Compact product row for listing cards."""
+
+# Columns fetched for a card, in ProductCard constructor order.
+CARD_COLUMNS = (
+    "id", "name", "category", "price", "original_price", "unit", "image",
+    "rating", "reviews", "is_hot", "discount", "tags",
+)
+
+# Keys of ProductCard.to_dict(); the subset of Product.to_dict() that cards render.
+CARD_KEYS = (
+    "id", "name", "category", "price", "originalPrice", "unit", "image",
+    "rating", "reviews", "isHot", "discount", "tags",
+)
+
+
+class ProductCard:
+    """Listing-card subset of Product, built from a values_list() row.
+
+    Skips description, SEO fields and model-instance overhead. `search_rank`
+    is only set for ranked search results (cursor_after checks for it).
+    """
+
+    __slots__ = CARD_COLUMNS + ("search_rank",)
+
+    def __init__(self, id, name, category, price, original_price, unit, image,
+                 rating, reviews, is_hot, discount, tags, search_rank=None):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.price = price
+        self.original_price = original_price
+        self.unit = unit
+        self.image = image
+        self.rating = rating
+        self.reviews = reviews
+        self.is_hot = is_hot
+        self.discount = discount
+        self.tags = tags
+        if search_rank is not None:
+            self.search_rank = search_rank
+
+    @staticmethod
+    def project(item: dict) -> dict:
+        """Card subset of an already serialized Product.to_dict()."""
+        return {key: item.get(key) for key in CARD_KEYS}
+
+    def to_dict(self):
+        """Convert to dictionary for JSON response (same keys/format as Product.to_dict)."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "category": self.category,
+            "price": self.price,
+            "originalPrice": self.original_price,
+            "unit": self.unit,
+            "image": self.image,
+            "rating": float(self.rating or 0),
+            "reviews": self.reviews or 0,
+            "isHot": self.is_hot,
+            "discount": self.discount,
+            "tags": self.tags or [],
+        }
@@ -0,0 +1,14 @@
+"""Shared version counters for data access."""
+from typing import Sequence, Tuple
+from api.models.cache_version import CacheVersion
+
+
+class CacheVersionRepository:
+    """Repository for the cache_versions counters."""
+
+    @staticmethod
+    def get_table_versions(tables: Sequence[str]) -> Tuple[int, ...]:
+        """Write counters of `tables` (bumped by a trigger on every statement, 0 before the first)."""
+        names = [f"table:{table}" for table in tables]
+        rows = dict(CacheVersion.objects.filter(name__in=names).values_list('name', 'version'))
+        return tuple(rows.get(name, 0) for name in names)
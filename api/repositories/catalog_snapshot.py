@@ -0,0 +1,307 @@
+"""In-process columnar snapshot of the product catalog.
+
+Optional engine (CATALOG_SNAPSHOT=True, requires NumPy): products are held
+as column arrays so listing filters become vectorized masks and sorts are
+precomputed permutations. Postgres stays the source of truth; the snapshot
+is patched by ProductRepository writes, by the products other workers write
+(refetched on the next read, see api.cache.invalidation) and fully reloaded
+after CATALOG_SNAPSHOT_TTL seconds.
+"""
+import copy
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from django.conf import settings
+from api.cache.invalidation import InvalidationBus
+from api.models.product import Product
+from api.repositories.pagination import decode_cursor, encode_cursor
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_MAX_TAGS = 63
+
+
+class _Columns:
+    """Immutable column set, ordered by id. Writes produce a new instance
+    sharing the columns they leave untouched."""
+
+    def __init__(
+        self,
+        rows: List[dict],
+        categories: Dict[str, int],
+        tag_bits: Dict[str, int],
+        loaded_at: Optional[float] = None,
+    ):
+        self.rows = rows
+        self.categories = categories
+        self.tag_bits = tag_bits
+        n = len(rows)
+        self.ids = np.fromiter((r["id"] for r in rows), dtype=np.int64, count=n)
+        self.price = np.fromiter((r["price"] or 0 for r in rows), dtype=np.int64, count=n)
+        self.reviews = np.fromiter((r["reviews"] or 0 for r in rows), dtype=np.int64, count=n)
+        self.category = np.fromiter((self._category_code(r) for r in rows), dtype=np.int32, count=n)
+        self.tags = np.fromiter((self._tag_mask(r) for r in rows), dtype=np.int64, count=n)
+        # Incremental copies keep the load time so the TTL still forces a reload
+        self.loaded_at = time.monotonic() if loaded_at is None else loaded_at
+        # ordering name -> (ordering, row permutation)
+        self._orders: Dict[str, Tuple[Tuple[str, ...], "np.ndarray"]] = {}
+
+    def _category_code(self, row: dict) -> int:
+        return self.categories.setdefault(row.get("category") or "", len(self.categories))
+
+    def _tag_mask(self, row: dict) -> int:
+        mask = 0
+        for tag in row.get("tags") or []:
+            bit = self.tag_bits.get(tag)
+            if bit is None:
+                if len(self.tag_bits) >= _MAX_TAGS:
+                    raise ValueError("too many distinct product tags for snapshot bitmask")
+                bit = self.tag_bits[tag] = 1 << len(self.tag_bits)
+            mask |= bit
+        return mask
+
+    def column(self, field: str) -> "np.ndarray":
+        return {"id": self.ids, "price": self.price, "reviews": self.reviews}[field]
+
+    def order(self, name: str, ordering: Sequence[str]) -> "np.ndarray":
+        """Row permutation for an ordering (computed once per snapshot, then patched by writes)."""
+        cached = self._orders.get(name)
+        if cached is None:
+            keys = [
+                -self.column(f.lstrip("-")) if f.startswith("-") else self.column(f)
+                for f in reversed(ordering)
+            ]
+            cached = self._orders[name] = (tuple(ordering), np.lexsort(keys))
+        return cached[1]
+
+    def _rank(self, ordering: Sequence[str], pos: int) -> int:
+        """Number of other rows sorting before row `pos` in an ordering."""
+        before = np.zeros(len(self.rows), dtype=bool)
+        equal = np.ones(len(self.rows), dtype=bool)
+        for field in ordering:
+            col = self.column(field.lstrip("-"))
+            value = col[pos]
+            before |= equal & ((col > value) if field.startswith("-") else (col < value))
+            equal &= col == value
+        before[pos] = False
+        return int(before.sum())
+
+    def _derived(self) -> "_Columns":
+        """Shallow copy sharing every column; callers replace what they change."""
+        clone = copy.copy(self)
+        clone.categories = dict(self.categories)
+        clone.tag_bits = dict(self.tag_bits)
+        clone._orders = {}
+        return clone
+
+    def with_row(self, row: dict) -> "_Columns":
+        """Copy with a product inserted or replaced.
+
+        Only the columns whose value changed are copied (then patched at the
+        product's slot), and cached orderings are patched by moving that one
+        slot, so a write costs a few array copies rather than a reload.
+        """
+        clone = self._derived()
+        values = {
+            "price": row["price"] or 0,
+            "reviews": row["reviews"] or 0,
+            "category": clone._category_code(row),
+            "tags": clone._tag_mask(row),
+        }
+        pos = int(np.searchsorted(self.ids, row["id"]))
+        clone.rows = list(self.rows)
+        if pos < len(self.rows) and self.rows[pos]["id"] == row["id"]:
+            clone.rows[pos] = row
+            changed = set()
+            for name, value in values.items():
+                col = getattr(self, name)
+                if col[pos] != value:
+                    col = col.copy()
+                    col[pos] = value
+                    setattr(clone, name, col)
+                    changed.add(name)
+            for name, (ordering, perm) in self._orders.items():
+                if any(f.lstrip("-") in changed for f in ordering):
+                    perm = np.insert(perm[perm != pos], clone._rank(ordering, pos), pos)
+                clone._orders[name] = (ordering, perm)
+        else:
+            clone.rows.insert(pos, row)
+            clone.ids = np.insert(self.ids, pos, row["id"])
+            for name, value in values.items():
+                setattr(clone, name, np.insert(getattr(self, name), pos, value))
+            for name, (ordering, perm) in self._orders.items():
+                perm = perm + (perm >= pos)
+                clone._orders[name] = (ordering, np.insert(perm, clone._rank(ordering, pos), pos))
+        return clone
+
+    def without(self, id: int) -> "_Columns":
+        """Copy with a product removed."""
+        pos = int(np.searchsorted(self.ids, id))
+        if pos >= len(self.rows) or self.rows[pos]["id"] != id:
+            return self
+        clone = self._derived()
+        clone.rows = self.rows[:pos] + self.rows[pos + 1:]
+        for name in ("ids", "price", "reviews", "category", "tags"):
+            setattr(clone, name, np.delete(getattr(self, name), pos))
+        for name, (ordering, perm) in self._orders.items():
+            perm = perm[perm != pos]
+            clone._orders[name] = (ordering, perm - (perm > pos))
+        return clone
+
+    def query(
+        self,
+        category: Optional[str],
+        price: Optional[str],
+        standard: Optional[str],
+        order_name: str,
+        ordering: Sequence[str],
+        page: int = 1,
+        limit: int = 8,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], int, Optional[str]]:
+        """Filter, sort and paginate like ProductRepository.get_all / get_page_after.
+
+        Returns (rows, total, next_cursor); the rows are copies the caller may modify.
+        """
+        mask = np.ones(len(self.rows), dtype=bool)
+        if category:
+            code = self.categories.get(category)
+            mask &= self.category == code if code is not None else False
+        if price == "under50":
+            mask &= self.price < 50000
+        elif price == "50-200":
+            mask &= (self.price >= 50000) & (self.price <= 200000)
+        elif price == "over200":
+            mask &= self.price > 200000
+        if standard:
+            bit = self.tag_bits.get(standard)
+            mask &= (self.tags & bit) != 0 if bit else False
+        total = int(mask.sum())
+
+        perm = self.order(order_name, ordering)
+        if cursor is not None:
+            position = decode_cursor(cursor, order_name, len(ordering))
+            if position is not None:
+                after = np.zeros(len(self.rows), dtype=bool)
+                equal = np.ones(len(self.rows), dtype=bool)
+                for field, value in zip(ordering, position):
+                    col = self.column(field.lstrip("-"))
+                    after |= equal & ((col < value) if field.startswith("-") else (col > value))
+                    equal &= col == value
+                mask &= after
+            start = 0
+        else:
+            start = (page - 1) * limit
+        selected = perm[mask[perm]][start:start + limit + 1]
+        # The snapshot's own dicts are shared by every request
+        rows = [dict(self.rows[i], tags=list(self.rows[i]["tags"])) for i in selected[:limit]]
+        next_cursor = None
+        if len(selected) > limit:
+            next_cursor = encode_cursor(order_name, [rows[-1][f.lstrip("-")] for f in ordering])
+        return rows, total, next_cursor
+
+
+class CatalogSnapshot:
+    """Process-wide holder of the current product columns."""
+
+    _lock = threading.Lock()
+    _columns: Optional[_Columns] = None
+    _disabled_logged = False
+    # Ids written by other processes, refetched before the next read
+    _stale_lock = threading.Lock()
+    _stale: Set[int] = set()
+
+    @staticmethod
+    def enabled() -> bool:
+        """Whether the snapshot may serve listings."""
+        if not getattr(settings, 'CATALOG_SNAPSHOT', False):
+            return False
+        if np is None:
+            if not CatalogSnapshot._disabled_logged:
+                logger.warning("CATALOG_SNAPSHOT is on but NumPy is not installed; using Postgres")
+                CatalogSnapshot._disabled_logged = True
+            return False
+        return True
+
+    @staticmethod
+    def load() -> _Columns:
+        """Build columns from Postgres."""
+        products = Product.objects.defer('search_text', 'search_vector').order_by('id')
+        return _Columns([p.to_dict() for p in products], {}, {})
+
+    @staticmethod
+    def get() -> Optional[_Columns]:
+        """Current snapshot, (re)loading it if missing or older than the TTL."""
+        if not CatalogSnapshot.enabled():
+            return None
+        columns = CatalogSnapshot._columns
+        ttl = getattr(settings, 'CATALOG_SNAPSHOT_TTL', 300)
+        if columns is not None and time.monotonic() - columns.loaded_at < ttl and not CatalogSnapshot._stale:
+            return columns
+        with CatalogSnapshot._lock:
+            with CatalogSnapshot._stale_lock:
+                stale, CatalogSnapshot._stale = CatalogSnapshot._stale, set()
+            columns = CatalogSnapshot._columns
+            try:
+                if columns is None or time.monotonic() - columns.loaded_at >= ttl:
+                    columns = CatalogSnapshot._columns = CatalogSnapshot.load()
+                elif stale:
+                    columns = CatalogSnapshot._columns = CatalogSnapshot._refetch(columns, stale)
+            except Exception as e:
+                logger.warning(f"Could not load catalog snapshot: {e}")
+                CatalogSnapshot._columns = None
+                return None
+        return columns
+
+    @staticmethod
+    def _refetch(columns: _Columns, ids: Set[int]) -> _Columns:
+        """Apply the current Postgres state of some products."""
+        products = Product.objects.defer('search_text', 'search_vector').filter(id__in=ids)
+        rows = {p.id: p.to_dict() for p in products}
+        for id in sorted(ids):
+            columns = columns.with_row(rows[id]) if id in rows else columns.without(id)
+        return columns
+
+    @staticmethod
+    def upsert(product: Product) -> None:
+        """Apply a created/updated product to a loaded snapshot."""
+        with CatalogSnapshot._lock:
+            if CatalogSnapshot._columns is None:
+                return
+            try:
+                CatalogSnapshot._columns = CatalogSnapshot._columns.with_row(product.to_dict())
+            except Exception as e:
+                logger.warning(f"Dropping catalog snapshot after failed update: {e}")
+                CatalogSnapshot._columns = None
+
+    @staticmethod
+    def remove(id: int) -> None:
+        """Drop a deleted product from a loaded snapshot."""
+        with CatalogSnapshot._lock:
+            if CatalogSnapshot._columns is not None:
+                CatalogSnapshot._columns = CatalogSnapshot._columns.without(id)
+
+    @staticmethod
+    def mark_stale(ident: Optional[str]) -> None:
+        """Another process wrote a product (None: any product); refetch it before the next read."""
+        if ident is None or not ident.isdigit():
+            CatalogSnapshot.clear()
+            return
+        if CatalogSnapshot._columns is not None:
+            with CatalogSnapshot._stale_lock:
+                CatalogSnapshot._stale.add(int(ident))
+
+    @staticmethod
+    def clear() -> None:
+        """Forget the snapshot; the next read reloads it."""
+        with CatalogSnapshot._lock:
+            CatalogSnapshot._columns = None
+
+
+InvalidationBus.register(("products",), lambda table, ident: CatalogSnapshot.mark_stale(ident))
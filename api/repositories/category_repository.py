@@ -1,7 +1,9 @@
 """Category repository for data access."""
 from typing import List, Optional
+from api.cache.invalidation import InvalidationBus
 from api.models.category import Category
 from api.models.category_brochure import CategoryBrochure
+from api.repositories.site_chrome import SiteChromeRepository
 
 
 class CategoryRepository:
@@ -34,7 +36,9 @@ class CategoryRepository:
     @staticmethod
     def create(name: str, sort_order: int = 0) -> int:
         """Create a category. Returns new id."""
-        cat = Category.objects.create(name=name, sort_order=sort_order)
+        with InvalidationBus.writes():
+            cat = Category.objects.create(name=name, sort_order=sort_order)
+        SiteChromeRepository.bump()
         return cat.id
     
     @staticmethod
@@ -43,12 +47,16 @@ class CategoryRepository:
         cat = Category.objects.get(id=id)
         cat.name = name
         cat.sort_order = sort_order
-        cat.save()
+        with InvalidationBus.writes():
+            cat.save()
+        SiteChromeRepository.bump()
     
     @staticmethod
     def delete(id: int) -> None:
         """Delete a category."""
-        Category.objects.filter(id=id).delete()
+        with InvalidationBus.writes():
+            Category.objects.filter(id=id).delete()
+        SiteChromeRepository.bump()
     
     @staticmethod
     def get_category_brochures() -> List[dict]:
@@ -78,4 +86,6 @@ class CategoryRepository:
             brochure.image = image
         if button_text is not None:
             brochure.button_text = button_text
-        brochure.save()
+        with InvalidationBus.writes():
+            brochure.save()
+        SiteChromeRepository.bump()
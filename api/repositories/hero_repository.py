@@ -1,6 +1,8 @@
 """Hero repository for data access."""
 from typing import Optional
+from api.cache.invalidation import InvalidationBus
 from api.models.hero import Hero
+from api.repositories.site_chrome import SiteChromeRepository
 
 
 class HeroRepository:
@@ -45,4 +47,6 @@ class HeroRepository:
             hero.image = image
         if button_text is not None:
             hero.button_text = button_text
-        hero.save()
+        with InvalidationBus.writes():
+            hero.save()
+        SiteChromeRepository.bump()
@@ -0,0 +1,300 @@
+"""Content-based related news.
+
+Every article is a TF-IDF vector over its diacritic-folded title (weighted
+twice) and plain text, using word unigrams and bigrams (Vietnamese words are
+mostly two syllables). The top RELATED_NEWS_K cosine neighbours of each
+article are stored in the news_related table, so serving them is one indexed
+join (NewsRepository.get_related).
+
+Computing them needs NumPy (optional). The vectors are held in-process as a
+dense L2-normalized matrix over the terms shared by at least two articles
+(terms of a single article cannot contribute to any similarity, but still
+count in its norm). NewsRepository writes patch the matrix: the edited
+article's row is re-vectorized and its column of similarities recomputed with
+one matrix-vector product; other articles' lists only change where that
+column says so. Articles written by other workers (which store their own
+lists) are re-vectorized before the next patch. IDF weights and the
+vocabulary are refreshed when the matrix is reloaded (after RELATED_NEWS_TTL
+seconds) or by `rebuild_related_news`.
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from html import unescape
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from django.conf import settings
+from django.db import transaction
+from api.cache.invalidation import InvalidationBus
+from api.models.news import News
+from api.models.news_relation import NewsRelation
+from api.utils.news_content import strip_tags
+from api.utils.text import fold_diacritics
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_TITLE_WEIGHT = 2
+# Terms in more than this share of articles are treated as stop words
+_MAX_DOC_SHARE = 0.5
+# Matrix columns kept (most widespread shared terms first)
+_MAX_TERMS = 4096
+# Rows per block when computing all neighbour lists
+_BLOCK_ROWS = 256
+
+Neighbours = List[Tuple[float, int]]
+
+
+def _terms(title: Optional[str], content: Optional[str]) -> Counter:
+    """Term counts of an article: folded words and adjacent word pairs."""
+    text = f"{title or ''} " * _TITLE_WEIGHT + unescape(strip_tags(content))
+    words = [w for w in _WORD_RE.findall(fold_diacritics(text)) if len(w) > 1]
+    counts = Counter(words)
+    counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return counts
+
+
+def _top(scores, ids, k: int) -> Neighbours:
+    """(score, id) of the k best positive scores, best first."""
+    if len(scores) > k:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    candidates = candidates[scores[candidates] > 0]
+    order = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return [(float(scores[i]), int(ids[i])) for i in order]
+
+
+class _Index:
+    """TF-IDF matrix and neighbour lists of all articles."""
+
+    def __init__(self, rows: Sequence[Tuple[int, Optional[str], Optional[str]]], k: int):
+        self.k = k
+        counts = [_terms(title, content) for _, title, content in rows]
+        doc_freq: Counter = Counter()
+        for terms in counts:
+            doc_freq.update(terms.keys())
+        self.docs = len(rows)
+        self.idf = {t: math.log((1 + self.docs) / (1 + df)) + 1 for t, df in doc_freq.items()}
+        ceiling = max(2, int(self.docs * _MAX_DOC_SHARE))
+        shared = sorted((t for t, df in doc_freq.items() if 2 <= df <= ceiling), key=lambda t: (-doc_freq[t], t))
+        self.vocab = {t: i for i, t in enumerate(shared[:_MAX_TERMS])}
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.pos = {int(nid): i for i, nid in enumerate(self.ids)}
+        self.matrix = np.zeros((len(rows), len(self.vocab)), dtype=np.float32)
+        for i, terms in enumerate(counts):
+            self.matrix[i] = self._vector(terms)
+        self.neighbours: Dict[int, Neighbours] = {}
+        for start in range(0, len(rows), _BLOCK_ROWS):
+            block = self.matrix[start:start + _BLOCK_ROWS] @ self.matrix.T
+            for offset, scores in enumerate(block):
+                scores[start + offset] = -1.0
+                self.neighbours[int(self.ids[start + offset])] = _top(scores, self.ids, k)
+        self.loaded_at = time.monotonic()
+
+    def _vector(self, terms: Counter):
+        """L2-normalized TF-IDF row (sublinear tf) restricted to the vocabulary."""
+        vector = np.zeros(len(self.vocab), dtype=np.float32)
+        unseen_idf = math.log(1 + self.docs) + 1
+        norm = 0.0
+        for term, tf in terms.items():
+            weight = (1 + math.log(tf)) * self.idf.get(term, unseen_idf)
+            norm += weight * weight
+            col = self.vocab.get(term)
+            if col is not None:
+                vector[col] = weight
+        if norm:
+            vector /= math.sqrt(norm)
+        return vector
+
+    def _row_neighbours(self, nid: int) -> Neighbours:
+        scores = self.matrix @ self.matrix[self.pos[nid]]
+        scores[self.pos[nid]] = -1.0
+        return _top(scores, self.ids, self.k)
+
+    def upsert(self, nid: int, title: Optional[str], content: Optional[str]) -> List[int]:
+        """Re-vectorize one article and patch the lists. Returns ids whose list changed."""
+        vector = self._vector(_terms(title, content))
+        if nid in self.pos:
+            self.matrix[self.pos[nid]] = vector
+        else:
+            self.pos[nid] = len(self.ids)
+            self.ids = np.append(self.ids, np.int64(nid))
+            self.matrix = np.vstack([self.matrix, vector[None, :]])
+        column = self.matrix @ vector
+        column[self.pos[nid]] = -1.0
+        self.neighbours[nid] = _top(column, self.ids, self.k)
+        changed = [nid]
+        for other, listed in self.neighbours.items():
+            if other == nid:
+                continue
+            score = float(column[self.pos[other]])
+            old = next((s for s, i in listed if i == nid), None)
+            if old is None and score <= 0:
+                continue
+            if old is not None and score < old and len(listed) == self.k:
+                # It fell and the list was full: the new last entry may be any article
+                self.neighbours[other] = self._row_neighbours(other)
+            else:
+                merged = [(s, i) for s, i in listed if i != nid]
+                if score > 0:
+                    merged.append((score, nid))
+                merged.sort(key=lambda e: -e[0])
+                self.neighbours[other] = merged[:self.k]
+            if self.neighbours[other] != listed:
+                changed.append(other)
+        return changed
+
+    def remove(self, ids: Iterable[int]) -> List[int]:
+        """Drop articles. Returns ids of the remaining ones whose list changed."""
+        gone = {nid for nid in ids if nid in self.pos}
+        if not gone:
+            return []
+        keep = np.array([int(nid) not in gone for nid in self.ids])
+        self.ids = self.ids[keep]
+        self.matrix = self.matrix[keep]
+        self.pos = {int(nid): i for i, nid in enumerate(self.ids)}
+        for nid in gone:
+            self.neighbours.pop(nid, None)
+        changed = []
+        for other, listed in self.neighbours.items():
+            if not any(i in gone for _, i in listed):
+                continue
+            if len(listed) == self.k:
+                self.neighbours[other] = self._row_neighbours(other)
+            else:
+                self.neighbours[other] = [(s, i) for s, i in listed if i not in gone]
+            changed.append(other)
+        return changed
+
+
+class RelatedNews:
+    """Process-wide related-news index; writes its results to news_related."""
+
+    _lock = threading.Lock()
+    _index: Optional[_Index] = None
+    _disabled_logged = False
+    # Articles written by other processes since the matrix was loaded
+    _stale_lock = threading.Lock()
+    _stale: Set[int] = set()
+
+    @staticmethod
+    def enabled() -> bool:
+        if np is None:
+            if not RelatedNews._disabled_logged:
+                logger.warning("NumPy is not installed; related news fall back to the latest articles")
+                RelatedNews._disabled_logged = True
+            return False
+        return True
+
+    @staticmethod
+    def _load() -> _Index:
+        rows = list(News.objects.order_by('id').values_list('id', 'title', 'content'))
+        return _Index(rows, getattr(settings, 'RELATED_NEWS_K', 10))
+
+    @staticmethod
+    def _current() -> _Index:
+        """Loaded index, rebuilt if missing or older than RELATED_NEWS_TTL (caller holds the lock)."""
+        ttl = getattr(settings, 'RELATED_NEWS_TTL', 300)
+        with RelatedNews._stale_lock:
+            stale, RelatedNews._stale = RelatedNews._stale, set()
+        index = RelatedNews._index
+        if index is None or time.monotonic() - index.loaded_at >= ttl:
+            index = RelatedNews._index = RelatedNews._load()
+            RelatedNews._store(index, None)
+        elif stale:
+            # Their writers have stored the resulting lists already
+            rows = News.objects.filter(id__in=stale).values_list('id', 'title', 'content')
+            present = set()
+            for nid, title, content in rows:
+                index.upsert(nid, title, content)
+                present.add(nid)
+            index.remove(stale - present)
+        return index
+
+    @staticmethod
+    def _store(index: _Index, ids: Optional[Iterable[int]]) -> int:
+        """Write the lists of `ids` (None: every list that differs from the table). Returns lists written."""
+        if ids is None:
+            stored: Dict[int, List[int]] = {}
+            for nid, related in NewsRelation.objects.order_by('news_id', 'rank').values_list('news_id', 'related_id'):
+                stored.setdefault(nid, []).append(related)
+            ids = [nid for nid, listed in index.neighbours.items()
+                   if [i for _, i in listed] != stored.get(nid, [])]
+        ids = [nid for nid in dict.fromkeys(ids) if nid in index.neighbours]
+        if not ids:
+            return 0
+        with transaction.atomic():
+            NewsRelation.objects.filter(news_id__in=ids).delete()
+            NewsRelation.objects.bulk_create([
+                NewsRelation(news_id=nid, related_id=related, rank=rank, score=score)
+                for nid in ids
+                for rank, (score, related) in enumerate(index.neighbours[nid])
+            ], batch_size=1000)
+        return len(ids)
+
+    @staticmethod
+    def refresh(news: News) -> None:
+        """Recompute an article's related list and the lists it enters or leaves."""
+        if not RelatedNews.enabled():
+            return
+        with RelatedNews._lock:
+            try:
+                fresh = RelatedNews._index is None
+                index = RelatedNews._current()
+                if not fresh:
+                    RelatedNews._store(index, index.upsert(news.id, news.title, news.content))
+            except Exception as e:
+                RelatedNews._index = None
+                logger.warning(f"Related news update failed for news {news.id}: {e}")
+
+    @staticmethod
+    def remove(ids: Iterable[int]) -> None:
+        """Patch the lists that referenced deleted articles (their own rows cascade away)."""
+        if not RelatedNews.enabled():
+            return
+        ids = list(ids)
+        with RelatedNews._lock:
+            try:
+                fresh = RelatedNews._index is None
+                index = RelatedNews._current()
+                if not fresh:
+                    RelatedNews._store(index, index.remove(ids))
+            except Exception as e:
+                RelatedNews._index = None
+                logger.warning(f"Related news update failed after deleting news {ids}: {e}")
+
+    @staticmethod
+    def rebuild() -> int:
+        """Recompute every list from scratch. Returns the number of lists written."""
+        if np is None:
+            raise RuntimeError("NumPy is required to compute related news")
+        with RelatedNews._lock:
+            index = RelatedNews._index = RelatedNews._load()
+            return RelatedNews._store(index, None)
+
+    @staticmethod
+    def mark_stale(ident: Optional[str]) -> None:
+        """Another process wrote an article (None: any article); re-vectorize it before the next patch."""
+        if ident is None or not ident.isdigit():
+            RelatedNews.clear()
+            return
+        if RelatedNews._index is not None:
+            with RelatedNews._stale_lock:
+                RelatedNews._stale.add(int(ident))
+
+    @staticmethod
+    def clear() -> None:
+        """Drop the in-process matrix."""
+        with RelatedNews._lock:
+            RelatedNews._index = None
+
+
+InvalidationBus.register(("news",), lambda table, ident: RelatedNews.mark_stale(ident))
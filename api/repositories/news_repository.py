@@ -1,11 +1,24 @@
 """News repository for data access."""
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from django.db.models import Q
+from django.utils import timezone
+from api.cache.generations import bump_generation
+from api.cache.invalidation import InvalidationBus
+from api.cache.pages import PageCache
 from api.models.news import News
+from api.repositories.news_related import RelatedNews
+from api.repositories.pagination import cursor_datetime, decode_cursor, encode_cursor, keyset_filter, row_values
+from api.utils.news_content import derive_news_fields, news_excerpt, parse_news_date
 
 
 class NewsRepository:
     """Repository for News data access."""
+
+    # Public listing order (newest publication date first); id breaks ties
+    # between same-day articles and doubles as the keyset tiebreaker.
+    LIST_ORDER = ('-published_at', '-id')
+    # Cursor name of LIST_ORDER (cursors from the former id-only order are rejected)
+    _CURSOR = "published"
     
     @staticmethod
     def get_all(page: int = 1, limit: int = 6) -> tuple[List[News], int]:
@@ -14,9 +27,34 @@ class NewsRepository:
         total = queryset.count()
         
         offset = (page - 1) * limit
-        # Sort by id descending (newest first), then by sort_order if needed
-        news_list = list(queryset.order_by('-id', 'sort_order')[offset:offset + limit])
+        news_list = list(queryset.order_by(*NewsRepository.LIST_ORDER)[offset:offset + limit])
         return news_list, total
+
+    @staticmethod
+    def get_page_after(cursor: Optional[str] = None, limit: int = 6) -> tuple[List[News], Optional[str]]:
+        """Get the news page after `cursor` (newest first). Returns (news, next_cursor)."""
+        ordering = NewsRepository.LIST_ORDER
+        queryset = News.objects.all()
+        position = decode_cursor(cursor, NewsRepository._CURSOR, len(ordering))
+        published_at = cursor_datetime(position[0]) if position is not None else None
+        if published_at is not None:
+            queryset = queryset.filter(keyset_filter(ordering, [published_at] + position[1:]))
+        rows = list(queryset.order_by(*ordering)[:limit + 1])
+        news_list = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(NewsRepository._CURSOR, row_values(news_list[-1], ordering))
+        return news_list, next_cursor
+
+    @staticmethod
+    def cursor_after(news: News) -> str:
+        """Cursor pointing just after a news item in listing order."""
+        return encode_cursor(NewsRepository._CURSOR, row_values(news, NewsRepository.LIST_ORDER))
+
+    @staticmethod
+    def count() -> int:
+        """Count all news."""
+        return News.objects.count()
     
     @staticmethod
     def get_by_id(id: int) -> Optional[News]:
@@ -61,21 +99,27 @@ class NewsRepository:
         h1_custom: Optional[str] = None,
         h2_custom: Optional[str] = None,
         h3_custom: Optional[str] = None,
-    ) -> None:
-        """Create a new news item."""
-        News.objects.create(
-            title=title,
-            slug=slug,
-            image=image,
-            content=content,
-            author=author or "Mountain Harvest",
-            date=date,
-            meta_title=meta_title,
-            meta_description=meta_description,
-            h1_custom=h1_custom,
-            h2_custom=h2_custom,
-            h3_custom=h3_custom,
-        )
+    ) -> int:
+        """Create a new news item. Returns new id."""
+        with InvalidationBus.writes():
+            news = News.objects.create(
+                title=title,
+                slug=slug,
+                image=image,
+                content=content,
+                author=author or "Mountain Harvest",
+                date=date,
+                published_at=parse_news_date(date) or timezone.now(),
+                meta_title=meta_title,
+                meta_description=meta_description,
+                h1_custom=h1_custom,
+                h2_custom=h2_custom,
+                h3_custom=h3_custom,
+                **derive_news_fields(content),
+            )
+        RelatedNews.refresh(news)
+        bump_generation('news')
+        return news.id
     
     @staticmethod
     def update(
@@ -99,6 +143,7 @@ class NewsRepository:
             news.slug = slug
         if date is not None:
             news.date = date
+            news.published_at = parse_news_date(date) or news.published_at
         if image is not None:
             news.image = image
         if content is not None:
@@ -115,7 +160,13 @@ class NewsRepository:
             news.h2_custom = h2_custom
         if h3_custom is not None:
             news.h3_custom = h3_custom
-        news.save()
+        for field, value in derive_news_fields(news.content).items():
+            setattr(news, field, value)
+        with InvalidationBus.writes():
+            news.save()
+        RelatedNews.refresh(news)
+        bump_generation('news')
+        PageCache.purge("news", id)
     
     @staticmethod
     def get_by_id_for_edit(id: int) -> Optional[dict]:
@@ -142,19 +193,61 @@ class NewsRepository:
     @staticmethod
     def delete(id: int) -> None:
         """Delete a news item."""
-        News.objects.filter(id=id).delete()
+        with InvalidationBus.writes():
+            News.objects.filter(id=id).delete()
+        RelatedNews.remove([id])
+        bump_generation('news')
+        PageCache.purge("news", id)
     
     @staticmethod
     def bulk_delete(ids: List[int]) -> None:
         """Bulk delete news items."""
-        News.objects.filter(id__in=ids).delete()
+        with InvalidationBus.writes():
+            News.objects.filter(id__in=ids).delete()
+        RelatedNews.remove(ids)
+        bump_generation('news')
+        for id in ids:
+            PageCache.purge("news", id)
     
+    @staticmethod
+    def backfill_derived(ids: Optional[Iterable[int]] = None, batch_size: int = 200) -> int:
+        """Recompute the derived content columns (all rows, or `ids`). Returns rows touched."""
+        queryset = News.objects.order_by('id')
+        if ids is not None:
+            queryset = queryset.filter(id__in=list(ids))
+        count = 0
+        for nid, content in queryset.values_list('id', 'content').iterator(chunk_size=batch_size):
+            News.objects.filter(id=nid).update(**derive_news_fields(content))
+            count += 1
+        if count:
+            bump_generation('news')
+        return count
+
+    @staticmethod
+    def get_feed_items(limit: int = 20) -> List[dict]:
+        """Newest news for the feed: id, title, author, excerpt, published_at, updated_at."""
+        items = list(
+            News.objects.order_by(*NewsRepository.LIST_ORDER)
+            .values('id', 'title', 'author', 'excerpt', 'published_at', 'updated_at')[:limit]
+        )
+        missing = [item["id"] for item in items if item["excerpt"] is None]
+        if missing:
+            # Rows not backfilled yet (see backfill_news_content)
+            contents = dict(News.objects.filter(id__in=missing).values_list('id', 'content'))
+            for item in items:
+                if item["excerpt"] is None:
+                    item["excerpt"] = news_excerpt(contents.get(item["id"]))
+        return items
+
     @staticmethod
     def get_related(id: int, limit: int = 3) -> List[News]:
-        """Get related news articles (exclude current, get latest)."""
+        """Most similar articles (precomputed in news_related), topped up with the latest news."""
         try:
-            # Get latest news excluding current article
-            related = list(News.objects.exclude(id=id).order_by('-id', 'sort_order')[:limit])
+            related = list(News.objects.filter(related_from__news_id=id).order_by('related_from__rank')[:limit])
+            if len(related) < limit:
+                # Not indexed yet (or few similar articles): fill with the latest ones
+                exclude = [id] + [n.id for n in related]
+                related += News.objects.exclude(id__in=exclude).order_by(*NewsRepository.LIST_ORDER)[:limit - len(related)]
             return related
         except Exception:
             return []
@@ -1,5 +1,8 @@
 """Page repository for data access."""
 from typing import List, Optional
+from api.cache.generations import bump_generation
+from api.cache.invalidation import InvalidationBus
+from api.cache.pages import PageCache
 from api.models.page import Page
 
 
@@ -61,29 +64,42 @@ class PageRepository:
     @staticmethod
     def create(slug: str, title: str, content: Optional[str] = None, meta_title: Optional[str] = None, meta_description: Optional[str] = None, sort_order: int = 0) -> int:
         """Create a page. Returns new id."""
-        page = Page.objects.create(
-            slug=slug,
-            title=title,
-            content=content,
-            meta_title=meta_title,
-            meta_description=meta_description,
-            sort_order=sort_order,
-        )
+        with InvalidationBus.writes():
+            page = Page.objects.create(
+                slug=slug,
+                title=title,
+                content=content,
+                meta_title=meta_title,
+                meta_description=meta_description,
+                sort_order=sort_order,
+            )
+        bump_generation('pages')
+        PageCache.purge("page", page.slug)
         return page.id
 
     @staticmethod
     def update(id: int, slug: str, title: str, content: Optional[str] = None, meta_title: Optional[str] = None, meta_description: Optional[str] = None, sort_order: int = 0) -> None:
         """Update a page."""
         page = Page.objects.get(id=id)
+        old_slug = page.slug
         page.slug = slug
         page.title = title
         page.content = content
         page.meta_title = meta_title
         page.meta_description = meta_description
         page.sort_order = sort_order
-        page.save()
+        with InvalidationBus.writes():
+            page.save()
+        bump_generation('pages')
+        PageCache.purge("page", old_slug)
+        PageCache.purge("page", slug)
 
     @staticmethod
     def delete(id: int) -> None:
         """Delete a page."""
-        Page.objects.filter(id=id).delete()
+        slugs = list(Page.objects.filter(id=id).values_list("slug", flat=True))
+        with InvalidationBus.writes():
+            Page.objects.filter(id=id).delete()
+        bump_generation('pages')
+        for slug in slugs:
+            PageCache.purge("page", slug)
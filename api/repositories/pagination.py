@@ -0,0 +1,71 @@
+"""Keyset (cursor) pagination helpers shared by repositories."""
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional, Sequence
+from django.db.models import Q
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_cursor(order_name: str, values: Sequence[Any]) -> str:
+    """Opaque cursor for the row holding `values` in an ordering."""
+    payload = json.dumps({"o": order_name, "v": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], order_name: str, size: int) -> Optional[List[Any]]:
+    """Decode cursor values. Returns None if missing, malformed or for another ordering."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(payload, dict) or payload.get("o") != order_name:
+        return None
+    values = payload.get("v")
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return None
+    return values
+
+
+def row_values(row: Any, ordering: Sequence[str]) -> List[Any]:
+    """Sort key values of a model instance (or annotated row) for an ordering.
+
+    Datetimes become integer microseconds since the epoch (see cursor_datetime).
+    """
+    values = []
+    for field in ordering:
+        value = getattr(row, field.lstrip("-"))
+        if isinstance(value, datetime):
+            value = (value - _EPOCH) // _MICROSECOND
+        values.append(value)
+    return values
+
+
+def cursor_datetime(value: Any) -> Optional[datetime]:
+    """Datetime of a cursor value written by row_values, None if out of range."""
+    try:
+        return _EPOCH + int(value) * _MICROSECOND
+    except (OverflowError, ValueError):
+        return None
+
+
+def keyset_filter(ordering: Sequence[str], values: Sequence[Any]) -> Q:
+    """Rows strictly after `values` in `ordering`.
+
+    ("-reviews", "-id") with (12, 40) -> reviews < 12 OR (reviews = 12 AND id < 40)
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        op = "lt" if field.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{op}": value})
+        equal &= Q(**{name: value})
+    return condition
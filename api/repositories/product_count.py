@@ -0,0 +1,85 @@
+"""Cached and estimated totals for product listings."""
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+from django.conf import settings
+from django.db.models import QuerySet
+from api.cache.local import GenerationCache
+
+logger = logging.getLogger(__name__)
+
+
+class ProductCount:
+    """Total counts per normalized filter tuple, invalidated by product writes.
+
+    Filter combinations the planner expects to match more than
+    CATALOG_COUNT_ESTIMATE_THRESHOLD rows use the EXPLAIN row estimate
+    instead of a full COUNT(*); such totals are flagged as not exact.
+    Filter sets whose exact count came out under the threshold are
+    remembered across writes, so their later misses skip the EXPLAIN.
+    """
+
+    _cache = GenerationCache('products', max_entries=1024, ttl=getattr(settings, 'CATALOG_CACHE_TTL', 300))
+    _small_lock = threading.Lock()
+    _small: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    @staticmethod
+    def key(
+        category: Optional[str] = None,
+        price: Optional[str] = None,
+        standard: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> tuple:
+        """Normalized cache key for a filter set."""
+        return (
+            category or "",
+            price if price in ("under50", "50-200", "over200") else "",
+            standard or "",
+            " ".join((search or "").lower().split()),
+        )
+
+    @staticmethod
+    def estimate(queryset: QuerySet) -> Optional[int]:
+        """Planner row estimate for a queryset, or None if unavailable."""
+        try:
+            plan = json.loads(queryset.order_by().explain(format='json'))
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Could not estimate product count: {e}")
+            return None
+
+    @staticmethod
+    def get(queryset: QuerySet, key: tuple) -> Tuple[int, bool]:
+        """Get (total, exact) for a filtered queryset, using the cache."""
+        cached = ProductCount._cache.get(key)
+        if cached is not None:
+            return cached
+
+        generation = ProductCount._cache.generation()
+        total, exact = None, True
+        threshold = getattr(settings, 'CATALOG_COUNT_ESTIMATE_THRESHOLD', 0)
+        if threshold and key not in ProductCount._small:
+            estimated = ProductCount.estimate(queryset)
+            if estimated is not None and estimated > threshold:
+                total, exact = estimated, False
+        if total is None:
+            total = queryset.count()
+            if threshold:
+                ProductCount._remember(key, total <= threshold)
+
+        ProductCount._cache.set(key, (total, exact), generation)
+        return total, exact
+
+    @staticmethod
+    def _remember(key: Hashable, small: bool) -> None:
+        """Record whether a filter set counts under the estimate threshold."""
+        with ProductCount._small_lock:
+            if small:
+                ProductCount._small[key] = None
+                ProductCount._small.move_to_end(key)
+                while len(ProductCount._small) > ProductCount._cache.max_entries:
+                    ProductCount._small.popitem(last=False)
+            else:
+                ProductCount._small.pop(key, None)
@@ -0,0 +1,94 @@
+"""Faceted counts for the catalog filter sidebar."""
+from typing import Optional
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, Case, CharField, ExpressionWrapper, Q, Value, When
+from api.cache.local import GenerationCache
+from api.repositories.product_count import ProductCount
+from api.repositories.product_search import ProductSearch
+from api.models.product import Product
+
+PRICE_BUCKETS = ("under50", "50-200", "over200")
+
+_PRICE_FILTERS = {
+    "under50": Q(price__lt=50000),
+    "50-200": Q(price__gte=50000, price__lte=200000),
+    "over200": Q(price__gt=200000),
+}
+
+# One pass over the search-filtered products. Each facet counts rows that
+# match every *other* active filter, so options stay selectable.
+_FACETS_SQL = """
+SELECT b.category, t.tag, b.price_bucket,
+       GROUPING(b.category) AS g_cat, GROUPING(t.tag) AS g_tag, GROUPING(b.price_bucket) AS g_price,
+       COUNT(DISTINCT b.id) FILTER (WHERE b.price_ok AND b.tag_ok) AS n_cat,
+       COUNT(DISTINCT b.id) FILTER (WHERE b.cat_ok AND b.price_ok) AS n_tag,
+       COUNT(DISTINCT b.id) FILTER (WHERE b.cat_ok AND b.tag_ok) AS n_price,
+       COUNT(DISTINCT b.id) FILTER (WHERE b.cat_ok AND b.price_ok AND b.tag_ok) AS n_total
+FROM ({base}) AS b
+LEFT JOIN LATERAL unnest(b.tags) AS t(tag) ON TRUE
+GROUP BY GROUPING SETS ((b.category), (t.tag), (b.price_bucket), ())
+"""
+
+
+def _flag(condition: Optional[Q]) -> ExpressionWrapper:
+    """Boolean column: condition, or TRUE when the filter is inactive."""
+    if condition is None:
+        return ExpressionWrapper(Value(True), output_field=BooleanField())
+    return ExpressionWrapper(condition, output_field=BooleanField())
+
+
+class ProductFacets:
+    """Category, price bucket and tag counts under the current filter set."""
+
+    _cache = GenerationCache('products', max_entries=512, ttl=getattr(settings, 'CATALOG_CACHE_TTL', 300))
+
+    @staticmethod
+    def get(
+        category: Optional[str] = None,
+        price: Optional[str] = None,
+        standard: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> dict:
+        """Facet counts, computed in a single grouped query and cached per filter set."""
+        key = ProductCount.key(category, price, standard, search)
+        cached = ProductFacets._cache.get(key)
+        if cached is not None:
+            return cached
+        generation = ProductFacets._cache.generation()
+
+        queryset, _ = ProductSearch.apply(Product.objects.all(), search)
+        base = queryset.annotate(
+            price_bucket=Case(
+                *[When(cond, then=Value(bucket)) for bucket, cond in _PRICE_FILTERS.items()],
+                output_field=CharField(),
+            ),
+            cat_ok=_flag(Q(category=category) if category else None),
+            price_ok=_flag(_PRICE_FILTERS.get(price)),
+            tag_ok=_flag(Q(tags__contains=[standard]) if standard else None),
+        ).order_by().values('id', 'category', 'tags', 'price_bucket', 'cat_ok', 'price_ok', 'tag_ok')
+        base_sql, params = base.query.sql_with_params()
+
+        categories, tags, prices, total = {}, {}, dict.fromkeys(PRICE_BUCKETS, 0), 0
+        with connection.cursor() as cursor:
+            cursor.execute(_FACETS_SQL.format(base=base_sql), params)
+            for cat, tag, bucket, g_cat, g_tag, g_price, n_cat, n_tag, n_price, n_total in cursor.fetchall():
+                if not g_cat and g_tag and g_price:
+                    categories[cat] = n_cat
+                elif not g_tag and g_cat and g_price:
+                    if tag is not None:
+                        tags[tag] = n_tag
+                elif not g_price and g_cat and g_tag:
+                    if bucket is not None:
+                        prices[bucket] = n_price
+                else:
+                    total = n_total
+
+        result = {
+            "categories": [{"value": k, "count": v} for k, v in sorted(categories.items())],
+            "price": [{"value": k, "count": prices[k]} for k in PRICE_BUCKETS],
+            "standards": [{"value": k, "count": v} for k, v in sorted(tags.items())],
+            "total": total,
+        }
+        ProductFacets._cache.set(key, result, generation)
+        return result
@@ -1,31 +1,43 @@
 """Product repository for data access."""
 import json
 from typing import List, Optional
-from django.db.models import Q, Count
+from django.db.models import Q, Count, QuerySet
 from api.models.product import Product
+from api.models.product_card import CARD_COLUMNS, ProductCard
+from api.cache.fragments import product_cards
+from api.cache.generations import bump_generation
+from api.cache.invalidation import InvalidationBus
+from api.cache.pages import PageCache
+from api.repositories.catalog_snapshot import CatalogSnapshot
+from api.repositories.pagination import decode_cursor, encode_cursor, keyset_filter, row_values
+from api.repositories.product_count import ProductCount
+from api.repositories.product_facets import ProductFacets
+from api.repositories.product_search import ProductSearch
+from api.repositories.product_suggest import ProductSuggest
 
 
 class ProductRepository:
     """Repository for Product data access."""
-    
+
+    # Listing orderings; every one ends on id so keyset cursors are unambiguous.
+    ORDER_MAP = {
+        "newest": ("-id",),
+        "bestseller": ("-reviews", "-id"),
+        "price_asc": ("price", "id"),
+        "price_desc": ("-price", "-id"),
+    }
+    RELEVANCE_ORDER = ("-search_rank", "-id")
+
     @staticmethod
-    def get_all(
+    def _filtered(
         category: Optional[str] = None,
         price: Optional[str] = None,
         standard: Optional[str] = None,
         search: Optional[str] = None,
-        sort: str = "newest",
-        page: int = 1,
-        limit: int = 8,
-    ) -> tuple[List[Product], int]:
-        """Get products with filters, sorting, and pagination."""
-        queryset = Product.objects.all()
-        
-        if search and search.strip():
-            queryset = queryset.filter(
-                Q(name__icontains=search.strip()) | 
-                Q(description__icontains=search.strip())
-            )
+    ) -> tuple[QuerySet, bool]:
+        """Listing queryset with filters applied. Returns (queryset, ranked)."""
+        queryset = Product.objects.defer('search_text', 'search_vector')
+        queryset, ranked = ProductSearch.apply(queryset, search)
         if category:
             queryset = queryset.filter(category=category)
         if price == "under50":
@@ -36,21 +48,112 @@ class ProductRepository:
             queryset = queryset.filter(price__gt=200000)
         if standard:
             queryset = queryset.filter(tags__contains=[standard])
-        
-        total = queryset.count()
-        
-        order_map = {
-            "newest": "-id",
-            "bestseller": "-reviews",
-            "price_asc": "price",
-            "price_desc": "-price",
-        }
-        order_by = order_map.get((sort or "newest").lower(), "-id")
-        queryset = queryset.order_by(order_by)
+        return queryset, ranked
+
+    @staticmethod
+    def ordering(sort: Optional[str], ranked: bool) -> tuple[str, tuple]:
+        """Resolve sort param to (ordering name, order_by fields).
+
+        With a search term and the default sort, results are ranked by relevance.
+        """
+        sort_key = (sort or "newest").lower()
+        if ranked and sort_key in ("newest", "relevance"):
+            return "relevance", ProductRepository.RELEVANCE_ORDER
+        if sort_key not in ProductRepository.ORDER_MAP:
+            sort_key = "newest"
+        return sort_key, ProductRepository.ORDER_MAP[sort_key]
+
+    @staticmethod
+    def _rows(queryset: QuerySet, card: bool, ranked: bool) -> list:
+        """Materialize an ordered, sliced listing queryset as Products or ProductCards."""
+        if not card:
+            return list(queryset)
+        columns = CARD_COLUMNS + (("search_rank",) if ranked else ())
+        return [ProductCard(*row) for row in queryset.values_list(*columns)]
+
+    @staticmethod
+    def get_all(
+        category: Optional[str] = None,
+        price: Optional[str] = None,
+        standard: Optional[str] = None,
+        search: Optional[str] = None,
+        sort: str = "newest",
+        page: int = 1,
+        limit: int = 8,
+        card: bool = False,
+    ) -> tuple[List[Product], int]:
+        """Get products with filters, sorting, and pagination.
+
+        With `card=True` only the card columns are fetched and ProductCard rows are returned.
+        """
+        queryset, ranked = ProductRepository._filtered(category, price, standard, search)
+        total, _ = ProductCount.get(queryset, ProductCount.key(category, price, standard, search))
+        _, ordering = ProductRepository.ordering(sort, ranked)
+        queryset = queryset.order_by(*ordering)
         
         offset = (page - 1) * limit
-        products = list(queryset[offset:offset + limit])
+        products = ProductRepository._rows(queryset[offset:offset + limit], card, ranked)
         return products, total
+
+    @staticmethod
+    def get_page_after(
+        cursor: Optional[str] = None,
+        category: Optional[str] = None,
+        price: Optional[str] = None,
+        standard: Optional[str] = None,
+        search: Optional[str] = None,
+        sort: str = "newest",
+        limit: int = 8,
+        card: bool = False,
+    ) -> tuple[List[Product], Optional[str]]:
+        """Get the page after `cursor` by seeking on (sort key, id).
+
+        An empty or unusable cursor starts from the first row. Returns
+        (products, next_cursor); next_cursor is None on the last page.
+        """
+        queryset, ranked = ProductRepository._filtered(category, price, standard, search)
+        name, ordering = ProductRepository.ordering(sort, ranked)
+        position = decode_cursor(cursor, name, len(ordering))
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(ordering, position))
+        rows = ProductRepository._rows(queryset.order_by(*ordering)[:limit + 1], card, ranked)
+        products = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(name, row_values(products[-1], ordering))
+        return products, next_cursor
+
+    @staticmethod
+    def cursor_after(product: Product, sort: Optional[str] = "newest") -> str:
+        """Cursor pointing just after a product returned by get_all/get_page_after."""
+        name, ordering = ProductRepository.ordering(sort, hasattr(product, 'search_rank'))
+        return encode_cursor(name, row_values(product, ordering))
+
+    @staticmethod
+    def count(
+        category: Optional[str] = None,
+        price: Optional[str] = None,
+        standard: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> tuple[int, bool]:
+        """Count products matching the listing filters. Returns (total, exact)."""
+        queryset, _ = ProductRepository._filtered(category, price, standard, search)
+        return ProductCount.get(queryset, ProductCount.key(category, price, standard, search))
+    
+    @staticmethod
+    def get_facets(
+        category: Optional[str] = None,
+        price: Optional[str] = None,
+        standard: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> dict:
+        """Category, price bucket and tag counts for the listing filters."""
+        return ProductFacets.get(category, price, standard, search)
+    
+    @staticmethod
+    def suggest(query: str, limit: int = 8) -> dict:
+        """Product names and categories starting with `query` (in-memory prefix index)."""
+        return ProductSuggest.get().lookup(query, limit)
     
     @staticmethod
     def get_by_id(id: int) -> Optional[Product]:
@@ -118,29 +221,35 @@ class ProductRepository:
         h1_custom: Optional[str] = None,
         h2_custom: Optional[str] = None,
         h3_custom: Optional[str] = None,
-    ) -> None:
-        """Create a new product."""
-        Product.objects.create(
-            name=name,
-            category=category,
-            price=price,
-            slug=slug,
-            original_price=original_price,
-            unit=unit,
-            image=image,
-            description=description,
-            tags=tags or [],
-            is_hot=is_hot,
-            discount=discount,
-            rating=rating,
-            reviews=reviews,
-            sort_order=sort_order,
-            meta_title=meta_title,
-            meta_description=meta_description,
-            h1_custom=h1_custom,
-            h2_custom=h2_custom,
-            h3_custom=h3_custom,
-        )
+    ) -> int:
+        """Create a new product. Returns new id."""
+        with InvalidationBus.writes():
+            product = Product.objects.create(
+                name=name,
+                category=category,
+                price=price,
+                slug=slug,
+                original_price=original_price,
+                unit=unit,
+                image=image,
+                description=description,
+                tags=tags or [],
+                is_hot=is_hot,
+                discount=discount,
+                rating=rating,
+                reviews=reviews,
+                sort_order=sort_order,
+                meta_title=meta_title,
+                meta_description=meta_description,
+                h1_custom=h1_custom,
+                h2_custom=h2_custom,
+                h3_custom=h3_custom,
+            )
+            ProductSearch.refresh(product)
+        generation = bump_generation('products')
+        CatalogSnapshot.upsert(product)
+        ProductSuggest.apply(product.id, (product.name, product.category), generation)
+        return product.id
     
     @staticmethod
     def update(
@@ -202,7 +311,14 @@ class ProductRepository:
             product.h2_custom = h2_custom
         if h3_custom is not None:
             product.h3_custom = h3_custom
-        product.save()
+        with InvalidationBus.writes():
+            product.save()
+            ProductSearch.refresh(product)
+        generation = bump_generation('products')
+        CatalogSnapshot.upsert(product)
+        ProductSuggest.apply(product.id, (product.name, product.category), generation)
+        product_cards.evict(id)
+        PageCache.purge("product", id)
     
     @staticmethod
     def get_by_id_for_edit(id: int) -> Optional[dict]:
@@ -237,4 +353,10 @@ class ProductRepository:
     @staticmethod
     def delete(id: int) -> None:
         """Delete a product."""
-        Product.objects.filter(id=id).delete()
+        with InvalidationBus.writes():
+            Product.objects.filter(id=id).delete()
+        generation = bump_generation('products')
+        CatalogSnapshot.remove(id)
+        ProductSuggest.apply(id, None, generation)
+        product_cards.evict(id)
+        PageCache.purge("product", id)
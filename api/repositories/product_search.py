@@ -0,0 +1,92 @@
+"""Full-text search backend for products."""
+import re
+from typing import Iterable, Optional, Tuple
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, FloatField, Q, QuerySet, Value
+from django.db.models.functions import Cast
+from api.models.product import Product
+from api.utils.text import fold_diacritics
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+class ProductSearch:
+    """Weighted tsvector search (name > description) over diacritic-folded text.
+
+    Products keep two derived columns in sync on every write:
+    ``search_vector`` (GIN) for ranked word/prefix matching and ``search_text``
+    (trigram GIN) for substring matches. When the backend is set to ``ilike``
+    the original ``icontains`` filter is used instead.
+    """
+
+    @staticmethod
+    def enabled() -> bool:
+        """Whether the tsvector backend is active (PRODUCT_SEARCH_BACKEND)."""
+        return getattr(settings, 'PRODUCT_SEARCH_BACKEND', 'fts') == 'fts'
+
+    @staticmethod
+    def index_values(name: Optional[str], description: Optional[str]) -> dict:
+        """Column values for search_text/search_vector of one product."""
+        folded_name = fold_diacritics(name or "")
+        folded_desc = fold_diacritics(_TAG_RE.sub(' ', description or ""))
+        return {
+            "search_text": f"{folded_name} {folded_desc}".strip(),
+            "search_vector": (
+                SearchVector(Value(folded_name), weight='A', config='simple')
+                + SearchVector(Value(folded_desc), weight='B', config='simple')
+            ),
+        }
+
+    @staticmethod
+    def refresh(product: Product) -> None:
+        """Recompute derived search columns for a saved product."""
+        Product.objects.filter(id=product.id).update(
+            **ProductSearch.index_values(product.name, product.description)
+        )
+
+    @staticmethod
+    def reindex(ids: Optional[Iterable[int]] = None, batch_size: int = 500) -> int:
+        """Rebuild derived search columns. Returns number of rows touched."""
+        queryset = Product.objects.order_by('id')
+        if ids is not None:
+            queryset = queryset.filter(id__in=list(ids))
+        count = 0
+        rows = queryset.values_list('id', 'name', 'description').iterator(chunk_size=batch_size)
+        for pid, name, description in rows:
+            Product.objects.filter(id=pid).update(**ProductSearch.index_values(name, description))
+            count += 1
+        return count
+
+    @staticmethod
+    def build_query(term: str) -> Optional[SearchQuery]:
+        """Prefix tsquery from a folded search term ("ca chu" -> 'ca:* & chu:*')."""
+        tokens = _TOKEN_RE.findall(fold_diacritics(term))
+        if not tokens:
+            return None
+        return SearchQuery(" & ".join(f"{t}:*" for t in tokens), search_type='raw', config='simple')
+
+    @staticmethod
+    def ilike(queryset: QuerySet, term: str) -> QuerySet:
+        """Original unindexed icontains filter."""
+        return queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+
+    @staticmethod
+    def apply(queryset: QuerySet, term: Optional[str]) -> Tuple[QuerySet, bool]:
+        """Filter queryset by search term. Returns (queryset, ranked).
+
+        When ranked is True the queryset is annotated with ``search_rank``,
+        cast from ts_rank's float4 to float8 so the value in a keyset cursor
+        compares equal to the column it was read from.
+        """
+        term = (term or "").strip()
+        if not term:
+            return queryset, False
+        query = ProductSearch.build_query(term) if ProductSearch.enabled() else None
+        if query is None:
+            return ProductSearch.ilike(queryset, term), False
+        queryset = queryset.filter(
+            Q(search_vector=query) | Q(search_text__contains=fold_diacritics(term))
+        ).annotate(search_rank=Cast(SearchRank(F('search_vector'), query), FloatField()))
+        return queryset, True
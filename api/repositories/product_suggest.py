@@ -0,0 +1,207 @@
+"""In-process prefix index for search-box suggestions.
+
+Product names are folded (lowercase, no diacritics) and kept in sorted
+arrays, once from the start of the name and once from each later word, so a
+keystroke lookup is two bisects plus at most `limit` steps and never touches
+Postgres. ProductRepository writes patch the index with the one product
+they changed (ProductSuggest.apply); it is reloaded when the products
+generation moves on for any other reason and after CATALOG_CACHE_TTL seconds.
+"""
+import bisect
+import copy
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+from django.conf import settings
+from api.cache.generations import get_generation
+from api.models.product import Product
+from api.utils.text import fold_diacritics
+
+logger = logging.getLogger(__name__)
+
+# Sorts after every character a folded key can contain.
+_HIGH = "\U0010ffff"
+
+
+def _fold(text: str) -> str:
+    return " ".join(fold_diacritics(text or "").split())
+
+
+def _name_pairs(pid: int, name: str) -> Tuple[list, list]:
+    """(whole-name pairs, later-word pairs) of a product."""
+    words = _fold(name).split(" ")
+    return [(" ".join(words), pid)], [(" ".join(words[i:]), pid) for i in range(1, len(words))]
+
+
+def _category_pairs(category: str) -> list:
+    words = _fold(category).split(" ")
+    return [(" ".join(words[i:]), category) for i in range(len(words))]
+
+
+class _SortedKeys:
+    """Sorted (key, value) pairs searchable by key prefix."""
+
+    def __init__(self, pairs: List[Tuple[str, object]]):
+        pairs.sort(key=lambda pair: pair[0])
+        self.keys = [key for key, _ in pairs]
+        self.values = [value for _, value in pairs]
+
+    def patched(self, removed: Iterable[Tuple[str, object]], added: Iterable[Tuple[str, object]]) -> "_SortedKeys":
+        """Copy with some pairs removed and others inserted in key order."""
+        clone = _SortedKeys([])
+        clone.keys, clone.values = list(self.keys), list(self.values)
+        for key, value in removed:
+            i = bisect.bisect_left(clone.keys, key)
+            while i < len(clone.keys) and clone.keys[i] == key:
+                if clone.values[i] == value:
+                    del clone.keys[i]
+                    del clone.values[i]
+                    break
+                i += 1
+        for key, value in added:
+            i = bisect.bisect_right(clone.keys, key)
+            clone.keys.insert(i, key)
+            clone.values.insert(i, value)
+        return clone
+
+    def prefixed(self, prefix: str):
+        """Values whose key starts with prefix, in key order."""
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + _HIGH, lo)
+        for i in range(lo, hi):
+            yield self.values[i]
+
+
+class _PrefixIndex:
+    """Immutable suggestion index over (id, name, category) rows."""
+
+    def __init__(self, rows: Iterable[Tuple[int, str, str]], generation: int = 0):
+        self.generation = generation
+        self.built_at = time.monotonic()
+        self.products = {}
+        # Products per category; a category is indexed while it has any
+        self.category_counts: Counter = Counter()
+        name_pairs, word_pairs, category_pairs = [], [], []
+        for pid, name, category in rows:
+            self.products[pid] = {"id": pid, "name": name, "category": category}
+            names, words = _name_pairs(pid, name)
+            name_pairs += names
+            word_pairs += words
+            if category:
+                self.category_counts[category] += 1
+                if self.category_counts[category] == 1:
+                    category_pairs += _category_pairs(category)
+        self.names = _SortedKeys(name_pairs)
+        self.words = _SortedKeys(word_pairs)
+        self.categories = _SortedKeys(category_pairs)
+
+    def patched(self, pid: int, row: Optional[Tuple[str, str]], generation: int) -> "_PrefixIndex":
+        """Copy with product `pid` set to (name, category), or removed if `row` is None."""
+        clone = copy.copy(self)
+        clone.generation = generation
+        clone.products = dict(self.products)
+        clone.category_counts = Counter(self.category_counts)
+        old_names, old_words, old_categories = [], [], []
+        new_names, new_words, new_categories = [], [], []
+        old = clone.products.pop(pid, None)
+        if old is not None:
+            old_names, old_words = _name_pairs(pid, old["name"])
+            category = old["category"]
+            if category:
+                clone.category_counts[category] -= 1
+                if clone.category_counts[category] <= 0:
+                    del clone.category_counts[category]
+                    old_categories = _category_pairs(category)
+        if row is not None:
+            name, category = row
+            clone.products[pid] = {"id": pid, "name": name, "category": category}
+            new_names, new_words = _name_pairs(pid, name)
+            if category:
+                clone.category_counts[category] += 1
+                if clone.category_counts[category] == 1:
+                    new_categories = _category_pairs(category)
+        clone.names = self.names.patched(old_names, new_names)
+        clone.words = self.words.patched(old_words, new_words)
+        clone.categories = self.categories.patched(old_categories, new_categories)
+        return clone
+
+    def lookup(self, query: str, limit: int = 8) -> dict:
+        """Up to `limit` products (names starting with the query first) and categories."""
+        prefix = _fold(query)
+        products: List[dict] = []
+        categories: List[str] = []
+        if prefix:
+            seen = set()
+            for source in (self.names, self.words):
+                for pid in source.prefixed(prefix):
+                    if len(products) >= limit:
+                        break
+                    if pid not in seen:
+                        seen.add(pid)
+                        products.append(self.products[pid])
+            for category in self.categories.prefixed(prefix):
+                if len(categories) >= limit:
+                    break
+                if category not in categories:
+                    categories.append(category)
+        return {"q": query, "products": products, "categories": categories}
+
+
+class ProductSuggest:
+    """Process-wide holder of the current suggestion index."""
+
+    _lock = threading.Lock()
+    _index: Optional[_PrefixIndex] = None
+
+    @staticmethod
+    def load() -> _PrefixIndex:
+        """Build the index from Postgres (one narrow query)."""
+        generation = get_generation('products')
+        rows = Product.objects.order_by().values_list('id', 'name', 'category')
+        return _PrefixIndex(rows, generation)
+
+    @staticmethod
+    def from_rows(rows: Iterable[Tuple[int, str, str]]) -> _PrefixIndex:
+        """Build an uncached index from given rows (mock fallback)."""
+        return _PrefixIndex(rows)
+
+    @staticmethod
+    def _fresh(index: Optional[_PrefixIndex]) -> bool:
+        if index is None or index.generation != get_generation('products'):
+            return False
+        return time.monotonic() - index.built_at < getattr(settings, 'CATALOG_CACHE_TTL', 300)
+
+    @staticmethod
+    def get() -> _PrefixIndex:
+        """Current index, rebuilt if missing, expired or built before the latest products write."""
+        index = ProductSuggest._index
+        if ProductSuggest._fresh(index):
+            return index
+        with ProductSuggest._lock:
+            index = ProductSuggest._index
+            if not ProductSuggest._fresh(index):
+                index = ProductSuggest._index = ProductSuggest.load()
+        return index
+
+    @staticmethod
+    def apply(pid: int, row: Optional[Tuple[str, str]], generation: int) -> None:
+        """Patch a loaded index with one product write.
+
+        `row` is (name, category), None for a delete; `generation` is the
+        products generation returned by that write's bump. An index that has
+        missed another write in between is dropped and reloaded lazily.
+        """
+        with ProductSuggest._lock:
+            index = ProductSuggest._index
+            if index is None or index.generation == generation:
+                return
+            if index.generation != generation - 1:
+                ProductSuggest._index = None
+                return
+            try:
+                ProductSuggest._index = index.patched(pid, row, generation)
+            except Exception as e:
+                logger.warning(f"Could not update product suggestions: {e}")
+                ProductSuggest._index = None
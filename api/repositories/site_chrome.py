@@ -0,0 +1,115 @@
+"""Versioned in-process snapshot of the site chrome.
+
+Hero, category brochures, site_config and categories are read on every page
+load but change about once a week from the admin. Each worker keeps one
+immutable SiteChrome built from them, tagged with the "site" row of
+cache_versions. Every read checks that row (a primary-key lookup) and
+reloads the snapshot only when a write has bumped it, so all workers pick up
+an admin save on their next request.
+"""
+import json
+import logging
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from django.db import transaction
+from django.db.models import F
+from api.cache.generations import bump_generation
+from api.models.cache_version import CacheVersion
+from api.models.category import Category
+from api.models.category_brochure import CategoryBrochure
+from api.models.hero import Hero
+from api.models.site_config import SiteConfig
+
+logger = logging.getLogger(__name__)
+
+_VERSION_NAME = "site"
+
+
+def _cfg(config: Dict[str, Any], k: str) -> dict:
+    """Get config value as dict."""
+    v = config.get(k)
+    if v is None:
+        return {}
+    if isinstance(v, dict):
+        return v
+    if isinstance(v, str):
+        try:
+            return json.loads(v)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+    return {}
+
+
+class SiteChrome(NamedTuple):
+    """One version of the site chrome. Shared by all requests: do not mutate."""
+    version: int
+    hero: Dict[str, str]
+    categories: Tuple[str, ...]
+    brochures: Tuple[dict, ...]
+    # brand / header / topbar / footer, parsed to dicts
+    config: Dict[str, dict]
+    # Body of /api/site
+    payload: dict
+
+
+def _build(version: int) -> SiteChrome:
+    hero_row = Hero.objects.first()
+    hero_dict = hero_row.to_dict() if hero_row else {}
+    hero = {
+        "promo": hero_dict.get("promo", "Summer Sale"),
+        "title": hero_dict.get("title", "Fresh Produce For Green Living"),
+        "subtitle": hero_dict.get("subtitle", "Up to 20% off on vegetables and fruits this week."),
+        "image": hero_dict.get("image", ""),
+        "buttonText": hero_dict.get("buttonText", "Shop Now"),
+    }
+    categories = tuple(Category.objects.values_list('name', flat=True))
+    brochures = tuple(
+        {"slug": b["slug"], "title": b["title"], "desc": b["desc"], "image": b["image"], "buttonText": b["button_text"]}
+        for b in (b.to_dict() for b in CategoryBrochure.objects.all())
+    )
+    rows = dict(SiteConfig.objects.values_list('key', 'value'))
+    config = {
+        "brand": _cfg(rows, "brand"),
+        "header": _cfg(rows, "brand") or _cfg(rows, "header"),
+        "topbar": _cfg(rows, "topbar"),
+        "footer": _cfg(rows, "footer"),
+    }
+    payload = {"hero": hero, "categories": list(categories), "brochures": list(brochures), **config}
+    return SiteChrome(version, hero, categories, brochures, config, payload)
+
+
+class SiteChromeRepository:
+    """Process-wide holder of the current SiteChrome."""
+
+    _lock = threading.Lock()
+    _snapshot: Optional[SiteChrome] = None
+
+    @staticmethod
+    def version() -> int:
+        """Current shared version (0 before the first write)."""
+        value = CacheVersion.objects.filter(name=_VERSION_NAME).values_list('version', flat=True).first()
+        return value or 0
+
+    @staticmethod
+    def get() -> SiteChrome:
+        """Snapshot at the current version, rebuilt if a write has bumped it."""
+        version = SiteChromeRepository.version()
+        snapshot = SiteChromeRepository._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with SiteChromeRepository._lock:
+            snapshot = SiteChromeRepository._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = SiteChromeRepository._snapshot = _build(version)
+        return snapshot
+
+    @staticmethod
+    def bump() -> None:
+        """Mark the chrome as changed (call after every hero/brochure/config/category write)."""
+        with transaction.atomic():
+            if not CacheVersion.objects.filter(name=_VERSION_NAME).update(version=F('version') + 1):
+                _, created = CacheVersion.objects.get_or_create(name=_VERSION_NAME, defaults={"version": 1})
+                if not created:
+                    CacheVersion.objects.filter(name=_VERSION_NAME).update(version=F('version') + 1)
+        SiteChromeRepository._snapshot = None
+        bump_generation('site')
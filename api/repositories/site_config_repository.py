@@ -1,7 +1,9 @@
 """SiteConfig repository for data access."""
 import json
 from typing import Dict, Any, Optional
+from api.cache.invalidation import InvalidationBus
 from api.models.site_config import SiteConfig
+from api.repositories.site_chrome import SiteChromeRepository
 
 
 class SiteConfigRepository:
@@ -25,10 +27,12 @@ class SiteConfigRepository:
     @staticmethod
     def set(key: str, value: Any) -> None:
         """Set site config."""
-        SiteConfig.objects.update_or_create(
-            key=key,
-            defaults={'value': value}
-        )
+        with InvalidationBus.writes():
+            SiteConfig.objects.update_or_create(
+                key=key,
+                defaults={'value': value}
+            )
+        SiteChromeRepository.bump()
     
     @staticmethod
     def update_brand(site_name: str, tagline: str, icon: str) -> None:
@@ -1,5 +1,6 @@
 """Services package."""
 from api.services.product_service import ProductService
 from api.services.news_service import NewsService
+from api.services.site_service import SiteService
 
-__all__ = ["ProductService", "NewsService"]
+__all__ = ["ProductService", "NewsService", "SiteService"]
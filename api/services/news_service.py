@@ -1,32 +1,73 @@
 """News service for business logic."""
 from typing import List, Optional
+from api.cache.results import ResultCache
 from api.models.news import News
 from api.repositories.news_repository import NewsRepository
 
 
 class NewsService:
     """Service for News business logic."""
+
+    # Serialized listing results, invalidated by every news write.
+    _results = ResultCache('news', 'news')
     
     @staticmethod
     def get_news(page: int = 1, limit: int = 6) -> tuple[List[dict], int, int]:
         """Get news with pagination."""
+        return NewsService._results.get_or_compute(
+            ("list", page, limit),
+            lambda: NewsService._load_news(page, limit),
+        )
+
+    @staticmethod
+    def _load_news(page: int, limit: int) -> tuple[List[dict], int, int]:
+        """Uncached get_news."""
         news_list, total = NewsRepository.get_all(page=page, limit=limit)
         items = [n.to_dict() for n in news_list]
         total_pages = max(1, (total + limit - 1) // limit)
         return items, total, total_pages
     
     @staticmethod
-    def get_news_by_id(id: int) -> Optional[dict]:
-        """Get news by ID."""
+    def get_news_page(page: int = 1, limit: int = 6, cursor: Optional[str] = None) -> dict:
+        """Get a news listing payload (keyset when `cursor` is given, else page/limit)."""
+        return NewsService._results.get_or_compute(
+            ("page", page, limit, cursor),
+            lambda: NewsService._load_news_page(page, limit, cursor),
+        )
+
+    @staticmethod
+    def _load_news_page(page: int, limit: int, cursor: Optional[str]) -> dict:
+        """Uncached get_news_page."""
+        if cursor is not None:
+            news_list, next_cursor = NewsRepository.get_page_after(cursor=cursor, limit=limit)
+            total = NewsRepository.count()
+        else:
+            news_list, total = NewsRepository.get_all(page=page, limit=limit)
+            next_cursor = None
+            if news_list and page * limit < total:
+                next_cursor = NewsRepository.cursor_after(news_list[-1])
+        return {
+            "items": [n.to_dict() for n in news_list],
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "totalPages": max(1, (total + limit - 1) // limit),
+            "nextCursor": next_cursor,
+        }
+    
+    @staticmethod
+    def get_news_by_id(id: int, rendered: bool = False) -> Optional[dict]:
+        """Get news by ID (`rendered` adds the stored detail page fields)."""
         news = NewsRepository.get_by_id(id)
-        return news.to_dict() if news else None
+        return news.to_dict(rendered=rendered) if news else None
     
     @staticmethod
     def _mock_news() -> List[dict]:
         """Mock news for fallback."""
         return [
             {"id": 1, "title": "Mùa Thu Hoạch Bơ Sáp 034", "image": "https://images.unsplash.com/photo-1523049673856-35691f096315?ixlib=rb-1.2.1&auto=format&fit=crop&w=600&q=80",
-             "content": "<p>Những trái bơ sáp 034 đầu tiên đã lên kệ.</p>", "author": "Admin", "date": "03/02/2026"},
+             "content": "<p>Những trái bơ sáp 034 đầu tiên đã lên kệ.</p>", "author": "Admin", "date": "03/02/2026",
+             "published_at": "2026-02-03T00:00:00+07:00"},
         ]
     
     @staticmethod
@@ -42,10 +83,26 @@ class NewsService:
             return items, total, 1
     
     @staticmethod
-    def get_news_by_id_with_mock_fallback(id: int) -> Optional[dict]:
+    def get_news_page_with_mock_fallback(page: int = 1, limit: int = 6, cursor: Optional[str] = None) -> dict:
+        """Get news listing payload with mock fallback if database unavailable."""
+        try:
+            return NewsService.get_news_page(page, limit, cursor)
+        except Exception:
+            items, total, total_pages = NewsService.get_news_with_mock_fallback(page, limit)
+            return {
+                "items": items,
+                "total": total,
+                "page": page,
+                "limit": limit,
+                "totalPages": total_pages,
+                "nextCursor": None,
+            }
+    
+    @staticmethod
+    def get_news_by_id_with_mock_fallback(id: int, rendered: bool = False) -> Optional[dict]:
         """Get news by ID with mock fallback."""
         try:
-            news = NewsService.get_news_by_id(id)
+            news = NewsService.get_news_by_id(id, rendered=rendered)
             if news:
                 return news
         except Exception as e:
@@ -1,19 +1,36 @@
 """Product service for business logic."""
 from typing import List, Optional
+from api.cache.results import ResultCache
 from api.models.product import Product
+from api.models.product_card import ProductCard
+from api.repositories.catalog_snapshot import CatalogSnapshot
+from api.repositories.product_count import ProductCount
 from api.repositories.product_repository import ProductRepository
+from api.repositories.product_suggest import ProductSuggest
+from api.utils.text import fold_diacritics
 
 
 class ProductService:
     """Service for Product business logic."""
+
+    # Serialized listing results, invalidated by every products write.
+    _results = ResultCache('products', 'products')
+
+    @staticmethod
+    def _cache_key(kind: str, category, price, standard, search, sort, page, limit, cursor=None, view="full") -> tuple:
+        """Normalized result-cache key for a listing call."""
+        return (
+            kind, *ProductCount.key(category, price, standard, search), (sort or "newest").lower(),
+            page, limit, cursor, "card" if view == "card" else "full",
+        )
     
     @staticmethod
     def apply_filters(items: List[Product], category: Optional[str], price: Optional[str], standard: Optional[str], search: Optional[str] = None) -> List[Product]:
         """Apply filters to product list."""
         out = items
         if search and search.strip():
-            q = search.strip().lower()
-            out = [x for x in out if q in (x.name or "").lower() or q in (x.description or "").lower()]
+            q = fold_diacritics(search.strip())
+            out = [x for x in out if q in fold_diacritics(x.name or "") or q in fold_diacritics(x.description or "")]
         if category:
             out = [x for x in out if x.category == category]
         if price == "under50":
@@ -39,6 +56,34 @@ class ProductService:
             return sorted(items, key=lambda x: (x.price or 0), reverse=True)
         return sorted(items, key=lambda x: x.id, reverse=True)
     
+    @staticmethod
+    def _query_snapshot(
+        category: Optional[str],
+        price: Optional[str],
+        standard: Optional[str],
+        search: Optional[str],
+        sort: str,
+        page: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        view: str = "full",
+    ) -> Optional[tuple[List[dict], int, Optional[str]]]:
+        """Serve a listing from the in-memory catalog snapshot if possible.
+
+        Returns (items, total, next_cursor), or None when the snapshot is off
+        or the query needs Postgres (text search is ranked by tsvector).
+        """
+        if search and search.strip():
+            return None
+        columns = CatalogSnapshot.get()
+        if columns is None:
+            return None
+        order_name, ordering = ProductRepository.ordering(sort, False)
+        items, total, next_cursor = columns.query(category, price, standard, order_name, ordering, page, limit, cursor)
+        if view == "card":
+            items = [ProductCard.project(item) for item in items]
+        return items, total, next_cursor
+
     @staticmethod
     def get_products(
         category: Optional[str] = None,
@@ -48,8 +93,33 @@ class ProductService:
         sort: str = "newest",
         page: int = 1,
         limit: int = 8,
+        view: str = "full",
     ) -> tuple[List[dict], int, int]:
-        """Get products with filters, sorting, and pagination."""
+        """Get products with filters, sorting, and pagination.
+
+        `view="card"` returns only the fields listing cards render (see ProductCard).
+        """
+        return ProductService._results.get_or_compute(
+            ProductService._cache_key("list", category, price, standard, search, sort, page, limit, view=view),
+            lambda: ProductService._load_products(category, price, standard, search, sort, page, limit, view),
+        )
+
+    @staticmethod
+    def _load_products(
+        category: Optional[str],
+        price: Optional[str],
+        standard: Optional[str],
+        search: Optional[str],
+        sort: str,
+        page: int,
+        limit: int,
+        view: str = "full",
+    ) -> tuple[List[dict], int, int]:
+        """Uncached get_products."""
+        served = ProductService._query_snapshot(category, price, standard, search, sort, page, limit, view=view)
+        if served is not None:
+            items, total, _ = served
+            return items, total, max(1, (total + limit - 1) // limit)
         products, total = ProductRepository.get_all(
             category=category,
             price=price,
@@ -58,16 +128,125 @@ class ProductService:
             sort=sort,
             page=page,
             limit=limit,
+            card=view == "card",
         )
         items = [p.to_dict() for p in products]
         total_pages = max(1, (total + limit - 1) // limit)
         return items, total, total_pages
     
     @staticmethod
-    def get_product(id: int) -> Optional[dict]:
-        """Get product by ID."""
+    def get_products_page(
+        category: Optional[str] = None,
+        price: Optional[str] = None,
+        standard: Optional[str] = None,
+        search: Optional[str] = None,
+        sort: str = "newest",
+        page: int = 1,
+        limit: int = 8,
+        cursor: Optional[str] = None,
+        view: str = "full",
+    ) -> dict:
+        """Get a products listing payload.
+
+        Uses keyset pagination when `cursor` is given (empty string = first
+        page), otherwise page/limit. Both modes return `nextCursor`;
+        `totalExact` is False when total/totalPages are planner estimates.
+        `view="card"` returns only the fields listing cards render.
+        """
+        return ProductService._results.get_or_compute(
+            ProductService._cache_key("page", category, price, standard, search, sort, page, limit, cursor, view),
+            lambda: ProductService._load_products_page(category, price, standard, search, sort, page, limit, cursor, view),
+        )
+
+    @staticmethod
+    def _load_products_page(
+        category: Optional[str],
+        price: Optional[str],
+        standard: Optional[str],
+        search: Optional[str],
+        sort: str,
+        page: int,
+        limit: int,
+        cursor: Optional[str],
+        view: str = "full",
+    ) -> dict:
+        """Uncached get_products_page."""
+        served = ProductService._query_snapshot(category, price, standard, search, sort, page, limit, cursor, view)
+        if served is not None:
+            items, total, next_cursor = served
+            return {
+                "items": items,
+                "total": total,
+                "page": page,
+                "limit": limit,
+                "totalPages": max(1, (total + limit - 1) // limit),
+                "totalExact": True,
+                "nextCursor": next_cursor,
+            }
+        filters = dict(category=category, price=price, standard=standard, search=search)
+        card = view == "card"
+        if cursor is not None:
+            products, next_cursor = ProductRepository.get_page_after(cursor=cursor, sort=sort, limit=limit, card=card, **filters)
+        else:
+            products, _ = ProductRepository.get_all(sort=sort, page=page, limit=limit, card=card, **filters)
+            next_cursor = None
+        # Served from the count cache; large result sets get a planner estimate
+        total, exact = ProductRepository.count(**filters)
+        if cursor is None and products and page * limit < total:
+            next_cursor = ProductRepository.cursor_after(products[-1], sort)
+        return {
+            "items": [p.to_dict() for p in products],
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "totalPages": max(1, (total + limit - 1) // limit),
+            "totalExact": exact,
+            "nextCursor": next_cursor,
+        }
+
+    @staticmethod
+    def get_facets_with_mock_fallback(
+        category: Optional[str] = None,
+        price: Optional[str] = None,
+        standard: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> dict:
+        """Get filter sidebar counts with mock fallback if database unavailable."""
+        try:
+            return ProductRepository.get_facets(category, price, standard, search)
+        except Exception:
+            mock = ProductService._mock_products_listing(None, None, None, search, "newest", 1, 1000)[0]
+            products = [
+                Product(id=x["id"], name=x["name"], category=x["category"], price=x["price"], tags=x["tags"])
+                for x in mock
+            ]
+
+            def _count(cat, pr, std):
+                return len(ProductService.apply_filters(products, cat, pr, std))
+
+            categories = sorted({p.category for p in products})
+            tags = sorted({t for p in products for t in (p.tags or [])})
+            return {
+                "categories": [{"value": c, "count": _count(c, price, standard)} for c in categories],
+                "price": [{"value": b, "count": _count(category, b, standard)} for b in ("under50", "50-200", "over200")],
+                "standards": [{"value": t, "count": _count(category, price, t)} for t in tags],
+                "total": _count(category, price, standard),
+            }
+
+    @staticmethod
+    def get_suggestions_with_mock_fallback(query: str, limit: int = 8) -> dict:
+        """Get search-box suggestions with mock fallback if database unavailable."""
+        try:
+            return ProductRepository.suggest(query, limit)
+        except Exception:
+            rows = [(x["id"], x["name"], x["category"]) for x in ProductService._mock_products()]
+            return ProductSuggest.from_rows(rows).lookup(query, limit)
+
+    @staticmethod
+    def get_product(id: int, rendered: bool = False) -> Optional[dict]:
+        """Get product by ID (`rendered` adds the detail page fields)."""
         product = ProductRepository.get_by_id(id)
-        return product.to_dict() if product else None
+        return product.to_dict(rendered=rendered) if product else None
     
     @staticmethod
     def _mock_products() -> List[dict]:
@@ -90,25 +269,70 @@ class ProductService:
         sort: str = "newest",
         page: int = 1,
         limit: int = 8,
+        view: str = "full",
     ) -> tuple[List[dict], int, int]:
         """Get products with mock fallback if database unavailable."""
         try:
-            return ProductService.get_products(category, price, standard, search, sort, page, limit)
+            return ProductService.get_products(category, price, standard, search, sort, page, limit, view)
+        except Exception:
+            return ProductService._mock_products_listing(category, price, standard, search, sort, page, limit, view)
+
+    @staticmethod
+    def get_products_page_with_mock_fallback(
+        category: Optional[str] = None,
+        price: Optional[str] = None,
+        standard: Optional[str] = None,
+        search: Optional[str] = None,
+        sort: str = "newest",
+        page: int = 1,
+        limit: int = 8,
+        cursor: Optional[str] = None,
+        view: str = "full",
+    ) -> dict:
+        """Get products listing payload with mock fallback if database unavailable."""
+        try:
+            return ProductService.get_products_page(category, price, standard, search, sort, page, limit, cursor, view)
         except Exception:
-            # Fallback to mock data
-            all_items = ProductService._mock_products()
-            products = []
-            for item in all_items:
-                item_dict = dict(item)
-                if "originalPrice" in item_dict:
-                    item_dict["original_price"] = item_dict.pop("originalPrice")
-                if "isHot" in item_dict:
-                    item_dict["is_hot"] = item_dict.pop("isHot")
-                products.append(Product(**item_dict))
-            products = ProductService.apply_filters(products, category, price, standard, search)
-            total = len(products)
-            products = ProductService.sort_products(products, sort)
-            start = (page - 1) * limit
-            items = [p.to_dict() for p in products[start : start + limit]]
-            total_pages = max(1, (total + limit - 1) // limit)
-            return items, total, total_pages
+            items, total, total_pages = ProductService._mock_products_listing(
+                category, price, standard, search, sort, page, limit, view
+            )
+            return {
+                "items": items,
+                "total": total,
+                "page": page,
+                "limit": limit,
+                "totalPages": total_pages,
+                "totalExact": True,
+                "nextCursor": None,
+            }
+
+    @staticmethod
+    def _mock_products_listing(
+        category: Optional[str],
+        price: Optional[str],
+        standard: Optional[str],
+        search: Optional[str],
+        sort: str,
+        page: int,
+        limit: int,
+        view: str = "full",
+    ) -> tuple[List[dict], int, int]:
+        """Filter, sort and paginate mock products."""
+        all_items = ProductService._mock_products()
+        products = []
+        for item in all_items:
+            item_dict = dict(item)
+            if "originalPrice" in item_dict:
+                item_dict["original_price"] = item_dict.pop("originalPrice")
+            if "isHot" in item_dict:
+                item_dict["is_hot"] = item_dict.pop("isHot")
+            products.append(Product(**item_dict))
+        products = ProductService.apply_filters(products, category, price, standard, search)
+        total = len(products)
+        products = ProductService.sort_products(products, sort)
+        start = (page - 1) * limit
+        items = [p.to_dict() for p in products[start : start + limit]]
+        if view == "card":
+            items = [ProductCard.project(item) for item in items]
+        total_pages = max(1, (total + limit - 1) // limit)
+        return items, total, total_pages
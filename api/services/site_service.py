@@ -0,0 +1,71 @@
+"""Site chrome and footer pages service."""
+from typing import List, Optional, Sequence, Tuple
+from api.cache.results import ResultCache
+from api.repositories.cache_version_repository import CacheVersionRepository
+from api.repositories.page_repository import PageRepository
+from api.repositories.site_chrome import SiteChromeRepository
+
+# Served when the database is unavailable
+_FALLBACK_SITE = {
+    "hero": {
+        "promo": "Summer Sale",
+        "title": "Fresh Produce For Green Living",
+        "subtitle": "Up to 20% off.",
+        "image": "https://images.unsplash.com/photo-1542838132-92c53300491e?w=1920&q=80",
+        "buttonText": "Shop Now"
+    },
+    "categories": ["Rau củ quả", "Hạt & Ngũ cốc", "Gia dụng"],
+    "brochures": [],
+    "topbar": {"freeShipping": "Free shipping for orders over 500k", "hotline": "1900 1234", "support": "Customer Support"},
+    "footer": {"address": "123 Đường Mây Núi, Đà Lạt", "phone": "1900 1234", "email": "cskh@mountainharvest.vn"},
+}
+
+
+class SiteService:
+    """Service for the site-wide data every page loads (/api/site, /api/pages)."""
+
+    # Footer links, invalidated by page writes.
+    _pages = ResultCache('pages', 'pages')
+
+    @staticmethod
+    def get_site() -> dict:
+        """Hero, categories, brochures and brand/topbar/footer config (shared; do not mutate)."""
+        return SiteChromeRepository.get().payload
+
+    @staticmethod
+    def get_site_versioned() -> Tuple[Optional[int], dict]:
+        """(chrome version, get_site()), or (None, static defaults) if the database is unavailable."""
+        try:
+            chrome = SiteChromeRepository.get()
+            return chrome.version, chrome.payload
+        except Exception:
+            return None, _FALLBACK_SITE
+
+    @staticmethod
+    def get_site_with_fallback() -> dict:
+        """get_site, or static defaults if the database is unavailable."""
+        return SiteService.get_site_versioned()[1]
+
+    @staticmethod
+    def get_footer_pages() -> List[dict]:
+        """Public pages (slug, title) for footer links."""
+        return SiteService._pages.get_or_compute(
+            ("footer",),
+            lambda: [{"slug": p["slug"], "title": p.get("title", "")} for p in PageRepository.get_all()],
+        )
+
+    @staticmethod
+    def get_footer_pages_with_fallback() -> List[dict]:
+        """get_footer_pages, or no links if the database is unavailable."""
+        try:
+            return SiteService.get_footer_pages()
+        except Exception:
+            return []
+
+    @staticmethod
+    def get_table_versions(tables: Sequence[str]) -> Optional[Tuple[int, ...]]:
+        """Shared write counters of `tables` (same in every worker), None if the database is unavailable."""
+        try:
+            return CacheVersionRepository.get_table_versions(tables)
+        except Exception:
+            return None
@@ -0,0 +1,415 @@
+"""Tests for the api app (need the Postgres database from settings: python manage.py test api)."""
+import re
+from unittest import mock, skipIf
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from api.cache import invalidation
+from api.cache.generations import bump_generation
+from api.cache.invalidation import InvalidationBus
+from api.models.news import News
+from api.models.page import Page
+from api.models.product import Product
+from api.repositories import news_related
+from api.repositories.product_count import ProductCount
+from api.repositories.product_repository import ProductRepository
+from api.repositories.product_facets import ProductFacets
+from api.repositories.product_search import ProductSearch
+from api.repositories.product_suggest import _PrefixIndex
+from api.services.product_service import ProductService
+from api.views import seo_views
+from api.views.home_views import HomeViews
+
+
+class BestsellerCursorTests(TestCase):
+    """Keyset pagination on ("-reviews", "-id")."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Product.objects.bulk_create(
+            Product(name=f"P{i}", category="Rau", price=1000 + i, reviews=reviews)
+            for i, reviews in enumerate([5, 0, 0, 3, 0, 5, 0])
+        )
+
+    def test_walks_every_row_once_across_zero_reviews(self):
+        seen, cursor = [], None
+        for _ in range(10):
+            products, cursor = ProductRepository.get_page_after(cursor=cursor, sort="bestseller", limit=2)
+            seen.extend(p.id for p in products)
+            if cursor is None:
+                break
+        expected = list(Product.objects.order_by('-reviews', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_reviews_column_rejects_null(self):
+        # A NULL here would be encoded into the cursor and sort first under DESC
+        product = Product.objects.first()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("UPDATE products SET reviews = NULL WHERE id = %s", [product.id])
+
+
+class RelevanceCursorTests(TestCase):
+    """Keyset pagination on ("-search_rank", "-id") through groups of tied ranks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        names = ["Cà chua bi", "Cà chua bi", "Cà chua bi", "Cà chua bi", "Cà chua bi Đà Lạt", "Nước ép cà chua", "Cà chua bi"]
+        Product.objects.bulk_create(
+            Product(name=name, category="Rau", price=1000 + i, description="Cà chua hữu cơ")
+            for i, name in enumerate(names)
+        )
+        ProductSearch.reindex()
+
+    def test_walks_tied_ranks_once(self):
+        seen, cursor = [], None
+        for _ in range(10):
+            products, cursor = ProductRepository.get_page_after(cursor=cursor, search="ca chua", limit=2)
+            seen.extend(p.id for p in products)
+            if cursor is None:
+                break
+        queryset, _ = ProductSearch.apply(Product.objects.all(), "ca chua")
+        expected = list(queryset.order_by('-search_rank', '-id').values_list('id', flat=True))
+        self.assertEqual(len(expected), 7)
+        self.assertEqual(seen, expected)
+
+
+class ProductCountTests(TestCase):
+    """Exact counts below CATALOG_COUNT_ESTIMATE_THRESHOLD, planner estimates above it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Product.objects.bulk_create(Product(name=f"P{i}", category="Rau", price=1000 + i) for i in range(4))
+
+    def setUp(self):
+        bump_generation('products', propagate=False)
+
+    @override_settings(CATALOG_COUNT_ESTIMATE_THRESHOLD=10)
+    def test_large_estimate_is_reported_as_inexact(self):
+        with mock.patch.object(ProductCount, 'estimate', return_value=500):
+            self.assertEqual(ProductCount.get(Product.objects.all(), ("count-large",)), (500, False))
+
+    @override_settings(CATALOG_COUNT_ESTIMATE_THRESHOLD=10)
+    def test_small_filter_set_skips_the_estimate_after_an_exact_count(self):
+        key = ("count-small",)
+        with mock.patch.object(ProductCount, 'estimate', return_value=3) as estimate:
+            self.assertEqual(ProductCount.get(Product.objects.all(), key), (4, True))
+            bump_generation('products', propagate=False)
+            self.assertEqual(ProductCount.get(Product.objects.all(), key), (4, True))
+        self.assertEqual(estimate.call_count, 1)
+
+    @override_settings(CATALOG_COUNT_ESTIMATE_THRESHOLD=0)
+    def test_zero_threshold_always_counts(self):
+        with mock.patch.object(ProductCount, 'estimate') as estimate:
+            self.assertEqual(ProductCount.get(Product.objects.all(), ("count-exact",)), (4, True))
+        estimate.assert_not_called()
+
+
+class ProductFacetsTests(TestCase):
+    """Grouped facet query against the in-Python filters of the mock fallback."""
+
+    ROWS = [
+        ("Cà chua", "Rau", 30000, ["Organic"]),
+        ("Cải xanh", "Rau", 60000, ["Organic", "VietGAP"]),
+        ("Mật ong", "Khô", 250000, ["Handmade"]),
+        ("Gạo lứt", "Khô", 80000, []),
+        ("Trà shan", "Khô", 45000, ["Organic", "Handmade"]),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        Product.objects.bulk_create(
+            Product(name=name, category=category, price=price, tags=tags)
+            for name, category, price, tags in cls.ROWS
+        )
+
+    def setUp(self):
+        bump_generation('products', propagate=False)
+
+    def expected(self, category, price, standard):
+        products = list(Product.objects.all())
+
+        def count(cat, pr, std):
+            return len(ProductService.apply_filters(products, cat, pr, std))
+
+        return {
+            "categories": [{"value": c, "count": count(c, price, standard)} for c in ("Khô", "Rau")],
+            "price": [{"value": b, "count": count(category, b, standard)} for b in ("under50", "50-200", "over200")],
+            "standards": [{"value": t, "count": count(category, price, t)} for t in ("Handmade", "Organic", "VietGAP")],
+            "total": count(category, price, standard),
+        }
+
+    def test_counts_match_every_other_filter(self):
+        for filters in [(None, None, None), ("Rau", None, None), (None, "under50", "Organic"), ("Khô", "over200", "Handmade")]:
+            with self.subTest(filters=filters):
+                self.assertEqual(ProductFacets.get(*filters), self.expected(*filters))
+
+
+class SuggestIndexTests(SimpleTestCase):
+    """Patched suggestion index against one rebuilt from the final rows."""
+
+    ROWS = {
+        1: ("Cà Chua Cherry", "Rau củ quả"),
+        2: ("Gạo Lứt Đỏ", "Thực phẩm khô"),
+        3: ("Chè Shan Tuyết", "Đồ uống"),
+        4: ("Cà Phê Arabica", "Đồ uống"),
+    }
+
+    def assertSameIndex(self, patched, rows):
+        rebuilt = _PrefixIndex((pid, name, category) for pid, (name, category) in rows.items())
+        self.assertEqual(patched.products, rebuilt.products)
+        self.assertEqual(+patched.category_counts, +rebuilt.category_counts)
+        for part in ("names", "words", "categories"):
+            ours, theirs = getattr(patched, part), getattr(rebuilt, part)
+            self.assertEqual(ours.keys, sorted(ours.keys), part)
+            self.assertEqual(sorted(zip(ours.keys, ours.values)), sorted(zip(theirs.keys, theirs.values)), part)
+        for query in ("ca", "do", "che", "tra", "uong"):
+            self.assertEqual(
+                sorted(p["id"] for p in patched.lookup(query, 10)["products"]),
+                sorted(p["id"] for p in rebuilt.lookup(query, 10)["products"]),
+            )
+            self.assertEqual(sorted(patched.lookup(query, 10)["categories"]), sorted(rebuilt.lookup(query, 10)["categories"]))
+
+    def test_patches_match_a_rebuild(self):
+        rows = dict(self.ROWS)
+        index = _PrefixIndex((pid, name, category) for pid, (name, category) in rows.items())
+        steps = [
+            (1, ("Cà Chua Bi Đà Lạt", "Rau củ quả")),  # rename
+            (5, ("Trà Ô Long", "Đồ uống")),  # insert
+            (2, ("Gạo Lứt Đỏ", "Gạo")),  # last product of a category moves
+            (3, None),  # delete
+            (4, None),
+            (5, None),  # category emptied
+        ]
+        for generation, (pid, row) in enumerate(steps, start=1):
+            index = index.patched(pid, row, generation)
+            if row is None:
+                rows.pop(pid)
+            else:
+                rows[pid] = row
+            with self.subTest(step=generation):
+                self.assertSameIndex(index, rows)
+
+    def test_patch_leaves_the_original_untouched(self):
+        index = _PrefixIndex((pid, name, category) for pid, (name, category) in self.ROWS.items())
+        index.patched(1, None, 1)
+        self.assertSameIndex(index, self.ROWS)
+
+
+class PageWindowTests(SimpleTestCase):
+    """Pagination links: first, last and two pages either side; None is a gap."""
+
+    def test_windows(self):
+        cases = {
+            (1, 1): [1],
+            (1, 10): [1, 2, 3, None, 10],
+            (5, 10): [1, 2, 3, 4, 5, 6, 7, None, 10],
+            (6, 10): [1, None, 4, 5, 6, 7, 8, 9, 10],
+            (10, 10): [1, None, 8, 9, 10],
+            (3, 5): [1, 2, 3, 4, 5],
+        }
+        for (page, total), expected in cases.items():
+            with self.subTest(page=page, total=total):
+                self.assertEqual(HomeViews._page_window(page, total), expected)
+
+    def test_gap_always_hides_more_than_one_page(self):
+        for total in range(1, 15):
+            for page in range(1, total + 1):
+                window = HomeViews._page_window(page, total)
+                numbers = [n for n in window if n is not None]
+                self.assertEqual(numbers, sorted(set(numbers)))
+                self.assertEqual((numbers[0], numbers[-1]), (1, total))
+                self.assertTrue(set(range(max(1, page - 2), min(total, page + 2) + 1)) <= set(numbers))
+                for before, gap, after in zip(window, window[1:], window[2:]):
+                    if gap is None:
+                        self.assertGreater(after - before, 2)
+                for before, after in zip(window, window[1:]):
+                    if before is not None and after is not None:
+                        self.assertEqual(after - before, 1)
+
+
+@override_settings(SITEMAP_CHUNK_SIZE=3)
+class SitemapChunkTests(TestCase):
+    """Child sitemaps split each section into SITEMAP_CHUNK_SIZE URLs, without gaps or repeats."""
+
+    BASE = "https://example.com"
+
+    @classmethod
+    def setUpTestData(cls):
+        # Created out of sort order: chunks follow (sort_order, id)
+        Page.objects.bulk_create(Page(slug=f"p{i}", title=f"P{i}", sort_order=(i * 3) % 5) for i in range(5))
+        Product.objects.bulk_create(Product(name=f"P{i}", category="Rau", price=1000) for i in range(7))
+
+    def setUp(self):
+        bump_generation('pages', propagate=False)
+        bump_generation('products', propagate=False)
+
+    def chunks(self, section):
+        return [
+            re.findall(r"<loc>([^<]+)</loc>", "".join(seo_views._iter_chunk(self.BASE, section, number)))
+            for number in range(1, seo_views._chunk_count(section) + 1)
+        ]
+
+    def test_pages_start_with_the_home_page(self):
+        chunks = self.chunks("pages")
+        slugs = Page.objects.order_by('sort_order', 'id').values_list('slug', flat=True)
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3])
+        self.assertEqual(sum(chunks, []), [f"{self.BASE}/"] + [f"{self.BASE}/p/{slug}" for slug in slugs])
+
+    def test_products_fill_whole_chunks(self):
+        chunks = self.chunks("products")
+        ids = Product.objects.order_by('id').values_list('id', flat=True)
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        self.assertEqual(sum(chunks, []), [f"{self.BASE}/products/{pid}" for pid in ids])
+
+    def test_chunk_past_the_end_is_not_found(self):
+        self.assertEqual(self.client.get("/sitemap-pages-3.xml").status_code, 404)
+
+
+class NewsFeedTests(TestCase):
+    """Atom feed validators are derived from the listed rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.news = [News.objects.create(title=f"Tin {i}", content=f"<p>Nội dung {i}</p>") for i in range(3)]
+
+    def setUp(self):
+        bump_generation('news', propagate=False)
+
+    def fetch(self, **headers):
+        response = self.client.get("/news/feed.xml", **headers)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.fetch()["ETag"]
+        self.assertEqual(self.fetch(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_etag_survives_a_rebuild_and_follows_edits(self):
+        etag = self.fetch()["ETag"]
+        bump_generation('news', propagate=False)
+        self.assertEqual(self.fetch()["ETag"], etag)
+        self.news[0].title = "Tin sửa"
+        self.news[0].save()
+        bump_generation('news', propagate=False)
+        self.assertNotEqual(self.fetch()["ETag"], etag)
+
+
+@skipIf(news_related.np is None, "NumPy is not installed")
+class RelatedNewsIndexTests(SimpleTestCase):
+    """Patched TF-IDF neighbour lists against lists rebuilt from every article."""
+
+    ARTICLES = {
+        1: ("Mùa mận Bắc Hà", "Mận hậu Bắc Hà vào mùa, nông dân thu hoạch mận chín đỏ trên đồi."),
+        2: ("Mật ong rừng Tây Bắc", "Mật ong rừng nguyên chất được thu hoạch từ tổ ong trên núi cao."),
+        3: ("Chè Shan Tuyết cổ thụ", "Chè Shan Tuyết hái từ cây chè cổ thụ trên núi cao Tây Bắc."),
+        4: ("Gạo nếp nương", "Gạo nếp nương Tây Bắc dẻo thơm, nông dân gieo trên nương."),
+        5: ("Thu hoạch mận hậu", "Mận hậu Mộc Châu chín rộ, thu hoạch mận để bán khắp nơi."),
+        6: ("Mật ong hoa bạc hà", "Ong lấy mật từ hoa bạc hà trên cao nguyên đá, mật ong thơm."),
+        7: ("Chè xanh Thái Nguyên", "Chè xanh hái búp non, sao chè bằng chảo gang."),
+    }
+    K = 2
+
+    def assertRebuilt(self, index, articles):
+        """Every stored list equals the one computed from scratch with the index's vocabulary."""
+        self.assertEqual(sorted(index.pos), sorted(articles))
+        self.assertEqual(sorted(index.neighbours), sorted(articles))
+        for nid, (title, content) in articles.items():
+            vector = index._vector(news_related._terms(title, content))
+            self.assertTrue(news_related.np.allclose(index.matrix[index.pos[nid]], vector, atol=1e-6))
+        for nid in articles:
+            expected = index._row_neighbours(nid)
+            listed = index.neighbours[nid]
+            self.assertEqual([i for _, i in listed], [i for _, i in expected], f"article {nid}")
+            for (ours, _), (theirs, _) in zip(listed, expected):
+                self.assertAlmostEqual(ours, theirs, places=5)
+
+    def build(self, articles):
+        return news_related._Index([(nid, title, content) for nid, (title, content) in articles.items()], self.K)
+
+    def test_fresh_index(self):
+        self.assertRebuilt(self.build(self.ARTICLES), self.ARTICLES)
+
+    def test_upserts(self):
+        articles = dict(self.ARTICLES)
+        index = self.build(articles)
+        edits = [
+            (2, ("Mận Bắc Hà chín", "Nông dân Bắc Hà thu hoạch mận hậu chín đỏ.")),  # joins the mận articles
+            (8, ("Mật ong bạc hà", "Mật ong hoa bạc hà thơm, thu hoạch trên cao nguyên.")),  # new article
+            (1, ("Gạo nương", "Gạo nếp nương dẻo thơm.")),  # leaves the mận lists
+        ]
+        for nid, article in edits:
+            before = dict(index.neighbours)
+            changed = index.upsert(nid, *article)
+            articles[nid] = article
+            with self.subTest(nid=nid):
+                self.assertRebuilt(index, articles)
+                self.assertEqual(
+                    {i for i in index.neighbours if before.get(i) != index.neighbours[i]} | {nid},
+                    set(changed),
+                )
+
+    def test_remove(self):
+        articles = dict(self.ARTICLES)
+        index = self.build(articles)
+        before = dict(index.neighbours)
+        changed = index.remove([5, 6, 99])
+        del articles[5], articles[6]
+        self.assertRebuilt(index, articles)
+        self.assertEqual({i for i in index.neighbours if before[i] != index.neighbours[i]}, set(changed))
+        self.assertEqual(index.remove([99]), [])
+
+
+@mock.patch.object(InvalidationBus, 'writer', return_value="me:1:aa")
+@mock.patch.object(InvalidationBus, 'dispatch')
+class InvalidationEventTests(SimpleTestCase):
+    """Events of other writers are dispatched; untagged ones also propagate."""
+
+    def test_batch_skips_own_writes(self, dispatch, writer):
+        InvalidationBus._dispatch_events([
+            ("news", "1", "me:1:aa"),
+            ("news", "2", "other:2:bb"),
+            ("news", "3", None),
+            ("news", "2", "other:2:bb"),
+            ("products", "4", "other:2:bb"),
+        ])
+        self.assertEqual(dispatch.call_args_list, [
+            mock.call("news", "2", propagate=True),
+            mock.call("news", "3", propagate=False),
+            mock.call("products", "4", propagate=False),
+        ])
+
+    def test_large_batch_invalidates_the_table(self, dispatch, writer):
+        events = [("products", str(i), "other:2:bb") for i in range(invalidation._MAX_ROW_EVENTS + 1)]
+        InvalidationBus._dispatch_events(events)
+        dispatch.assert_called_once_with("products", None, propagate=False)
+
+    def test_notifications(self, dispatch, writer):
+        InvalidationBus._receive('{"table": "news", "id": 1, "writer": "me:1:aa"}')
+        InvalidationBus._receive('{"table": "news", "id": 2, "writer": "other:2:bb"}')
+        InvalidationBus._receive('{"table": "pages", "id": 3, "writer": null}')
+        with self.assertLogs(invalidation.logger, 'WARNING'):
+            InvalidationBus._receive('{"id": 4}')
+        self.assertEqual(dispatch.call_args_list, [
+            mock.call("news", "2", propagate=False),
+            mock.call("pages", "3", propagate=True),
+        ])
+
+    def test_polling_reads_each_event_once(self, dispatch, writer):
+        cursor = mock.MagicMock()
+        with mock.patch.multiple(InvalidationBus, _xmin=None, _recent=set(), _checked_at=0.0):
+            # First read only records the position
+            cursor.fetchone.return_value = (100,)
+            InvalidationBus._read_events(cursor, dispatch=True)
+            dispatch.assert_not_called()
+            # Transaction 101 is still open at the next read; its event is handled once
+            cursor.fetchone.return_value = (101,)
+            cursor.fetchall.return_value = [(1, "news", "5", None, 100), (2, "news", "6", "other:2:bb", 101)]
+            InvalidationBus._read_events(cursor, dispatch=True)
+            cursor.fetchone.return_value = (102,)
+            cursor.fetchall.return_value = [(2, "news", "6", "other:2:bb", 101), (3, "news", "7", "me:1:aa", 101)]
+            InvalidationBus._read_events(cursor, dispatch=True)
+        self.assertEqual(dispatch.call_args_list, [
+            mock.call("news", "5", propagate=True),
+            mock.call("news", "6", propagate=False),
+        ])
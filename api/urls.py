@@ -32,25 +32,31 @@ urlpatterns = [
     path('admin/site/topbar', admin_views_wrapper.admin_site_topbar, name='admin_site_topbar'),
     path('admin/site/footer', admin_views_wrapper.admin_site_footer, name='admin_site_footer'),
     path('admin/site/brochure/<str:slug>/edit', admin_views_wrapper.admin_site_brochure_edit, name='admin_site_brochure_edit'),
+    path('admin/cache-stats', admin_views_wrapper.admin_cache_stats, name='admin_cache_stats'),
     
     # Frontend routes
     path('', frontend_views.index, name='index'),
+    path('news/feed.xml', seo_views.news_feed, name='news_feed'),
     path('news/<int:id>/', frontend_views.news_detail, name='news_detail'),
     path('products/<int:id>/', frontend_views.product_detail, name='product_detail'),
     path('p/<str:slug>/', frontend_views.page_detail, name='page_detail'),
     
     # API routes
     path('api/products', api_views.api_products, name='api_products'),
+    path('api/products/facets', api_views.api_product_facets, name='api_product_facets'),
+    path('api/products/suggest', api_views.api_product_suggest, name='api_product_suggest'),
     path('api/products/<int:id>', api_views.api_product_detail, name='api_product_detail'),
     path('api/news', api_views.api_news, name='api_news'),
     path('api/news/<int:id>', api_views.api_news_detail, name='api_news_detail'),
     path('api/news/<int:id>/related', api_views.api_news_related, name='api_news_related'),
     path('api/site', api_views.api_site, name='api_site'),
     path('api/pages', api_views.api_pages, name='api_pages'),
+    path('api/bootstrap', api_views.api_bootstrap, name='api_bootstrap'),
     path('api/newsletter/subscribe', api_views.api_newsletter_subscribe, name='api_newsletter_subscribe'),
     
     # SEO routes
     path('sitemap.xml', seo_views.sitemap, name='sitemap'),
+    path('sitemap-<slug:section>-<int:number>.xml', seo_views.sitemap_chunk, name='sitemap_chunk'),
     path('robots.txt', seo_views.robots, name='robots'),
 ]
 
@@ -0,0 +1,4 @@
+"""Shared helpers."""
+from api.utils.text import fold_diacritics
+
+__all__ = ["fold_diacritics"]
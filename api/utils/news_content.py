@@ -0,0 +1,166 @@
+"""Derived fields of news article HTML.
+
+NewsRepository stores these on the row when an article is written (and the
+backfill_news_content command fills older rows), so the detail and listing
+renderers read them instead of re-running the regex passes per request. The
+renderers still call derive_news_fields for mock data and rows without them.
+The free-form `date` label is likewise parsed once into `published_at`.
+"""
+import re
+from datetime import datetime
+from html import unescape
+from typing import Optional
+from django.utils import timezone
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'\w+')
+
+EXCERPT_LENGTH = 150
+DESCRIPTION_LENGTH = 160
+DEFAULT_DESCRIPTION = "Tin tức từ Mountain Harvest"
+# Formats accepted in News.date (admin date input, legacy seeds)
+DATE_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%m/%d/%Y")
+
+
+def normalize_content_headers(html: str) -> str:
+    """Chuẩn SEO: H1->H2, H2->H3, H3->H4 trong content (page đã có H1)."""
+    if not html or not isinstance(html, str):
+        return html or ""
+    # Thay từ cao xuống thấp để tránh replace trùng
+    html = re.sub(r'<h3\b', '<h4', html, flags=re.IGNORECASE)
+    html = re.sub(r'</h3>', '</h4>', html)
+    html = re.sub(r'<h2\b', '<h3', html, flags=re.IGNORECASE)
+    html = re.sub(r'</h2>', '</h3>', html)
+    html = re.sub(r'<h1\b', '<h2', html, flags=re.IGNORECASE)
+    html = re.sub(r'</h1>', '</h2>', html)
+    return html
+
+
+def clean_content_html(html_content: str) -> str:
+    """Remove empty paragraphs and clean up whitespace."""
+    if not html_content:
+        return html_content
+    # Remove empty paragraphs (with optional whitespace, <br>, &nbsp;, etc.)
+    # Pattern 1: <p>...</p> with only whitespace, <br>, or &nbsp;
+    html_content = re.sub(
+        r'<p[^>]*>\s*(?:<br\s*/?>|\&nbsp;|\s|&nbsp;)*\s*</p>',
+        '',
+        html_content,
+        flags=re.IGNORECASE | re.MULTILINE
+    )
+    # Pattern 2: <p class="...">...</p> with only whitespace
+    html_content = re.sub(
+        r'<p[^>]*class="[^"]*">\s*(?:<br\s*/?>|\&nbsp;|\s|&nbsp;)*\s*</p>',
+        '',
+        html_content,
+        flags=re.IGNORECASE | re.MULTILINE
+    )
+    # Pattern 3: Paragraphs with only single <br> tag
+    html_content = re.sub(
+        r'<p[^>]*>\s*<br\s*/?>\s*</p>',
+        '',
+        html_content,
+        flags=re.IGNORECASE | re.MULTILINE
+    )
+    # Pattern 4: Paragraphs with only &nbsp; entities
+    html_content = re.sub(
+        r'<p[^>]*>\s*(?:&nbsp;|\&#160;|\u00A0|\s)+\s*</p>',
+        '',
+        html_content,
+        flags=re.IGNORECASE | re.MULTILINE
+    )
+    # Remove multiple consecutive empty paragraphs (after cleaning)
+    html_content = re.sub(
+        r'(</p>\s*){2,}(<p[^>]*>\s*</p>\s*)*',
+        '</p>',
+        html_content,
+        flags=re.IGNORECASE
+    )
+    # Clean up excessive line breaks within content (more than 2 consecutive)
+    html_content = re.sub(
+        r'(<br\s*/?>\s*){3,}',
+        '<br><br>',
+        html_content,
+        flags=re.IGNORECASE
+    )
+    # Remove leading/trailing empty paragraphs
+    html_content = re.sub(
+        r'^\s*(?:<p[^>]*>\s*</p>\s*)+',
+        '',
+        html_content,
+        flags=re.IGNORECASE | re.MULTILINE
+    )
+    html_content = re.sub(
+        r'(?:<p[^>]*>\s*</p>\s*)+$',
+        '',
+        html_content,
+        flags=re.IGNORECASE | re.MULTILINE
+    )
+    return html_content
+
+
+def process_content_images(html_content: str) -> str:
+    """Process content HTML to make images full-width and add responsive classes."""
+    if not html_content:
+        return html_content
+    # Add news-content-img class to all images
+    # Handle images with existing class attribute
+    html_content = re.sub(
+        r'<img([^>]*?)\s+class=["\']([^"\']*?)["\']([^>]*?)>',
+        lambda m: f'<img{m.group(1)} class="{m.group(2)} news-content-img"{m.group(3)}>',
+        html_content,
+        flags=re.IGNORECASE
+    )
+    # Handle images without class attribute
+    html_content = re.sub(
+        r'<img((?:(?!\s+class=)[^>])*)>',
+        r'<img class="news-content-img"\1>',
+        html_content,
+        flags=re.IGNORECASE
+    )
+    return html_content
+
+
+def strip_tags(html: Optional[str]) -> str:
+    """Text of an HTML fragment (tags removed, entities kept)."""
+    return _TAG_RE.sub('', html or '')
+
+
+def news_excerpt(content: Optional[str]) -> str:
+    """Listing card excerpt: first 150 characters of the text, '...' if cut (unescaped)."""
+    text = strip_tags(content).strip()
+    return text[:EXCERPT_LENGTH] + ("..." if len(text) > EXCERPT_LENGTH else "")
+
+
+def derive_news_fields(content: Optional[str]) -> dict:
+    """Values of the derived News columns for a given `content`."""
+    content_raw = content or ""
+    # Content saved as escaped HTML (e.g. pasted from the editor's source view)
+    if content_raw and ('&lt;' in content_raw or '&gt;' in content_raw or '&amp;' in content_raw):
+        if '&lt;p' in content_raw or '&lt;div' in content_raw or '&lt;h' in content_raw:
+            content_raw = unescape(content_raw)
+    # The detail page has its own H1, so content headings move down one level
+    normalized = normalize_content_headers(content_raw)
+    text = strip_tags(normalized)
+    word_count = len(_WORD_RE.findall(text))
+    description = text.strip()[:DESCRIPTION_LENGTH] if text.strip() else DEFAULT_DESCRIPTION
+    return {
+        "content_html": process_content_images(clean_content_html(normalized)),
+        "excerpt": news_excerpt(content),
+        "word_count": word_count,
+        "reading_minutes": max(1, word_count // 200) if word_count else 1,
+        "description_auto": description,
+    }
+
+
+def parse_news_date(date_str: Optional[str]) -> Optional[datetime]:
+    """Publication time of a News.date label (local midnight), None if unparseable."""
+    if not date_str or not isinstance(date_str, str):
+        return None
+    s = date_str.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return timezone.make_aware(datetime.strptime(s, fmt))
+        except ValueError:
+            continue
+    return None
@@ -0,0 +1,21 @@
+"""Text helpers shared by views, repositories and search."""
+import unicodedata
+
+# Vietnamese vowel groups folded to their base letter (same mapping as slugs).
+_FOLD_GROUPS = {
+    'a': 'àáạảãâầấậẩẫăằắặẳẵ',
+    'e': 'èéẹẻẽêềếệểễ',
+    'i': 'ìíịỉĩ',
+    'o': 'òóọỏõôồốộổỗơờớợởỡ',
+    'u': 'ùúụủũưừứựửữ',
+    'y': 'ỳýỵỷỹ',
+    'd': 'đ',
+}
+_FOLD_TABLE = str.maketrans({ch: base for base, chars in _FOLD_GROUPS.items() for ch in chars})
+
+
+def fold_diacritics(text: str) -> str:
+    """Lowercase text and strip Vietnamese diacritics ("Cà Chua" -> "ca chua")."""
+    if not text or not isinstance(text, str):
+        return ""
+    return unicodedata.normalize('NFC', text).lower().translate(_FOLD_TABLE)
@@ -1,5 +1,5 @@
 """Admin views wrapper - uses existing AdminViews."""
-from django.http import HttpResponse, HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.views.decorators.http import require_http_methods
 from api.views.admin_views import AdminViews
 from api.repositories.product_repository import ProductRepository
@@ -12,6 +12,8 @@ from api.models.product import Product
 from api.models.news import News
 from api.models.category import Category
 from api.models.page import Page
+from api.cache.fragments import product_cards
+from api.views.regeneration import Regeneration
 import json
 
 
@@ -52,6 +54,11 @@ def _build_query_string(params: dict, updates: dict = None) -> str:
     return "?" + urlencode(merged) if parts else ""
 
 
+def admin_cache_stats(request):
+    """Hit/miss counters of the in-process SSR caches (this worker only)."""
+    return JsonResponse({"product_cards": product_cards.stats()})
+
+
 def admin_index(request):
     """Admin dashboard."""
     counts = {
@@ -290,7 +297,7 @@ def admin_product_new(request):
     """Create new product."""
     if request.method == 'POST':
         try:
-            ProductRepository.create(
+            product_id = ProductRepository.create(
                 name=request.POST.get('name', ''),
                 category=request.POST.get('category', ''),
                 price=int(request.POST.get('price', 0)),
@@ -311,6 +318,7 @@ def admin_product_new(request):
                 h2_custom=request.POST.get('h2_custom') or None,
                 h3_custom=request.POST.get('h3_custom') or None,
             )
+            Regeneration.schedule("product", product_id)
             return HttpResponseRedirect('/admin/products')
         except Exception as e:
             # Render form with error
@@ -393,6 +401,7 @@ def admin_product_edit(request, id):
                 h2_custom=request.POST.get('h2_custom') or None,
                 h3_custom=request.POST.get('h3_custom') or None,
             )
+            Regeneration.schedule("product", id)
             return HttpResponseRedirect('/admin/products')
         except Exception as e:
             pass
@@ -448,6 +457,7 @@ def admin_product_edit(request, id):
 def admin_product_delete(request, id):
     """Delete product."""
     ProductRepository.delete(id)
+    Regeneration.schedule("product", id)
     return HttpResponseRedirect('/admin/products')
 
 
@@ -947,7 +957,7 @@ def admin_news_add(request):
             author = request.POST.get('author') or 'Admin'
             date = request.POST.get('date') or datetime.now().strftime('%Y-%m-%d')
             
-            NewsRepository.create(
+            news_id = NewsRepository.create(
                 title=request.POST.get('title', ''),
                 slug=request.POST.get('slug') or None,
                 image=request.POST.get('image') or None,
@@ -960,6 +970,7 @@ def admin_news_add(request):
                 h2_custom=request.POST.get('h2_custom') or None,
                 h3_custom=request.POST.get('h3_custom') or None,
             )
+            Regeneration.schedule("news", news_id)
             return HttpResponseRedirect('/admin/news')
         except Exception as e:
             pass
@@ -1006,6 +1017,7 @@ def admin_news_edit(request, id):
                 h2_custom=request.POST.get('h2_custom') or None,
                 h3_custom=request.POST.get('h3_custom') or None,
             )
+            Regeneration.schedule("news", id)
             return HttpResponseRedirect('/admin/news')
         except Exception as e:
             pass
@@ -1029,6 +1041,7 @@ def admin_news_edit(request, id):
 def admin_news_delete(request, id):
     """Delete news."""
     NewsRepository.delete(id)
+    Regeneration.schedule("news", id)
     return HttpResponseRedirect('/admin/news')
 
 
@@ -1043,6 +1056,8 @@ def admin_news_bulk_delete(request):
             # Convert to integers and delete
             ids = [int(nid) for nid in news_ids if nid.isdigit()]
             NewsRepository.bulk_delete(ids)
+            for nid in ids:
+                Regeneration.schedule("news", nid)
         except Exception as e:
             pass
     
@@ -1110,6 +1125,7 @@ def admin_category_add(request):
                 name=request.POST.get('name', ''),
                 sort_order=int(request.POST.get('sort_order', 0)),
             )
+            Regeneration.schedule("site")
             return HttpResponseRedirect('/admin/categories')
         except Exception as e:
             pass
@@ -1151,6 +1167,7 @@ def admin_category_edit(request, id):
                 name=request.POST.get('name', ''),
                 sort_order=int(request.POST.get('sort_order', 0)),
             )
+            Regeneration.schedule("site")
             return HttpResponseRedirect('/admin/categories')
         except Exception as e:
             pass
@@ -1183,6 +1200,7 @@ def admin_category_edit(request, id):
 def admin_category_delete(request, id):
     """Delete category."""
     CategoryRepository.delete(id)
+    Regeneration.schedule("site")
     return HttpResponseRedirect('/admin/categories')
 
 
@@ -1245,7 +1263,7 @@ def admin_page_add(request):
     """Add page."""
     if request.method == 'POST':
         try:
-            PageRepository.create(
+            page_id = PageRepository.create(
                 slug=request.POST.get('slug', ''),
                 title=request.POST.get('title', ''),
                 content=request.POST.get('content') or None,
@@ -1253,6 +1271,7 @@ def admin_page_add(request):
                 meta_description=request.POST.get('meta_description') or None,
                 sort_order=int(request.POST.get('sort_order', 0)),
             )
+            Regeneration.schedule("page", page_id)
             return HttpResponseRedirect('/admin/pages')
         except Exception as e:
             pass
@@ -1306,6 +1325,7 @@ def admin_page_edit(request, id):
                 meta_description=request.POST.get('meta_description') or None,
                 sort_order=int(request.POST.get('sort_order', 0)),
             )
+            Regeneration.schedule("page", id)
             return HttpResponseRedirect('/admin/pages')
         except Exception as e:
             pass
@@ -1548,6 +1568,7 @@ def admin_hero_save(request):
         image=request.POST.get('image') or None,
         button_text=request.POST.get('button_text') or None,
     )
+    Regeneration.schedule("site")
     return HttpResponseRedirect('/admin/hero')
 
 
@@ -1768,6 +1789,7 @@ def admin_site_brand(request):
         tagline=request.POST.get('tagline', ''),
         icon=request.POST.get('icon', ''),
     )
+    Regeneration.schedule("site")
     return HttpResponseRedirect('/admin/site')
 
 
@@ -1779,6 +1801,7 @@ def admin_site_topbar(request):
         hotline=request.POST.get('hotline', ''),
         support=request.POST.get('support') or None,
     )
+    Regeneration.schedule("site")
     return HttpResponseRedirect('/admin/site')
 
 
@@ -1792,6 +1815,7 @@ def admin_site_footer(request):
         description=request.POST.get('description') or None,
         copyright=request.POST.get('copyright') or None,
     )
+    Regeneration.schedule("site")
     return HttpResponseRedirect('/admin/site')
 
 
@@ -1814,6 +1838,7 @@ def admin_site_brochure_edit(request, slug):
             image=request.POST.get('image') or None,
             button_text=request.POST.get('button_text') or None,
         )
+        Regeneration.schedule("site")
         return HttpResponseRedirect('/admin/site?tab=brochures')
     
     # Get CSRF token
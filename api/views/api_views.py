@@ -1,13 +1,10 @@
 """API views."""
 from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
 from django.views.decorators.http import require_http_methods
 from api.services.product_service import ProductService
 from api.services.news_service import NewsService
-from api.repositories.hero_repository import HeroRepository
-from api.repositories.category_repository import CategoryRepository
-from api.repositories.site_config_repository import SiteConfigRepository
-from api.repositories.page_repository import PageRepository
-import json
+from api.services.site_service import SiteService
 
 
 def api_products(request):
@@ -26,9 +23,14 @@ def api_products(request):
     except ValueError:
         limit = 8
     
+    # Opaque keyset cursor from a previous nextCursor; takes precedence over page
+    cursor = request.GET.get('cursor')
+    # view=card returns only the fields product cards render (no description/SEO fields)
+    view = 'card' if request.GET.get('view') == 'card' else 'full'
+    
     page = max(1, page)
     limit = max(1, min(100, limit))
-    items, total, total_pages = ProductService.get_products_with_mock_fallback(
+    return JsonResponse(ProductService.get_products_page_with_mock_fallback(
         category=category,
         price=price,
         standard=standard,
@@ -36,14 +38,29 @@ def api_products(request):
         sort=sort,
         page=page,
         limit=limit,
-    )
-    return JsonResponse({
-        "items": items,
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "totalPages": total_pages,
-    })
+        cursor=cursor,
+        view=view,
+    ))
+
+
+def api_product_facets(request):
+    """Get filter sidebar counts (category, price bucket, standard) API."""
+    return JsonResponse(ProductService.get_facets_with_mock_fallback(
+        category=request.GET.get('category'),
+        price=request.GET.get('price'),
+        standard=request.GET.get('standard'),
+        search=request.GET.get('search'),
+    ))
+
+
+def api_product_suggest(request):
+    """Get search-box suggestions (product names and categories by prefix) API."""
+    try:
+        limit = int(request.GET.get('limit', 8))
+    except ValueError:
+        limit = 8
+    limit = max(1, min(20, limit))
+    return JsonResponse(ProductService.get_suggestions_with_mock_fallback(request.GET.get('q', ''), limit))
 
 
 def api_product_detail(request, id):
@@ -67,15 +84,11 @@ def api_news(request):
         limit = int(request.GET.get('limit', 6))
     except ValueError:
         limit = 6
+    cursor = request.GET.get('cursor')
     
-    items, total, total_pages = NewsService.get_news_with_mock_fallback(page=page, limit=limit)
-    return JsonResponse({
-        "items": items,
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "totalPages": total_pages,
-    })
+    page = max(1, page)
+    limit = max(1, min(100, limit))
+    return JsonResponse(NewsService.get_news_page_with_mock_fallback(page=page, limit=limit, cursor=cursor))
 
 
 def api_news_detail(request, id):
@@ -100,66 +113,45 @@ def api_news_related(request, id):
 
 def api_site(request):
     """Get site configuration API."""
-    def _cfg(config, k):
-        """Get config value as dict."""
-        v = config.get(k)
-        if v is None:
-            return {}
-        if isinstance(v, dict):
-            return v
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except (json.JSONDecodeError, TypeError):
-                return {}
-        return {}
-    
-    try:
-        hero = HeroRepository.get()
-        brochures = CategoryRepository.get_category_brochures()
-        config_rows = SiteConfigRepository.get_all()
-        
-        hero_dict = hero.to_dict() if hero else {}
-        
-        return JsonResponse({
-            "hero": {
-                "promo": hero_dict.get("promo", "Summer Sale"),
-                "title": hero_dict.get("title", "Fresh Produce For Green Living"),
-                "subtitle": hero_dict.get("subtitle", "Up to 20% off on vegetables and fruits this week."),
-                "image": hero_dict.get("image", ""),
-                "buttonText": hero_dict.get("buttonText", "Shop Now"),
-            },
-            "categories": [cat.name for cat in CategoryRepository.get_all()],
-            "brochures": [
-                {"slug": b["slug"], "title": b["title"], "desc": b["desc"], "image": b["image"], "buttonText": b["button_text"]}
-                for b in brochures
-            ],
-            "brand": _cfg(config_rows, "brand"),
-            "header": _cfg(config_rows, "brand") or _cfg(config_rows, "header"),
-            "topbar": _cfg(config_rows, "topbar"),
-            "footer": _cfg(config_rows, "footer"),
-        })
-    except Exception:
-        return JsonResponse({
-            "hero": {
-                "promo": "Summer Sale",
-                "title": "Fresh Produce For Green Living",
-                "subtitle": "Up to 20% off.",
-                "image": "https://images.unsplash.com/photo-1542838132-92c53300491e?w=1920&q=80",
-                "buttonText": "Shop Now"
-            },
-            "categories": ["Rau củ quả", "Hạt & Ngũ cốc", "Gia dụng"],
-            "brochures": [],
-            "topbar": {"freeShipping": "Free shipping for orders over 500k", "hotline": "1900 1234", "support": "Customer Support"},
-            "footer": {"address": "123 Đường Mây Núi, Đà Lạt", "phone": "1900 1234", "email": "cskh@mountainharvest.vn"},
-        })
+    return JsonResponse(SiteService.get_site_with_fallback())
 
 
 def api_pages(request):
     """Get public pages list (slug, title) for footer links."""
-    pages = PageRepository.get_all()
-    items = [{"slug": p["slug"], "title": p.get("title", "")} for p in pages]
-    return JsonResponse({"items": items})
+    return JsonResponse({"items": SiteService.get_footer_pages()})
+
+
+# First news page requested by news.js on page load (products are server-rendered)
+_BOOTSTRAP_NEWS = 6
+
+
+def api_bootstrap(request):
+    """Everything the home page loads at start-up in one response.
+
+    Each part comes from its own cache; the ETag combines the site chrome
+    version with the shared write counters of pages and news (cache_versions),
+    so a returning visitor gets a 304 from any worker without the listings
+    being assembled.
+    """
+    # Taken before loading so a concurrent write is never hidden behind the tag.
+    tables = SiteService.get_table_versions(("pages", "news"))
+    site_version, site = SiteService.get_site_versioned()
+    # No validator for the offline defaults
+    etag = None
+    if site_version is not None and tables is not None:
+        etag = '"' + "-".join(f"{v:x}" for v in (site_version,) + tables) + '"'
+    response = get_conditional_response(request, etag=etag) if etag else None
+    if response is None:
+        response = JsonResponse({
+            "site": site,
+            "pages": {"items": SiteService.get_footer_pages_with_fallback()},
+            "news": NewsService.get_news_page_with_mock_fallback(page=1, limit=_BOOTSTRAP_NEWS),
+        })
+    if etag:
+        response['ETag'] = etag
+    # Always revalidate: the tag changes with every admin save
+    response['Cache-Control'] = 'no-cache'
+    return response
 
 
 @require_http_methods(["POST"])
@@ -0,0 +1,115 @@
+"""Detail pages rendered outside the request cycle (static export, cache warm-up).
+
+Each page is identified by (route, ident): ("product", id), ("news", id) or
+("page", slug), the same keys PageCache uses. Rows are loaded in bulk and
+rendered with the regular NewsViews/ProductViews/PageViews renderers, so the
+output is byte-identical to what the detail views serve for that URL.
+"""
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+from api.models.news import News
+from api.models.news_relation import NewsRelation
+from api.models.page import Page
+from api.models.product import Product
+from api.repositories.news_repository import NewsRepository
+from api.views.news_views import NewsViews
+from api.views.page_views import PageViews
+from api.views.product_views import ProductViews
+
+ROUTES = ("product", "news", "page")
+
+# Response content type of each route, as served by frontend_views.
+CONTENT_TYPES = {
+    "product": 'text/html; charset=utf-8',
+    "news": 'text/html; charset=utf-8',
+    "page": 'text/html; charset=utf-8',
+}
+
+# Related articles on a news page (NewsViews.render_detail): the top of its
+# news_related list, topped up with the latest news (NewsRepository.get_related).
+_RELATED_SHOWN = 3
+
+
+def _stamp(dt) -> str:
+    return dt.isoformat() if dt else ""
+
+
+class DetailPages:
+    """Enumerate, load and render detail pages."""
+
+    @staticmethod
+    def path(route: str, ident: Hashable) -> str:
+        """URL path of a detail page (as routed in api/urls.py)."""
+        if route == "product":
+            return f"/products/{ident}/"
+        if route == "news":
+            return f"/news/{ident}/"
+        return f"/p/{ident}/"
+
+    @staticmethod
+    def render(base_html: str, route: str, row: dict, url: str) -> str:
+        """Render one detail page from its row dict (as returned by `rows`)."""
+        if route == "product":
+            return ProductViews.render_detail(base_html, row, url)
+        if route == "news":
+            return NewsViews.render_detail(base_html, row, url)
+        return PageViews.render_detail(base_html, row, url)
+
+    @staticmethod
+    def load(route: str, ident: Hashable) -> Optional[dict]:
+        """Row dict of one page, or None if it no longer exists."""
+        if route == "product":
+            product = Product.objects.filter(id=ident).first()
+            return product.to_dict(rendered=True) if product else None
+        if route == "news":
+            news = News.objects.filter(id=ident).first()
+            return news.to_dict(rendered=True) if news else None
+        page = Page.objects.filter(slug=ident).first()
+        return page.to_dict() if page else None
+
+    @staticmethod
+    def page_slug(id: int) -> Optional[str]:
+        """Stored slug of a page, None if it no longer exists."""
+        return Page.objects.filter(id=id).values_list('slug', flat=True).first()
+
+    @staticmethod
+    def latest_news_ids() -> List[int]:
+        """Newest news ids, enough to top up any related list."""
+        return list(News.objects.order_by(*NewsRepository.LIST_ORDER).values_list('id', flat=True)[:_RELATED_SHOWN + 1])
+
+    @staticmethod
+    def news_referrers(id: int) -> List[int]:
+        """Ids of the news whose pages may list a given article as related."""
+        listed = NewsRelation.objects.filter(related_id=id, rank__lt=_RELATED_SHOWN).values_list('news_id', flat=True)
+        return list(dict.fromkeys(list(listed) + DetailPages.latest_news_ids()))
+
+    @staticmethod
+    def _related_ids() -> Dict[int, List[int]]:
+        """Related article ids shown on every news page, in get_related order."""
+        related: Dict[int, List[int]] = {}
+        for nid, rid in NewsRelation.objects.filter(rank__lt=_RELATED_SHOWN).order_by('news_id', 'rank').values_list(
+                'news_id', 'related_id'):
+            related.setdefault(nid, []).append(rid)
+        return related
+
+    @staticmethod
+    def rows(route: str, batch_size: int = 500) -> Iterator[Tuple[Hashable, str, dict]]:
+        """(ident, signature, row) for every page of a route.
+
+        The signature changes whenever the rendered page may change: the row's
+        updated_at, plus the related articles shown on news pages.
+        """
+        if route == "product":
+            for product in Product.objects.order_by('id').iterator(chunk_size=batch_size):
+                yield product.id, _stamp(product.updated_at), product.to_dict(rendered=True)
+        elif route == "news":
+            stamps = {nid: _stamp(dt) for nid, dt in News.objects.values_list('id', 'updated_at')}
+            related = DetailPages._related_ids()
+            latest = DetailPages.latest_news_ids()
+            for news in News.objects.order_by('id').iterator(chunk_size=batch_size):
+                shown = related.get(news.id, [])
+                shown = (shown + [nid for nid in latest if nid != news.id and nid not in shown])[:_RELATED_SHOWN]
+                context = ",".join(f"{nid}@{stamps.get(nid, '')}" for nid in shown)
+                yield news.id, f"{_stamp(news.updated_at)}|{context}", news.to_dict(rendered=True)
+        else:
+            for page in Page.objects.order_by('id').iterator(chunk_size=batch_size):
+                yield page.slug, _stamp(page.updated_at), page.to_dict()
@@ -1,28 +1,42 @@
 """Frontend views."""
 from pathlib import Path
-from django.http import HttpResponse, HttpResponseRedirect
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from api.cache.pages import PageCache
 from api.services.product_service import ProductService
 from api.services.news_service import NewsService
 from api.views.home_views import HomeViews
-from api.views.news_views import NewsViews, normalize_content_headers
+from api.views.news_views import NewsViews
 from api.views.product_views import ProductViews
 from api.views.page_views import PageViews
+from api.views.detail_pages import CONTENT_TYPES
 from api.repositories.page_repository import PageRepository
 from urllib.parse import urlparse, urlunparse
 
+# (path, st_mtime_ns, content) of the last index.html read
 _index_html_cache = None
 
 
 def _get_index_html():
-    """Get index.html content, cached."""
+    """Get index.html content, cached until the file's mtime changes."""
     global _index_html_cache
-    if _index_html_cache is not None:
-        return _index_html_cache
     for path in [Path(__file__).resolve().parent.parent.parent / "public" / "index.html", Path.cwd() / "public" / "index.html"]:
-        if path.exists():
-            _index_html_cache = path.read_text(encoding="utf-8")
-            return _index_html_cache
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            continue
+        cached = _index_html_cache
+        if cached is not None and cached[0] == path and cached[1] == mtime:
+            return cached[2]
+        content = path.read_text(encoding="utf-8")
+        if cached is not None:
+            # Rendered from the previous file
+            PageCache.clear()
+        _index_html_cache = (path, mtime, content)
+        return content
     return None
 
 
@@ -51,7 +65,7 @@ def index(request):
     if news_id:
         try:
             news_id_int = int(news_id)
-            news = NewsService.get_news_by_id_with_mock_fallback(news_id_int)
+            news = NewsService.get_news_by_id_with_mock_fallback(news_id_int, rendered=True)
             if news:
                 html_content = _get_index_html()
                 if html_content:
@@ -85,32 +99,36 @@ def index(request):
         news_page = 1
 
     # Get products and news data server-side
-    products_items, products_total, products_total_pages = ProductService.get_products_with_mock_fallback(
-        category=category,
-        price=price,
-        standard=standard,
-        search=search,
-        sort=sort,
-        page=page,
-        limit=8,
-    )
-    news_items, news_total, news_total_pages = NewsService.get_news_with_mock_fallback(
-        page=news_page,
-        limit=6,
-    )
+    def load_products():
+        products_items, products_total, products_total_pages = ProductService.get_products_with_mock_fallback(
+            category=category,
+            price=price,
+            standard=standard,
+            search=search,
+            sort=sort,
+            page=page,
+            limit=8,
+            view="card",
+        )
+        return {
+            "items": products_items,
+            "total": products_total,
+            "page": page,
+            "total_pages": products_total_pages,
+        }
+
+    def load_news():
+        news_items, news_total, news_total_pages = NewsService.get_news_with_mock_fallback(
+            page=news_page,
+            limit=6,
+        )
+        return {
+            "items": news_items,
+            "total": news_total,
+            "page": news_page,
+            "total_pages": news_total_pages,
+        }
 
-    products_page = {
-        "items": products_items,
-        "total": products_total,
-        "page": page,
-        "total_pages": products_total_pages,
-    }
-    news_page_data = {
-        "items": news_items,
-        "total": news_total,
-        "page": news_page,
-        "total_pages": news_total_pages,
-    }
     filters = {
         "category": category or "",
         "price": price or "",
@@ -119,20 +137,55 @@ def index(request):
         "sort": sort or "newest",
     }
 
+    if getattr(settings, 'SSR_STREAMING', False):
+        # Flush <head> and the above-the-fold shell before querying, then each grid as it is ready
+        chunks = HomeViews.iter_home(
+            base_html=html_template,
+            products_page=load_products,
+            news_page=load_news,
+            filters=filters,
+            news_page_param="news_page",
+            news_page_no=news_page,
+        )
+        return StreamingHttpResponse(chunks, content_type='text/html; charset=utf-8')
+
     rendered_html = HomeViews.render_home(
         base_html=html_template,
-        products_page=products_page,
-        news_page=news_page_data,
+        products_page=load_products(),
+        news_page=load_news(),
         filters=filters,
         news_page_param="news_page",
     )
     return HttpResponse(rendered_html, content_type='text/html; charset=utf-8')
 
 
+def _page_response(request, entry):
+    """Response for a cached page entry: 304 if the client's validators match, else the body."""
+    response = get_conditional_response(request, etag=entry.etag, last_modified=entry.last_modified)
+    if response is None:
+        response = HttpResponse(entry.body, content_type=entry.content_type)
+    response['ETag'] = entry.etag
+    response['Last-Modified'] = http_date(entry.last_modified)
+    response['X-Server-Rendered'] = 'true'
+    response['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=600'
+    return response
+
+
 def news_detail(request, id):
     """Serve news detail page - Server-side rendered."""
     try:
-        news = NewsService.get_news_by_id_with_mock_fallback(id)
+        current_url = normalize_url(request.build_absolute_uri(request.path))
+        entry = PageCache.get("news", id, current_url)
+        if entry is not None:
+            return _page_response(request, entry)
+        generation = PageCache.generation("news")
+        try:
+            news = NewsService.get_news_by_id(id, rendered=True)
+        except Exception:
+            news = None
+        cacheable = news is not None
+        if not news:
+            news = next((x for x in NewsService._mock_news() if x.get("id") == id), None)
         if not news:
             # Log for debugging
             import logging
@@ -145,13 +198,15 @@ def news_detail(request, id):
         html_content = _get_index_html()
         if not html_content:
             return HttpResponseRedirect("/?news=" + str(id))
-        
-        current_url = normalize_url(request.build_absolute_uri())
+
         html_content = NewsViews.render_detail(html_content, news, current_url)
-        response = HttpResponse(html_content, content_type='text/html')
-        response['X-Server-Rendered'] = 'true'
-        response['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=600'
-        return response
+        if not cacheable:
+            response = HttpResponse(html_content, content_type=CONTENT_TYPES["news"])
+            response['X-Server-Rendered'] = 'true'
+            response['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=600'
+            return response
+        entry = PageCache.set("news", id, current_url, html_content, CONTENT_TYPES["news"], generation, news.get("updated_at"))
+        return _page_response(request, entry)
     except Exception as e:
         # Log exception for debugging
         import logging
@@ -163,7 +218,13 @@ def news_detail(request, id):
 def product_detail(request, id):
     """Serve product detail page - Server-side rendered."""
     try:
-        product = ProductService.get_product(id)
+        current_url = normalize_url(request.build_absolute_uri(request.path))
+        entry = PageCache.get("product", id, current_url)
+        if entry is not None:
+            return _page_response(request, entry)
+        generation = PageCache.generation("product")
+        product = ProductService.get_product(id, rendered=True)
+        cacheable = product is not None
         if not product:
             mock_products = ProductService._mock_products()
             product = next((x for x in mock_products if x["id"] == id), None)
@@ -172,12 +233,14 @@ def product_detail(request, id):
 
         html_content = _get_index_html()
         if html_content:
-            current_url = normalize_url(request.build_absolute_uri())
             html_content = ProductViews.render_detail(html_content, product, current_url)
-            response = HttpResponse(html_content, content_type='text/html; charset=utf-8')
-            response['X-Server-Rendered'] = 'true'
-            response['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=600'
-            return response
+            if not cacheable:
+                response = HttpResponse(html_content, content_type=CONTENT_TYPES["product"])
+                response['X-Server-Rendered'] = 'true'
+                response['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=600'
+                return response
+            entry = PageCache.set("product", id, current_url, html_content, CONTENT_TYPES["product"], generation, product.get("updated_at"))
+            return _page_response(request, entry)
         return HttpResponseRedirect("/")
     except Exception:
         return HttpResponseRedirect("/")
@@ -186,18 +249,20 @@ def product_detail(request, id):
 def page_detail(request, slug):
     """Serve static page by slug."""
     try:
+        current_url = normalize_url(request.build_absolute_uri(request.path))
+        entry = PageCache.get("page", slug, current_url)
+        if entry is not None:
+            return _page_response(request, entry)
+        generation = PageCache.generation("page")
         page = PageRepository.get_by_slug(slug)
         if not page:
             return HttpResponseRedirect("/")
 
         html_content = _get_index_html()
         if html_content:
-            current_url = normalize_url(request.build_absolute_uri())
             html_content = PageViews.render_detail(html_content, page, current_url)
-            response = HttpResponse(html_content, content_type='text/html; charset=utf-8')
-            response['X-Server-Rendered'] = 'true'
-            response['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=600'
-            return response
+            entry = PageCache.set("page", slug, current_url, html_content, CONTENT_TYPES["page"], generation, page.get("updated_at"))
+            return _page_response(request, entry)
         return HttpResponseRedirect("/")
     except Exception:
         return HttpResponseRedirect("/")
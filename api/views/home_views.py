@@ -1,11 +1,17 @@
 """Home views for server-side HTML rendering."""
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List
 import html
-import re
 from urllib.parse import urlencode
 
+from api.cache.fragments import product_cards
+from api.utils.news_content import news_excerpt
+from api.views.html_template import compile_template
+
+# Pages linked on each side of the current one in pagination bars (also in utils.js).
+PAGINATION_RADIUS = 2
+
 
 class HomeViews:
     """Views for home/catalog/news list HTML rendering."""
@@ -17,6 +23,15 @@ class HomeViews:
             return base_path
         return base_path + "?" + urlencode(params_clean, doseq=True)
 
+    @staticmethod
+    def _card_version(p: dict) -> tuple:
+        """Everything a product card renders; cached cards are reused only for equal values."""
+        return (
+            p.get("name"), p.get("category"), p.get("image"), p.get("price"),
+            p.get("originalPrice") or p.get("original_price"), p.get("unit"), p.get("discount"),
+            tuple(p.get("tags") or ()), p.get("rating"), p.get("reviews"),
+        )
+
     @staticmethod
     def _render_products(items: List[dict]) -> str:
         cards: List[str] = []
@@ -24,55 +39,67 @@ class HomeViews:
             pid = p.get("id")
             if not pid:
                 continue
-            name = html.escape(str(p.get("name", "")))
-            category = html.escape(str(p.get("category", "")))
-            image = html.escape(str(p.get("image", "")))
-            price = p.get("price") or 0
-            original_price = p.get("originalPrice") or p.get("original_price")
-            unit = p.get("unit") or ""
-            discount = p.get("discount") or ""
-            tags = p.get("tags") or []
-            rating = float(p.get("rating") or 0)
-            reviews = int(p.get("reviews") or 0)
-
-            # Tag badges
-            tag_spans: List[str] = []
-            for tag in tags:
-                tag_text = html.escape(str(tag))
-                color_class = "bg-blue-100 text-blue-600"
-                if tag == "Best Seller":
-                    color_class = "bg-brand-orange text-white"
-                elif tag == "Organic":
-                    color_class = "bg-green-100 text-brand-green"
-                tag_spans.append(
-                    f'<span class="absolute top-3 right-3 {color_class} text-xs font-bold px-2 py-1 rounded z-10 mr-1">{tag_text}</span>'
-                )
-            tags_html = "".join(tag_spans)
-
-            # Rating stars
-            stars: List[str] = []
-            for i in range(5):
-                if i < int(rating):
-                    stars.append('<i class="fas fa-star"></i>')
-                elif i < rating:
-                    stars.append('<i class="fas fa-star-half-alt"></i>')
-                else:
-                    stars.append('<i class="far fa-star"></i>')
-            stars_html = "".join(stars)
-
-            # Prices
-            price_html = f"{price:,.0f}đ"
-            original_html = ""
-            if original_price:
-                original_html = f'{original_price:,.0f}đ'
-
-            discount_html = ""
-            if discount:
-                discount_html = f'<span class="absolute top-3 left-3 bg-red-500 text-white text-xs font-bold px-2 py-1 rounded z-10">{html.escape(str(discount))}</span>'
-
-            unit_html = f'<span class="text-xs text-gray-500">{html.escape(str(unit))}</span>' if unit else ""
+            version = HomeViews._card_version(p)
+            card = product_cards.get(pid, version)
+            if card is None:
+                card = HomeViews._render_product_card(p)
+                product_cards.set(pid, version, card)
+            cards.append(card)
+        return "".join(cards)
 
-            card = f"""
+    @staticmethod
+    def _render_product_card(p: dict) -> str:
+        """Markup of one product card."""
+        pid = p.get("id")
+        name = html.escape(str(p.get("name", "")))
+        category = html.escape(str(p.get("category", "")))
+        image = html.escape(str(p.get("image", "")))
+        price = p.get("price") or 0
+        original_price = p.get("originalPrice") or p.get("original_price")
+        unit = p.get("unit") or ""
+        discount = p.get("discount") or ""
+        tags = p.get("tags") or []
+        rating = float(p.get("rating") or 0)
+        reviews = int(p.get("reviews") or 0)
+
+        # Tag badges
+        tag_spans: List[str] = []
+        for tag in tags:
+            tag_text = html.escape(str(tag))
+            color_class = "bg-blue-100 text-blue-600"
+            if tag == "Best Seller":
+                color_class = "bg-brand-orange text-white"
+            elif tag == "Organic":
+                color_class = "bg-green-100 text-brand-green"
+            tag_spans.append(
+                f'<span class="absolute top-3 right-3 {color_class} text-xs font-bold px-2 py-1 rounded z-10 mr-1">{tag_text}</span>'
+            )
+        tags_html = "".join(tag_spans)
+
+        # Rating stars
+        stars: List[str] = []
+        for i in range(5):
+            if i < int(rating):
+                stars.append('<i class="fas fa-star"></i>')
+            elif i < rating:
+                stars.append('<i class="fas fa-star-half-alt"></i>')
+            else:
+                stars.append('<i class="far fa-star"></i>')
+        stars_html = "".join(stars)
+
+        # Prices
+        price_html = f"{price:,.0f}đ"
+        original_html = ""
+        if original_price:
+            original_html = f'{original_price:,.0f}đ'
+
+        discount_html = ""
+        if discount:
+            discount_html = f'<span class="absolute top-3 left-3 bg-red-500 text-white text-xs font-bold px-2 py-1 rounded z-10">{html.escape(str(discount))}</span>'
+
+        unit_html = f'<span class="text-xs text-gray-500">{html.escape(str(unit))}</span>' if unit else ""
+
+        card = f"""
     <div class="bg-white rounded-xl shadow-sm hover:shadow-xl transition duration-300 group overflow-hidden border border-gray-100">
       <div class="relative h-64 overflow-hidden">
         {discount_html}
@@ -109,56 +136,87 @@ class HomeViews:
         </div>
       </div>
     </div>"""
-            cards.append(card)
-        return "".join(cards)
+        return card
 
     @staticmethod
-    def _render_product_pagination(
-        page: int,
-        total_pages: int,
-        base_path: str,
-        filters: Dict[str, str],
-        news_page: int,
-    ) -> str:
+    def _page_window(page: int, total_pages: int, radius: int = PAGINATION_RADIUS) -> List[int | None]:
+        """Page numbers to link: first, last and `radius` around `page`; None marks a gap.
+
+        Same window as Utils.pageWindow in public/js/utils.js.
+        """
+        lo = max(1, page - radius)
+        hi = min(total_pages, page + radius)
+        window: List[int | None] = []
+        if lo > 1:
+            window.append(1)
+            if lo > 3:
+                window.append(None)
+            elif lo == 3:
+                window.append(2)
+        window.extend(range(lo, hi + 1))
+        if hi < total_pages:
+            if hi < total_pages - 2:
+                window.append(None)
+            elif hi == total_pages - 2:
+                window.append(total_pages - 1)
+            window.append(total_pages)
+        return window
+
+    @staticmethod
+    def _page_href(base_path: str, filters: Dict[str, str], page_param: str, extra: Dict[str, str] | None = None) -> Callable[[int], str]:
+        """Link builder for one pagination bar; the shared query string is encoded once.
+
+        Matches _build_url(base_path, {**filters, page_param: p, **extra}).
+        """
+        before = urlencode({k: v for k, v in filters.items() if k != page_param and v not in (None, "", [])}, doseq=True)
+        after = urlencode({k: v for k, v in (extra or {}).items() if v not in (None, "", [])}, doseq=True)
+        prefix = f"{base_path}?{before}&{page_param}=" if before else f"{base_path}?{page_param}="
+        suffix = f"&{after}" if after else ""
+        return lambda p: f"{prefix}{p}{suffix}"
+
+    @staticmethod
+    def _render_pagination(page: int, total_pages: int, href: Callable[[int], str]) -> str:
         if total_pages <= 1:
             return ""
         page = max(1, min(page, total_pages))
-        filters = dict(filters or {})
         html_parts: List[str] = []
 
         # Prev
         if page > 1:
-            params = {**filters, "page": str(page - 1)}
-            if news_page > 1:
-                params["news_page"] = str(news_page)
-            href = HomeViews._build_url(base_path, params)
             html_parts.append(
-                f'<a href="{href}" class="inline-flex items-center justify-center w-9 h-9 border border-gray-300 rounded-lg hover:bg-gray-100 text-gray-700 transition"><i class="fas fa-chevron-left"></i></a>'
+                f'<a href="{href(page - 1)}" class="inline-flex items-center justify-center w-9 h-9 border border-gray-300 rounded-lg hover:bg-gray-100 text-gray-700 transition"><i class="fas fa-chevron-left"></i></a>'
             )
 
-        # Pages
-        for p in range(1, total_pages + 1):
-            params = {**filters, "page": str(p)}
-            if news_page > 1:
-                params["news_page"] = str(news_page)
-            href = HomeViews._build_url(base_path, params)
+        # Pages (windowed, so the bar stays small on large catalogs)
+        for p in HomeViews._page_window(page, total_pages):
+            if p is None:
+                html_parts.append('<span class="inline-flex items-center justify-center w-9 h-9 text-gray-500">&hellip;</span>')
+                continue
             active = " bg-brand-green text-white border-brand-green" if p == page else " border-gray-300 hover:bg-gray-100 text-gray-700"
             html_parts.append(
-                f'<a href="{href}" class="inline-flex items-center justify-center w-9 h-9 border rounded-lg transition{active}">{p}</a>'
+                f'<a href="{href(p)}" class="inline-flex items-center justify-center w-9 h-9 border rounded-lg transition{active}">{p}</a>'
             )
 
         # Next
         if page < total_pages:
-            params = {**filters, "page": str(page + 1)}
-            if news_page > 1:
-                params["news_page"] = str(news_page)
-            href = HomeViews._build_url(base_path, params)
             html_parts.append(
-                f'<a href="{href}" class="inline-flex items-center justify-center w-9 h-9 border border-gray-300 rounded-lg hover:bg-gray-100 text-gray-700 transition"><i class="fas fa-chevron-right"></i></a>'
+                f'<a href="{href(page + 1)}" class="inline-flex items-center justify-center w-9 h-9 border border-gray-300 rounded-lg hover:bg-gray-100 text-gray-700 transition"><i class="fas fa-chevron-right"></i></a>'
             )
 
         return "".join(html_parts)
 
+    @staticmethod
+    def _render_product_pagination(
+        page: int,
+        total_pages: int,
+        base_path: str,
+        filters: Dict[str, str],
+        news_page: int,
+    ) -> str:
+        extra = {"news_page": str(news_page)} if news_page > 1 else None
+        href = HomeViews._page_href(base_path, filters or {}, "page", extra)
+        return HomeViews._render_pagination(page, total_pages, href)
+
     @staticmethod
     def _render_news(items: List[dict]) -> str:
         cards: List[str] = []
@@ -169,9 +227,10 @@ class HomeViews:
             title = html.escape(str(n.get("title", "")))
             image = html.escape(str(n.get("image", "")))
             date = html.escape(str(n.get("date", "")))
-            raw_content = n.get("content") or ""
-            text = re.sub(r"<[^>]+>", "", raw_content)
-            excerpt = html.escape(text.strip()[:150] + ("..." if len(text.strip()) > 150 else ""))
+            excerpt = n.get("excerpt")
+            if excerpt is None:
+                excerpt = news_excerpt(n.get("content"))
+            excerpt = html.escape(excerpt)
             href = f"/news/{nid}"
             card = f"""
     <article class="bg-white rounded-xl overflow-hidden shadow-sm hover:shadow-lg transition">
@@ -195,38 +254,8 @@ class HomeViews:
         filters: Dict[str, str],
         news_page_param: str = "news_page",
     ) -> str:
-        if total_pages <= 1:
-            return ""
-        page = max(1, min(page, total_pages))
-        filters = dict(filters or {})
-        html_parts: List[str] = []
-
-        # Prev
-        if page > 1:
-            params = {**filters, news_page_param: str(page - 1)}
-            href = HomeViews._build_url(base_path, params)
-            html_parts.append(
-                f'<a href="{href}" class="inline-flex items-center justify-center w-9 h-9 border border-gray-300 rounded-lg hover:bg-gray-100 text-gray-700 transition"><i class="fas fa-chevron-left"></i></a>'
-            )
-
-        # Pages
-        for p in range(1, total_pages + 1):
-            params = {**filters, news_page_param: str(p)}
-            href = HomeViews._build_url(base_path, params)
-            active = " bg-brand-green text-white border-brand-green" if p == page else " border-gray-300 hover:bg-gray-100 text-gray-700"
-            html_parts.append(
-                f'<a href="{href}" class="inline-flex items-center justify-center w-9 h-9 border rounded-lg transition{active}">{p}</a>'
-            )
-
-        # Next
-        if page < total_pages:
-            params = {**filters, news_page_param: str(page + 1)}
-            href = HomeViews._build_url(base_path, params)
-            html_parts.append(
-                f'<a href="{href}" class="inline-flex items-center justify-center w-9 h-9 border border-gray-300 rounded-lg hover:bg-gray-100 text-gray-700 transition"><i class="fas fa-chevron-right"></i></a>'
-            )
-
-        return "".join(html_parts)
+        href = HomeViews._page_href(base_path, filters or {}, news_page_param)
+        return HomeViews._render_pagination(page, total_pages, href)
 
     @staticmethod
     def render_home(
@@ -237,85 +266,67 @@ class HomeViews:
         news_page_param: str = "news_page",
     ) -> str:
         """Render home page with server-side products and news."""
-        filters = dict(filters or {})
-        products_items = products_page.get("items") or []
-        products_total_pages = int(products_page.get("total_pages") or products_page.get("totalPages") or 1)
-        products_page_no = int(products_page.get("page") or 1)
+        return "".join(HomeViews.iter_home(base_html, products_page, news_page, filters, news_page_param))
 
-        news_items = news_page.get("items") or []
-        news_total_pages = int(news_page.get("total_pages") or news_page.get("totalPages") or 1)
-        news_page_no = int(news_page.get("page") or 1)
+    @staticmethod
+    def iter_home(
+        base_html: str,
+        products_page: Dict[str, object] | Callable[[], Dict[str, object]],
+        news_page: Dict[str, object] | Callable[[], Dict[str, object]],
+        filters: Dict[str, str] | None = None,
+        news_page_param: str = "news_page",
+        news_page_no: int | None = None,
+    ) -> Iterator[str]:
+        """Render the home page as chunks (joined, identical to render_home).
+
+        `products_page` / `news_page` may be zero-argument loaders; they are
+        called only when the stream reaches the product grid / news grid, so
+        everything above (head, hero, filters) is yielded first. Pass
+        `news_page_no` when `news_page` is a loader (product pagination links
+        carry it and come before the news grid).
+        """
+        filters = dict(filters or {})
+        load_products = _memo(products_page)
+        load_news = _memo(news_page)
+        if news_page_no is None:
+            news_page_no = int(load_news().get("page") or 1)
 
-        html_out = base_html
+        template = compile_template(base_html)
 
         # Preserve filter form values (search, category, etc.)
         search_val = html.escape(str(filters.get("search", "")))
-        html_out = re.sub(
-            r'(id="filter-search"[^>]*?)(?:\s+value="[^"]*")?',
-            r'\1 value="' + search_val + '"',
-            html_out,
-            count=1,
-        )
-        cat_val = filters.get("category", "")
-        if cat_val:
-            html_out = re.sub(
-                rf'<option value="{re.escape(cat_val)}">',
-                rf'<option value="{re.escape(cat_val)}" selected>',
-                html_out,
-                count=1,
-            )
-
-        # Replace products grid
-        products_html = HomeViews._render_products(products_items)
-        products_pattern = r'(<div\s+id="product-list"[^>]*>)([\s\S]*?)(</div>)'
-        html_out = re.sub(
-            products_pattern,
-            r"\1" + products_html + r"\3",
-            html_out,
-            count=1,
-        )
-
-        # Replace products pagination
-        prod_pagination_html = HomeViews._render_product_pagination(
-            products_page_no,
-            products_total_pages,
+        slots = {"filter-search:value": f' value="{search_val}"'}
+        cat_slot = f'option:filter-category:{filters.get("category", "")}'
+        if filters.get("category") and template.has(cat_slot):
+            slots[cat_slot] = template.defaults[cat_slot][:-1] + " selected>"
+
+        slots["product-list"] = lambda: HomeViews._render_products(load_products().get("items") or [])
+        slots["product-pagination"] = lambda: HomeViews._render_product_pagination(
+            int(load_products().get("page") or 1),
+            int(load_products().get("total_pages") or load_products().get("totalPages") or 1),
             base_path="/",
             filters=filters,
             news_page=news_page_no,
         )
-        prod_pagination_pattern = r'(<div\s+id="product-pagination"[^>]*>)([\s\S]*?)(</div>)'
-        html_out = re.sub(
-            prod_pagination_pattern,
-            r"\1" + prod_pagination_html + r"\3",
-            html_out,
-            count=1,
-        )
-
-        # Replace news grid
-        news_html = HomeViews._render_news(news_items)
-        news_pattern = r'(<div\s+id="news-list"[^>]*>)([\s\S]*?)(</div>)'
-        html_out = re.sub(
-            news_pattern,
-            r"\1" + news_html + r"\3",
-            html_out,
-            count=1,
-        )
-
-        # Replace news pagination
-        news_pagination_html = HomeViews._render_news_pagination(
+        slots["news-list"] = lambda: HomeViews._render_news(load_news().get("items") or [])
+        slots["news-pagination"] = lambda: HomeViews._render_news_pagination(
             news_page_no,
-            news_total_pages,
+            int(load_news().get("total_pages") or load_news().get("totalPages") or 1),
             base_path="/",
             filters=filters,
             news_page_param=news_page_param,
         )
-        news_pagination_pattern = r'(<div\s+id="news-pagination"[^>]*>)([\s\S]*?)(</div>)'
-        html_out = re.sub(
-            news_pagination_pattern,
-            r"\1" + news_pagination_html + r"\3",
-            html_out,
-            count=1,
-        )
+        return template.stream(slots)
+
 
-        return html_out
+def _memo(source):
+    """Zero-argument callable returning `source` (a dict, or a loader's result computed once)."""
+    if not callable(source):
+        return lambda: source
+    cache = []
 
+    def load():
+        if not cache:
+            cache.append(source())
+        return cache[0]
+    return load
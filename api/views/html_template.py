@@ -0,0 +1,186 @@
+"""Precompiled index.html with named slots.
+
+The SSR renderers used to rewrite the ~36 KB index.html with a series of
+regex substitutions on every request. Instead the document is split once
+into static segments and named slots (title, meta tags, canonical link,
+listing containers, detail articles, ...); a render is a single join of the
+segments with either the caller's value or the slot's original text.
+
+Slot names:
+
+- ``title``, ``canonical``, ``meta:<attr>:<name>`` (lowercase) – whole tags
+- ``head_end`` – empty, just before ``</head>`` (for appended head content)
+- ``main_end`` – empty, just before ``</main>``
+- ``product-list``, ``product-pagination``, ``news-list``, ``news-pagination``
+  – inner HTML of those containers (up to their first ``</div>``)
+- ``article:<id>`` – whole ``<article id="news-detail|product-detail|page-detail">``
+- ``script:products.js`` – the products.js script tag
+- ``filter-search:value`` – the value attribute of the search box (may be empty)
+- ``option:filter-category:<value>`` – each static option of the category filter
+
+The head tags are indexed once at compile time, so detail renderers describe
+their title/meta/canonical updates through a HeadRewriter instead of searching
+the document per tag.
+"""
+import functools
+import re
+from html import unescape
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+_TITLE_RE = re.compile(r'<title>.*?</title>', re.IGNORECASE | re.DOTALL)
+_META_RE = re.compile(r'<meta\s+(name|property)=["\']([^"\']*)["\'][^>]*>', re.IGNORECASE)
+_CANONICAL_RE = re.compile(r'<link\s+rel=["\']canonical["\'][^>]*>', re.IGNORECASE)
+_CONTAINER_RE = r'<div\s+id="{id}"[^>]*>([\s\S]*?)</div>'
+_CONTAINERS = ("product-list", "product-pagination", "news-list", "news-pagination")
+_ARTICLE_RE = r'<article id="{id}"[^>]*>[\s\S]*?</article>'
+_ARTICLES = ("news-detail", "product-detail", "page-detail")
+_PRODUCTS_JS_RE = re.compile(r'<script\s+src=["\']/js/products\.js["\'][^>]*></script>', re.IGNORECASE)
+_SEARCH_VALUE_RE = re.compile(r'id="filter-search"((?:\s+value="[^"]*")?)')
+_CATEGORY_SELECT_RE = re.compile(r'<select[^>]*\bid="filter-category"[^>]*>([\s\S]*?)</select>', re.IGNORECASE)
+_OPTION_RE = re.compile(r'<option value="([^"]*)">')
+
+
+def meta_slot(attr_type: str, attr_name: str) -> str:
+    """Slot name of a <meta name=...> / <meta property=...> tag."""
+    return f"meta:{attr_type.lower()}:{attr_name.lower()}"
+
+
+class CompiledTemplate:
+    """Static segments interleaved with named slots; see module docstring."""
+
+    def __init__(self, source: str):
+        spans: List[Tuple[int, int, str]] = []
+        taken = set()
+
+        def add(name: str, start: int, end: int) -> None:
+            if name not in taken:
+                taken.add(name)
+                spans.append((start, end, name))
+
+        m = _TITLE_RE.search(source)
+        if m:
+            add("title", m.start(), m.end())
+        for m in _META_RE.finditer(source):
+            add(meta_slot(m.group(1), m.group(2)), m.start(), m.end())
+        m = _CANONICAL_RE.search(source)
+        if m:
+            add("canonical", m.start(), m.end())
+        pos = source.find("</head>")
+        if pos >= 0:
+            add("head_end", pos, pos)
+        m = _SEARCH_VALUE_RE.search(source)
+        if m:
+            add("filter-search:value", m.start(1), m.end(1))
+        m = _CATEGORY_SELECT_RE.search(source)
+        if m:
+            for option in _OPTION_RE.finditer(source, m.start(1), m.end(1)):
+                add(f"option:filter-category:{unescape(option.group(1))}", option.start(), option.end())
+        for container in _CONTAINERS:
+            m = re.search(_CONTAINER_RE.format(id=container), source)
+            if m:
+                add(container, m.start(1), m.end(1))
+        for article in _ARTICLES:
+            m = re.search(_ARTICLE_RE.format(id=article), source)
+            if m:
+                add(f"article:{article}", m.start(), m.end())
+        pos = source.find("</main>")
+        if pos >= 0:
+            add("main_end", pos, pos)
+        m = _PRODUCTS_JS_RE.search(source)
+        if m:
+            add("script:products.js", m.start(), m.end())
+
+        spans.sort()
+        self.segments: List[str] = []
+        self.slots: List[str] = []
+        self.defaults: Dict[str, str] = {}
+        cursor = 0
+        for start, end, name in spans:
+            if start < cursor:
+                # Nested in an earlier slot (not expected in index.html); leave it static.
+                continue
+            self.segments.append(source[cursor:start])
+            self.slots.append(name)
+            self.defaults[name] = source[start:end]
+            cursor = end
+        self.segments.append(source[cursor:])
+
+    def has(self, name: str) -> bool:
+        """Whether the document has this slot."""
+        return name in self.defaults
+
+    def render(self, values: Dict[str, str]) -> str:
+        """Join segments with `values` (unknown names ignored, missing ones keep their original text)."""
+        parts = [self.segments[0]]
+        defaults = self.defaults
+        for name, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(name)
+            parts.append(defaults[name] if value is None else value)
+            parts.append(segment)
+        return "".join(parts)
+
+    def stream(self, values: Dict[str, object]) -> Iterator[str]:
+        """Like render, but yields chunks. Callable values are called when the
+        stream reaches their slot, after flushing everything before it."""
+        buffer = [self.segments[0]]
+        defaults = self.defaults
+        for name, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(name)
+            if callable(value):
+                if buffer:
+                    yield "".join(buffer)
+                    buffer = []
+                value = value()
+            buffer.append(defaults[name] if value is None else value)
+            buffer.append(segment)
+        yield "".join(buffer)
+
+
+class HeadRewriter:
+    """Head updates for one render of a compiled template.
+
+    Tags the template already has replace their slot in place; missing ones
+    and `append`ed markup go before ``</head>`` in call order. Values are
+    inserted as given (callers escape them).
+    """
+
+    def __init__(self, template: CompiledTemplate):
+        self.template = template
+        self._slots: Dict[str, str] = {}
+        self._head_end: List[str] = []
+
+    def _tag(self, slot: str, tag: str) -> None:
+        if self.template.has(slot):
+            self._slots[slot] = tag
+        else:
+            self._head_end.append(f'  {tag}\n')
+
+    def title(self, text: str) -> None:
+        self._slots["title"] = f'<title>{text}</title>'
+
+    def meta(self, attr_type: str, attr_name: str, content: str) -> None:
+        self._tag(meta_slot(attr_type, attr_name), f'<meta {attr_type}="{attr_name}" content="{content}">')
+
+    def meta_tags(self, tags: Iterable[Tuple[str, str, str]]) -> None:
+        """Apply (attr_type, attr_name, content) updates."""
+        for attr_type, attr_name, content in tags:
+            self.meta(attr_type, attr_name, content)
+
+    def canonical(self, href: str) -> None:
+        self._tag("canonical", f'<link rel="canonical" href="{href}">')
+
+    def append(self, html: str) -> None:
+        """Add markup just before </head>."""
+        self._head_end.append(html)
+
+    def slots(self) -> Dict[str, str]:
+        """Slot values for CompiledTemplate.render (head slots only)."""
+        values = dict(self._slots)
+        values["head_end"] = "".join(self._head_end)
+        return values
+
+
+@functools.lru_cache(maxsize=4)
+def compile_template(source: str) -> CompiledTemplate:
+    """Compiled form of a document, cached per source string."""
+    return CompiledTemplate(source)
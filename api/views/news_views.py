@@ -1,35 +1,13 @@
 """News views for HTML rendering."""
-from html import escape, unescape
-import re
-from datetime import datetime
+from html import escape
 from urllib.parse import urlparse
+from api.utils.news_content import DEFAULT_DESCRIPTION, derive_news_fields
+from api.views.html_template import HeadRewriter, compile_template
 
 
-def _date_to_iso(date_str: str) -> str:
-    """Chuyển date DD/MM/YYYY hoặc MM/DD/YYYY sang ISO YYYY-MM-DD."""
-    if not date_str or not isinstance(date_str, str):
-        return ""
-    s = date_str.strip()
-    for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%m/%d/%Y"):
-        try:
-            return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
-        except ValueError:
-            continue
-    return ""
-
-
-def normalize_content_headers(html: str) -> str:
-    """Chuẩn SEO: H1->H2, H2->H3, H3->H4 trong content (page đã có H1)."""
-    if not html or not isinstance(html, str):
-        return html or ""
-    # Thay từ cao xuống thấp để tránh replace trùng
-    html = re.sub(r'<h3\b', '<h4', html, flags=re.IGNORECASE)
-    html = re.sub(r'</h3>', '</h4>', html)
-    html = re.sub(r'<h2\b', '<h3', html, flags=re.IGNORECASE)
-    html = re.sub(r'</h2>', '</h3>', html)
-    html = re.sub(r'<h1\b', '<h2', html, flags=re.IGNORECASE)
-    html = re.sub(r'</h1>', '</h2>', html)
-    return html
+def _published_date(news: dict) -> str:
+    """YYYY-MM-DD of a news dict's published_at (stored local time, see News.to_dict)."""
+    return (news.get("published_at") or "")[:10]
 
 
 class NewsViews:
@@ -45,14 +23,6 @@ class NewsViews:
                 return default
             return str(value) if value else default
         
-        # Helper function to get HTML content without escaping (for content field)
-        def safe_get_html(key, default=""):
-            value = news.get(key)
-            if value is None:
-                return default
-            # Return as-is if it's already a string (HTML content)
-            return str(value) if value else default
-        
         title = escape(safe_get("title", "Mountain Harvest"))
         meta_title = escape(safe_get("meta_title") or title)
         h1_custom = escape(safe_get("h1_custom") or title)
@@ -69,22 +39,11 @@ class NewsViews:
             else:
                 image = base_url + "/" + image
         image = escape(image)
-        # Get content as HTML (don't escape, it's already HTML from database)
-        content_raw = safe_get_html("content", "")
-        # If content appears to be escaped HTML (contains &lt; or &gt;), unescape it
-        # This handles cases where content might be double-escaped
-        if content_raw and ('&lt;' in content_raw or '&gt;' in content_raw or '&amp;' in content_raw):
-            # Check if it's actually escaped HTML (not just contains these in text)
-            if '&lt;p' in content_raw or '&lt;div' in content_raw or '&lt;h' in content_raw:
-                content_raw = unescape(content_raw)
-        # Normalize headers for SEO (H1->H2, H2->H3, H3->H4)
-        content = normalize_content_headers(content_raw)
+        # Derived content fields are stored at write time; compute them for mock data / rows without them
+        derived = news if news.get("content_html") is not None else derive_news_fields(news.get("content"))
         author = escape(safe_get("author", ""))
         date = escape(safe_get("date", ""))
-        # Estimate reading time from plain text content
-        text_content = re.sub(r'<[^>]+>', '', content or '')
-        word_count = len(re.findall(r'\w+', text_content))
-        reading_minutes = max(1, word_count // 200) if word_count else 1
+        reading_minutes = derived.get("reading_minutes") or 1
         reading_time_label = f"{reading_minutes} phút đọc"
         share_url = escape(current_url)
         
@@ -93,17 +52,17 @@ class NewsViews:
         if meta_description:
             description_escaped = escape(meta_description)
         else:
-            description = re.sub(r'<[^>]+>', '', content)
-            description = description.strip()[:160] if description.strip() else "Tin tức từ Mountain Harvest"
-            description_escaped = escape(description)
+            description_escaped = escape(derived.get("description_auto") or DEFAULT_DESCRIPTION)
         
         # Update title with meta_title
         page_title = f"{meta_title} - Mountain Harvest" if meta_title != title else f"{title} - Mountain Harvest"
-        base_html = re.sub(r'<title>.*?</title>', f'<title>{page_title}</title>', base_html, flags=re.IGNORECASE | re.DOTALL)
+        template = compile_template(base_html)
+        head = HeadRewriter(template)
+        head.title(page_title)
         
-        # Update or add meta tags - use more flexible regex that matches any content value
-        date_iso = _date_to_iso(date)
-        date_pub_iso = date_iso + "T00:00:00+07:00" if date_iso else ""
+        # Update or add meta tags
+        date_iso = _published_date(news)
+        date_pub_iso = news.get("published_at") or ""
         updated_at = news.get("updated_at") if news.get("updated_at") is not None else None
         updated_iso = ""
         if updated_at and hasattr(updated_at, 'strftime'):
@@ -139,38 +98,16 @@ class NewsViews:
                 ('name', 'twitter:image', image),
             ])
         
-        for attr_type, attr_name, attr_value in meta_tags_to_update:
-            # Pattern to match existing meta tag (matches any content value including empty)
-            if attr_type == 'property':
-                pattern = rf'<meta\s+property=["\']{re.escape(attr_name)}["\'][^>]*>'
-                replacement = f'<meta property="{attr_name}" content="{attr_value}">'
-            else:
-                pattern = rf'<meta\s+name=["\']{re.escape(attr_name)}["\'][^>]*>'
-                replacement = f'<meta name="{attr_name}" content="{attr_value}">'
-            
-            # Try to replace existing tag
-            if re.search(pattern, base_html, flags=re.IGNORECASE):
-                base_html = re.sub(pattern, replacement, base_html, flags=re.IGNORECASE, count=1)
-            else:
-                # Add new meta tag before </head> if not found
-                new_tag = f'  <meta {attr_type}="{attr_name}" content="{attr_value}">\n'
-                base_html = base_html.replace('</head>', new_tag + '</head>', 1)
+        head.meta_tags(meta_tags_to_update)
         
-        # Add canonical link
-        canonical_tag = f'<link rel="canonical" href="{escape(current_url)}">'
-        if re.search(r'<link\s+rel=["\']canonical["\']', base_html, flags=re.IGNORECASE):
-            base_html = re.sub(r'<link\s+rel=["\']canonical["\'][^>]*>', canonical_tag, base_html, flags=re.IGNORECASE, count=1)
-        else:
-            base_html = base_html.replace('</head>', f'  {canonical_tag}\n</head>', 1)
+        head.canonical(escape(current_url))
 
         # Preload cover image for LCP
         if image:
-            preload_tag = f'<link rel="preload" as="image" href="{image}" fetchpriority="high">'
-            base_html = base_html.replace('</head>', preload_tag + '\n</head>', 1)
+            head.append(f'<link rel="preload" as="image" href="{image}" fetchpriority="high">\n')
 
         # Add style to hide shop content and main hero only (not news-detail header)
-        hide_style = '<style>body > header, #main-shop-content { display: none !important; }</style>'
-        base_html = base_html.replace('</head>', hide_style + '\n</head>')
+        head.append('<style>body > header, #main-shop-content { display: none !important; }</style>\n')
         
         # Add Article and BreadcrumbList structured data (JSON-LD)
         article_schema = {
@@ -225,7 +162,7 @@ class NewsViews:
                             "headline": r.get("title", ""),
                             "url": f"{current_url.split('/news')[0]}/news/{r.get('id')}",
                             "image": r.get("image", ""),
-                            "datePublished": _date_to_iso(r.get("date", ""))
+                            "datePublished": _published_date(r)
                         }
                     }
                     for idx, r in enumerate(related_news)
@@ -239,96 +176,10 @@ class NewsViews:
         if related_list_schema:
             related_json = json.dumps(related_list_schema, ensure_ascii=False, indent=2)
             schema_script += f'\n<script type="application/ld+json">\n{related_json}\n</script>'
-        base_html = base_html.replace('</head>', schema_script + '\n</head>', 1)
-        
-        # Clean up empty paragraphs and excessive whitespace
-        def clean_content_html(html_content: str) -> str:
-            """Remove empty paragraphs and clean up whitespace."""
-            if not html_content:
-                return html_content
-            # Remove empty paragraphs (with optional whitespace, <br>, &nbsp;, etc.)
-            # Pattern 1: <p>...</p> with only whitespace, <br>, or &nbsp;
-            html_content = re.sub(
-                r'<p[^>]*>\s*(?:<br\s*/?>|\&nbsp;|\s|&nbsp;)*\s*</p>',
-                '',
-                html_content,
-                flags=re.IGNORECASE | re.MULTILINE
-            )
-            # Pattern 2: <p class="...">...</p> with only whitespace
-            html_content = re.sub(
-                r'<p[^>]*class="[^"]*">\s*(?:<br\s*/?>|\&nbsp;|\s|&nbsp;)*\s*</p>',
-                '',
-                html_content,
-                flags=re.IGNORECASE | re.MULTILINE
-            )
-            # Pattern 3: Paragraphs with only single <br> tag
-            html_content = re.sub(
-                r'<p[^>]*>\s*<br\s*/?>\s*</p>',
-                '',
-                html_content,
-                flags=re.IGNORECASE | re.MULTILINE
-            )
-            # Pattern 4: Paragraphs with only &nbsp; entities
-            html_content = re.sub(
-                r'<p[^>]*>\s*(?:&nbsp;|\&#160;|\u00A0|\s)+\s*</p>',
-                '',
-                html_content,
-                flags=re.IGNORECASE | re.MULTILINE
-            )
-            # Remove multiple consecutive empty paragraphs (after cleaning)
-            html_content = re.sub(
-                r'(</p>\s*){2,}(<p[^>]*>\s*</p>\s*)*',
-                '</p>',
-                html_content,
-                flags=re.IGNORECASE
-            )
-            # Clean up excessive line breaks within content (more than 2 consecutive)
-            html_content = re.sub(
-                r'(<br\s*/?>\s*){3,}',
-                '<br><br>',
-                html_content,
-                flags=re.IGNORECASE
-            )
-            # Remove leading/trailing empty paragraphs
-            html_content = re.sub(
-                r'^\s*(?:<p[^>]*>\s*</p>\s*)+',
-                '',
-                html_content,
-                flags=re.IGNORECASE | re.MULTILINE
-            )
-            html_content = re.sub(
-                r'(?:<p[^>]*>\s*</p>\s*)+$',
-                '',
-                html_content,
-                flags=re.IGNORECASE | re.MULTILINE
-            )
-            return html_content
-        
-        # Process content to make images full-width
-        def process_content_images(html_content: str) -> str:
-            """Process content HTML to make images full-width and add responsive classes."""
-            if not html_content:
-                return html_content
-            # Add news-content-img class to all images
-            # Handle images with existing class attribute
-            html_content = re.sub(
-                r'<img([^>]*?)\s+class=["\']([^"\']*?)["\']([^>]*?)>',
-                lambda m: f'<img{m.group(1)} class="{m.group(2)} news-content-img"{m.group(3)}>',
-                html_content,
-                flags=re.IGNORECASE
-            )
-            # Handle images without class attribute
-            html_content = re.sub(
-                r'<img((?:(?!\s+class=)[^>])*)>',
-                r'<img class="news-content-img"\1>',
-                html_content,
-                flags=re.IGNORECASE
-            )
-            return html_content
+        head.append(schema_script + '\n')
+        slots = head.slots()
         
-        # Clean content first, then process images
-        cleaned_content = clean_content_html(content)
-        processed_content = process_content_images(cleaned_content)
+        processed_content = derived["content_html"]
         
         # Render news detail content (without hidden class)
         # Add data attribute to indicate server-rendered content
@@ -345,7 +196,7 @@ class NewsViews:
             </ol>
           </nav>
           <div class="flex flex-wrap items-center gap-3 md:gap-4 text-xs md:text-sm text-gray-200 mb-4">
-            {f'<time id="news-detail-date" class="inline-flex items-center gap-1.5 px-3 py-1.5 rounded-full bg-white/10 backdrop-blur-sm" datetime="{_date_to_iso(date)}"><i class="far fa-calendar-alt"></i> <span>{date}</span></time>' if date else '<time id="news-detail-date" class="inline-flex items-center gap-1" datetime=""></time>'}
+            {f'<time id="news-detail-date" class="inline-flex items-center gap-1.5 px-3 py-1.5 rounded-full bg-white/10 backdrop-blur-sm" datetime="{date_iso}"><i class="far fa-calendar-alt"></i> <span>{date}</span></time>' if date else '<time id="news-detail-date" class="inline-flex items-center gap-1" datetime=""></time>'}
             {f'<span id="news-detail-author" class="inline-flex items-center gap-1.5 px-3 py-1.5 rounded-full bg-white/10 backdrop-blur-sm"><i class="far fa-user"></i> <span>{author}</span></span>' if author else '<span id="news-detail-author" class="inline-flex items-center gap-1"></span>'}
             <span class="inline-flex items-center gap-1.5 px-3 py-1.5 rounded-full bg-white/10 backdrop-blur-sm"><i class="far fa-clock"></i> <span>{reading_time_label}</span></span>
           </div>
@@ -406,30 +257,12 @@ class NewsViews:
     </article>'''
         
         # Skip products.js on news detail page to reduce payload
-        base_html = re.sub(
-            r'<script\s+src=["\']/js/products\.js["\'][^>]*></script>',
-            '<!-- products.js skipped on news page -->',
-            base_html,
-            flags=re.IGNORECASE,
-            count=1,
-        )
+        slots["script:products.js"] = '<!-- products.js skipped on news page -->'
 
-        # Replace existing news-detail section (match multiline with DOTALL)
-        # Pattern matches from <article id="news-detail" to closing </article>
-        news_detail_pattern = r'<article id="news-detail"[^>]*>[\s\S]*?</article>'
-        if re.search(news_detail_pattern, base_html):
-            base_html = re.sub(
-                news_detail_pattern,
-                news_detail_html,
-                base_html,
-                count=1  # Only replace first match
-            )
+        # Replace the template's news-detail article, or insert before </main> if missing
+        if template.has("article:news-detail"):
+            slots["article:news-detail"] = news_detail_html
         else:
-            # Insert before closing main tag if not found
-            base_html = re.sub(
-                r'(</main>)',
-                news_detail_html + r'\1',
-                base_html
-            )
+            slots["main_end"] = news_detail_html
         
-        return base_html
+        return template.render(slots)
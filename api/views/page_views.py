@@ -2,6 +2,7 @@
 from html import escape
 import re
 from urllib.parse import urlparse
+from api.views.html_template import HeadRewriter, compile_template
 
 
 class PageViews:
@@ -21,7 +22,9 @@ class PageViews:
             description_escaped = escape(desc_plain[:160] if desc_plain else f"{title} - Mountain Harvest")
 
         page_title = f"{meta_title} - Mountain Harvest" if meta_title != title else f"{title} - Mountain Harvest"
-        base_html = re.sub(r'<title>.*?</title>', f'<title>{page_title}</title>', base_html, flags=re.IGNORECASE | re.DOTALL)
+        template = compile_template(base_html)
+        head = HeadRewriter(template)
+        head.title(page_title)
 
         meta_tags = [
             ('name', 'description', description_escaped),
@@ -33,26 +36,12 @@ class PageViews:
             ('name', 'twitter:description', description_escaped),
             ('name', 'twitter:card', 'summary'),
         ]
-        for attr_type, attr_name, attr_value in meta_tags:
-            if attr_type == 'property':
-                pattern = rf'<meta\s+property=["\']{re.escape(attr_name)}["\'][^>]*>'
-                replacement = f'<meta property="{attr_name}" content="{attr_value}">'
-            else:
-                pattern = rf'<meta\s+name=["\']{re.escape(attr_name)}["\'][^>]*>'
-                replacement = f'<meta name="{attr_name}" content="{attr_value}">'
-            if re.search(pattern, base_html, flags=re.IGNORECASE):
-                base_html = re.sub(pattern, replacement, base_html, flags=re.IGNORECASE, count=1)
-            else:
-                base_html = base_html.replace('</head>', f'  <meta {attr_type}="{attr_name}" content="{attr_value}">\n</head>', 1)
+        head.meta_tags(meta_tags)
 
-        canonical_tag = f'<link rel="canonical" href="{escape(current_url)}">'
-        if re.search(r'<link\s+rel=["\']canonical["\']', base_html, flags=re.IGNORECASE):
-            base_html = re.sub(r'<link\s+rel=["\']canonical["\'][^>]*>', canonical_tag, base_html, flags=re.IGNORECASE, count=1)
-        else:
-            base_html = base_html.replace('</head>', f'  {canonical_tag}\n</head>', 1)
+        head.canonical(escape(current_url))
 
-        hide_style = '<style>header.relative, #main-shop-content { display: none !important; }</style>'
-        base_html = base_html.replace('</head>', hide_style + '\n</head>')
+        head.append('<style>header.relative, #main-shop-content { display: none !important; }</style>\n')
+        slots = head.slots()
 
         page_html = f'''<article id="page-detail" class="w-full bg-brand-cream/40" data-server-rendered="true">
       <div class="max-w-4xl mx-auto px-4 sm:px-6 lg:px-8 py-8 md:py-12">
@@ -68,16 +57,9 @@ class PageViews:
     </article>'''
         page_html = page_html.replace("__PAGE_CONTENT__", content or "<p>Nội dung đang cập nhật.</p>")
 
-        base_html = re.sub(
-            r'<script\s+src=["\']/js/products\.js["\'][^>]*></script>',
-            '<!-- products.js skipped on page -->',
-            base_html, flags=re.IGNORECASE, count=1,
-        )
-
-        page_pattern = r'<article id="page-detail"[^>]*>[\s\S]*?</article>'
-        if re.search(page_pattern, base_html):
-            base_html = re.sub(page_pattern, page_html, base_html, count=1)
+        slots["script:products.js"] = '<!-- products.js skipped on page -->'
+        if template.has("article:page-detail"):
+            slots["article:page-detail"] = page_html
         else:
-            base_html = re.sub(r'(</main>)', page_html + r'\1', base_html)
-
-        return base_html
+            slots["main_end"] = page_html
+        return template.render(slots)
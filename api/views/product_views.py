@@ -3,20 +3,15 @@ from html import escape
 import json
 import re
 from urllib.parse import urlparse
+from api.utils.text import fold_diacritics
+from api.views.html_template import HeadRewriter, compile_template
 
 
 def _slugify(text: str) -> str:
     """Convert text to URL-friendly slug."""
     if not text or not isinstance(text, str):
         return ""
-    s = text.lower().strip()
-    s = re.sub(r'[àáạảãâầấậẩẫăằắặẳẵ]', 'a', s)
-    s = re.sub(r'[èéẹẻẽêềếệểễ]', 'e', s)
-    s = re.sub(r'[ìíịỉĩ]', 'i', s)
-    s = re.sub(r'[òóọỏõôồốộổỗơờớợởỡ]', 'o', s)
-    s = re.sub(r'[ùúụủũưừứựửữ]', 'u', s)
-    s = re.sub(r'[ỳýỵỷỹ]', 'y', s)
-    s = re.sub(r'đ', 'd', s)
+    s = fold_diacritics(text).strip()
     s = re.sub(r'[^a-z0-9\s-]', '', s)
     s = re.sub(r'[\s_-]+', '-', s)
     return s.strip('-')
@@ -52,7 +47,9 @@ class ProductViews:
             description_escaped = escape(desc_plain[:160] if desc_plain.strip() else f"{title} - Mountain Harvest")
 
         page_title = f"{meta_title} - Mountain Harvest" if meta_title != title else f"{title} - Mountain Harvest"
-        base_html = re.sub(r'<title>.*?</title>', f'<title>{page_title}</title>', base_html, flags=re.IGNORECASE | re.DOTALL)
+        template = compile_template(base_html)
+        head = HeadRewriter(template)
+        head.title(page_title)
 
         meta_tags_to_update = [
             ('name', 'description', description_escaped),
@@ -72,30 +69,14 @@ class ProductViews:
                 ('name', 'twitter:image', image),
             ])
 
-        for attr_type, attr_name, attr_value in meta_tags_to_update:
-            if attr_type == 'property':
-                pattern = rf'<meta\s+property=["\']{re.escape(attr_name)}["\'][^>]*>'
-                replacement = f'<meta property="{attr_name}" content="{attr_value}">'
-            else:
-                pattern = rf'<meta\s+name=["\']{re.escape(attr_name)}["\'][^>]*>'
-                replacement = f'<meta name="{attr_name}" content="{attr_value}">'
-            if re.search(pattern, base_html, flags=re.IGNORECASE):
-                base_html = re.sub(pattern, replacement, base_html, flags=re.IGNORECASE, count=1)
-            else:
-                base_html = base_html.replace('</head>', f'  <meta {attr_type}="{attr_name}" content="{attr_value}">\n</head>', 1)
-
-        canonical_tag = f'<link rel="canonical" href="{escape(current_url)}">'
-        if re.search(r'<link\s+rel=["\']canonical["\']', base_html, flags=re.IGNORECASE):
-            base_html = re.sub(r'<link\s+rel=["\']canonical["\'][^>]*>', canonical_tag, base_html, flags=re.IGNORECASE, count=1)
-        else:
-            base_html = base_html.replace('</head>', f'  {canonical_tag}\n</head>', 1)
+        head.meta_tags(meta_tags_to_update)
+
+        head.canonical(escape(current_url))
 
         if image:
-            preload_tag = f'<link rel="preload" as="image" href="{image}" fetchpriority="high">'
-            base_html = base_html.replace('</head>', preload_tag + '\n</head>', 1)
+            head.append(f'<link rel="preload" as="image" href="{image}" fetchpriority="high">\n')
 
-        hide_style = '<style>header.relative, #main-shop-content { display: none !important; }</style>'
-        base_html = base_html.replace('</head>', hide_style + '\n</head>')
+        head.append('<style>header.relative, #main-shop-content { display: none !important; }</style>\n')
 
         product_schema = {
             "@context": "https://schema.org",
@@ -123,7 +104,8 @@ class ProductViews:
         schema_json = json.dumps(product_schema, ensure_ascii=False, indent=2)
         breadcrumb_json = json.dumps(breadcrumb_schema, ensure_ascii=False, indent=2)
         schema_script = f'<script type="application/ld+json">\n{schema_json}\n</script>\n<script type="application/ld+json">\n{breadcrumb_json}\n</script>'
-        base_html = base_html.replace('</head>', schema_script + '\n</head>', 1)
+        head.append(schema_script + '\n')
+        slots = head.slots()
 
         price_display = f"{price:,}đ"
         if unit:
@@ -174,16 +156,9 @@ class ProductViews:
 
         product_detail_html = product_detail_html.replace("__PRODUCT_DESC__", description_raw or "<p>Liên hệ để biết thêm chi tiết.</p>")
 
-        base_html = re.sub(
-            r'<script\s+src=["\']/js/products\.js["\'][^>]*></script>',
-            '<!-- products.js skipped on product page -->',
-            base_html, flags=re.IGNORECASE, count=1,
-        )
-
-        product_detail_pattern = r'<article id="product-detail"[^>]*>[\s\S]*?</article>'
-        if re.search(product_detail_pattern, base_html):
-            base_html = re.sub(product_detail_pattern, product_detail_html, base_html, count=1)
+        slots["script:products.js"] = '<!-- products.js skipped on product page -->'
+        if template.has("article:product-detail"):
+            slots["article:product-detail"] = product_detail_html
         else:
-            base_html = re.sub(r'(</main>)', product_detail_html + r'\1', base_html)
-
-        return base_html
+            slots["main_end"] = product_detail_html
+        return template.render(slots)
@@ -0,0 +1,138 @@
+"""Re-render pages affected by admin edits in the background.
+
+Repository writes purge the page cache; without this the next shopper to hit
+each affected page pays for its render. Admin views call
+`Regeneration.schedule(kind, ident)` after a save. Once the transaction
+commits, a single worker thread expands the edit through the dependency map
+below and renders those pages back into the caches:
+
+- product -> its detail page, and the first home listing page (all products
+  and its category), which warms the result cache and card fragments
+- news    -> its detail page, the pages listing it as related (news_related,
+  plus the latest ones that top up short lists) and the first news listing
+  page
+- page    -> its detail page (scheduled by page id, rendered at the slug
+  stored when the job runs)
+- site    -> (hero, site_config, categories, brochures) the site chrome
+  snapshot only: detail pages and listings do not contain the chrome, which
+  the browser loads from /api/site or /api/bootstrap
+
+Detail pages are rendered for each origin (scheme://host) the page cache
+has served, at their canonical path. Set PAGE_REGENERATION=False to disable.
+"""
+import logging
+import queue
+import threading
+from typing import Hashable, List, Optional, Set, Tuple
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from api.cache.pages import PageCache
+from api.services.news_service import NewsService
+from api.services.product_service import ProductService
+from api.services.site_service import SiteService
+from api.views.detail_pages import CONTENT_TYPES, DetailPages
+from api.views.frontend_views import _get_index_html
+from api.views.home_views import HomeViews
+
+logger = logging.getLogger(__name__)
+
+# Same page sizes as frontend_views.index
+_HOME_PRODUCTS = 8
+_HOME_NEWS = 6
+
+
+class Regeneration:
+    """Dependency-tracked regeneration queue with one background worker."""
+
+    _queue: "queue.Queue[Tuple[str, Optional[Hashable]]]" = queue.Queue()
+    _lock = threading.Lock()
+    _thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def enabled() -> bool:
+        return getattr(settings, 'PAGE_REGENERATION', True)
+
+    @staticmethod
+    def schedule(kind: str, ident: Optional[Hashable] = None) -> None:
+        """Queue regeneration for an edited row once the current transaction commits."""
+        if not Regeneration.enabled():
+            return
+        transaction.on_commit(lambda: Regeneration._enqueue(kind, ident))
+
+    @staticmethod
+    def _enqueue(kind: str, ident: Optional[Hashable]) -> None:
+        with Regeneration._lock:
+            if Regeneration._thread is None or not Regeneration._thread.is_alive():
+                Regeneration._thread = threading.Thread(
+                    target=Regeneration._run, name="page-regeneration", daemon=True
+                )
+                Regeneration._thread.start()
+        Regeneration._queue.put((kind, ident))
+
+    @staticmethod
+    def _run() -> None:
+        while True:
+            edits = [Regeneration._queue.get()]
+            # Coalesce a burst of saves into one pass
+            while not Regeneration._queue.empty():
+                edits.append(Regeneration._queue.get_nowait())
+            try:
+                Regeneration.regenerate(edits)
+            except Exception as e:
+                logger.warning(f"Page regeneration failed for {edits}: {e}", exc_info=True)
+            finally:
+                close_old_connections()
+
+    @staticmethod
+    def affected(kind: str, ident: Optional[Hashable]) -> Tuple[List[Tuple[str, Hashable]], Set[str]]:
+        """Dependency map: (detail pages, listings) to re-render after editing a row."""
+        if kind == "product":
+            return [("product", ident)], {"products"}
+        if kind == "news":
+            pages = [("news", ident)] + [("news", nid) for nid in DetailPages.news_referrers(ident) if nid != ident]
+            return pages, {"news"}
+        if kind == "page":
+            slug = DetailPages.page_slug(ident)
+            return ([("page", slug)] if slug else []), set()
+        # site: no rendered page depends on the chrome
+        return [], set()
+
+    @staticmethod
+    def regenerate(edits: List[Tuple[str, Optional[Hashable]]]) -> int:
+        """Re-render everything the edits affect. Returns the number of detail pages rendered."""
+        pages: List[Tuple[str, Hashable]] = []
+        listings: Set[str] = set()
+        for kind, ident in edits:
+            affected_pages, affected_listings = Regeneration.affected(kind, ident)
+            pages.extend(affected_pages)
+            listings |= affected_listings
+        if any(kind == "site" for kind, _ in edits):
+            SiteService.get_site()
+
+        base_html = _get_index_html()
+        origins = PageCache.origins()
+        rendered = 0
+        categories: Set[Optional[str]] = {None}
+        for route, ident in dict.fromkeys(pages):
+            generation = PageCache.generation(route)
+            row = DetailPages.load(route, ident)
+            if row is None:
+                continue
+            if route == "product":
+                categories.add(row.get("category"))
+            if not base_html:
+                continue
+            path = DetailPages.path(route, ident)
+            for origin in origins:
+                url = origin + path
+                html = DetailPages.render(base_html, route, row, url)
+                PageCache.set(route, ident, url, html, CONTENT_TYPES[route], generation, row.get("updated_at"))
+                rendered += 1
+
+        if "products" in listings:
+            for category in categories:
+                items, _, _ = ProductService.get_products(category=category, page=1, limit=_HOME_PRODUCTS, view="card")
+                HomeViews._render_products(items)
+        if "news" in listings:
+            NewsService.get_news(page=1, limit=_HOME_NEWS)
+        return rendered
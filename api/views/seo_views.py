@@ -1,9 +1,25 @@
 """SEO views for sitemap and robots."""
+import hashlib
+import logging
 import os
-from django.http import HttpResponse
+import time
+from datetime import datetime, timezone
+from typing import Callable, Iterator, List
+from urllib.parse import quote
+from xml.sax.saxutils import escape as xml_escape
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from api.cache.local import GenerationCache
 from api.models.product import Product
 from api.models.news import News
 from api.models.page import Page
+from api.repositories.news_repository import NewsRepository
+
+logger = logging.getLogger(__name__)
 
 
 def _get_base_url(request) -> str:
@@ -13,68 +29,224 @@ def _get_base_url(request) -> str:
     return os.getenv("SITE_URL", "https://mountainharvest.vn")
 
 
-def sitemap(request):
-    """Generate sitemap.xml."""
-    base = _get_base_url(request)
-    urls = []
+# section -> (model, ident column, URL pattern, changefreq, priority, generation table)
+_SECTIONS = {
+    "pages": (Page, "slug", "/p/{}", "monthly", "0.5", "pages"),
+    "products": (Product, "id", "/products/{}", "weekly", "0.8", "products"),
+    "news": (News, "id", "/news/{}", "weekly", "0.7", "news"),
+}
+_caches = {name: GenerationCache(table, max_entries=64) for name, (*_, table) in _SECTIONS.items()}
+# base URL -> (generations of all sections, index XML, built_at)
+_index_cache: dict = {}
+_XML_HEAD = '<?xml version="1.0" encoding="UTF-8"?>\n'
+_STREAM_BATCH = 1000
+_ATOM = "application/atom+xml; charset=utf-8"
+
+
+def _chunk_size() -> int:
+    return getattr(settings, 'SITEMAP_CHUNK_SIZE', 50000)
+
+
+def _section_stats(section: str) -> tuple:
+    """(row count, latest updated_at) of a section, cached until its table changes."""
+    cache = _caches[section]
+    stats = cache.get(("stats",))
+    if stats is None:
+        generation = cache.generation()
+        model = _SECTIONS[section][0]
+        agg = model.objects.aggregate(count=Count('id'), last=Max('updated_at'))
+        stats = (agg["count"], agg["last"])
+        cache.set(("stats",), stats, generation)
+    return stats
+
+
+def _chunk_count(section: str) -> int:
+    count, _ = _section_stats(section)
+    if section == "pages":
+        count += 1  # home page
+    return max(1, -(-count // _chunk_size()))
 
-    urls.append(f"""  <url>
-    <loc>{base}/</loc>
+
+def _xml_response(request, body, built_at: int, streaming: bool = False):
+    """Sitemap response with Last-Modified (304 when the client's copy is current)."""
+    response = get_conditional_response(request, last_modified=built_at)
+    if response is None:
+        if streaming:
+            response = StreamingHttpResponse(body, content_type="application/xml")
+        else:
+            response = HttpResponse(body, content_type="application/xml")
+    response['Last-Modified'] = http_date(built_at)
+    response['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+
+def _url_entry(base: str, section: str, ident, updated_at) -> str:
+    _, _, pattern, changefreq, priority, _ = _SECTIONS[section]
+    loc = xml_escape(base + pattern.format(quote(str(ident), safe='')))
+    lastmod = f"\n    <lastmod>{updated_at.strftime('%Y-%m-%d')}</lastmod>" if updated_at else ""
+    return f"""  <url>
+    <loc>{loc}</loc>{lastmod}
+    <changefreq>{changefreq}</changefreq>
+    <priority>{priority}</priority>
+  </url>
+"""
+
+
+def _iter_chunk(base: str, section: str, number: int) -> Iterator[str]:
+    """XML of one child sitemap, in batches, reading only (ident, updated_at) rows."""
+    model, column = _SECTIONS[section][:2]
+    size = _chunk_size()
+    offset = (number - 1) * size
+    yield _XML_HEAD + '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    if section == "pages":
+        if number == 1:
+            yield f"""  <url>
+    <loc>{xml_escape(base)}/</loc>
     <changefreq>daily</changefreq>
     <priority>1.0</priority>
-  </url>""")
+  </url>
+"""
+            size -= 1
+        else:
+            offset -= 1
+    ordering = ('sort_order', 'id') if section == "pages" else ('id',)
+    rows = model.objects.order_by(*ordering).values_list(column, 'updated_at')[offset:offset + size]
+    batch: List[str] = []
+    for ident, updated_at in rows.iterator(chunk_size=2000):
+        batch.append(_url_entry(base, section, ident, updated_at))
+        if len(batch) >= _STREAM_BATCH:
+            yield "".join(batch)
+            batch = []
+    batch.append("</urlset>")
+    yield "".join(batch)
+
+
+def _caching(parts: Iterator[str], store: Callable[[bytes], None]) -> Iterator[bytes]:
+    """Stream `parts`, then hand the complete body to `store` once the last one is sent."""
+    body: List[bytes] = []
+    for part in parts:
+        data = part.encode("utf-8")
+        body.append(data)
+        yield data
+    store(b"".join(body))
 
+
+def sitemap(request):
+    """Sitemap index pointing at the paged child sitemaps."""
+    base = _get_base_url(request)
+    generations = tuple(_caches[section].generation() for section in _SECTIONS)
+    cached = _index_cache.get(base)
+    if cached is not None and cached[0] == generations:
+        return _xml_response(request, cached[1], cached[2])
     try:
-        products = Product.objects.all().order_by('id')
-        for p in products:
-            lastmod = ""
-            if p.created_at:
-                try:
-                    lastmod = f"\n    <lastmod>{p.created_at.strftime('%Y-%m-%d')}</lastmod>"
-                except Exception:
-                    pass
-            urls.append(f"""  <url>
-    <loc>{base}/products/{p.id}</loc>{lastmod}
-    <changefreq>weekly</changefreq>
-    <priority>0.8</priority>
-  </url>""")
-
-        news_items = News.objects.all().order_by('id')
-        for n in news_items:
-            lastmod = ""
-            dt = n.updated_at or n.created_at
-            if dt:
-                try:
-                    lastmod = f"\n    <lastmod>{dt.strftime('%Y-%m-%d')}</lastmod>"
-                except Exception:
-                    pass
-            urls.append(f"""  <url>
-    <loc>{base}/news/{n.id}</loc>{lastmod}
-    <changefreq>weekly</changefreq>
-    <priority>0.7</priority>
-  </url>""")
-
-        pages = Page.objects.all().order_by('sort_order')
-        for p in pages:
-            lastmod = ""
-            if p.updated_at:
-                try:
-                    lastmod = f"\n    <lastmod>{p.updated_at.strftime('%Y-%m-%d')}</lastmod>"
-                except Exception:
-                    pass
-            urls.append(f"""  <url>
-    <loc>{base}/p/{p.slug}</loc>{lastmod}
-    <changefreq>monthly</changefreq>
-    <priority>0.5</priority>
-  </url>""")
-    except Exception:
-        pass
-
-    xml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-{chr(10).join(urls)}
-</urlset>"""
-    return HttpResponse(xml, content_type="application/xml")
+        entries = []
+        for section in _SECTIONS:
+            _, last = _section_stats(section)
+            lastmod = f"\n    <lastmod>{last.strftime('%Y-%m-%d')}</lastmod>" if last else ""
+            for number in range(1, _chunk_count(section) + 1):
+                entries.append(f"""  <sitemap>
+    <loc>{xml_escape(base)}/sitemap-{section}-{number}.xml</loc>{lastmod}
+  </sitemap>""")
+    except DatabaseError as e:
+        logger.error(f"Sitemap index unavailable: {e}")
+        return HttpResponse("Sitemap temporarily unavailable", status=503, content_type="text/plain")
+    xml = _XML_HEAD + f"""<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{chr(10).join(entries)}
+</sitemapindex>"""
+    built_at = int(time.time())
+    _index_cache[base] = (generations, xml, built_at)
+    return _xml_response(request, xml, built_at)
+
+
+def sitemap_chunk(request, section, number):
+    """One child sitemap (up to SITEMAP_CHUNK_SIZE URLs), streamed and cached per table generation."""
+    if section not in _SECTIONS or number < 1:
+        raise Http404("Unknown sitemap")
+    base = _get_base_url(request)
+    cache = _caches[section]
+    key = ("chunk", base, number, _chunk_size())
+    cached = cache.get(key)
+    if cached is not None:
+        body, built_at = cached
+        return _xml_response(request, body, built_at)
+    generation = cache.generation()
+    try:
+        if number > _chunk_count(section):
+            raise Http404("Unknown sitemap")
+    except DatabaseError as e:
+        logger.error(f"Sitemap {section}-{number} unavailable: {e}")
+        return HttpResponse("Sitemap temporarily unavailable", status=503, content_type="text/plain")
+    built_at = int(time.time())
+    parts = _caching(_iter_chunk(base, section, number), lambda body: cache.set(key, (body, built_at), generation))
+    return _xml_response(request, parts, built_at, streaming=True)
+
+
+def _iso(dt) -> str:
+    return dt.isoformat(timespec='seconds') if dt else ""
+
+
+def _iter_feed(base: str, items: List[dict]) -> Iterator[str]:
+    """Atom document for the given feed items (newest first)."""
+    feed_url = xml_escape(f"{base}/news/feed.xml")
+    updated = max((item["updated_at"] for item in items if item["updated_at"]), default=None) or datetime.now(timezone.utc)
+    yield f"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="vi">
+  <title>Mountain Harvest - Tin tức</title>
+  <id>{feed_url}</id>
+  <link rel="self" type="application/atom+xml" href="{feed_url}"/>
+  <link rel="alternate" type="text/html" href="{xml_escape(base)}/"/>
+  <updated>{_iso(updated)}</updated>
+"""
+    for item in items:
+        url = xml_escape(f"{base}/news/{item['id']}/")
+        published = item["published_at"] or item["updated_at"] or updated
+        yield f"""  <entry>
+    <title>{xml_escape(item['title'] or '')}</title>
+    <id>{url}</id>
+    <link rel="alternate" type="text/html" href="{url}"/>
+    <updated>{_iso(item['updated_at'] or published)}</updated>
+    <published>{_iso(published)}</published>
+    <author><name>{xml_escape(item['author'] or 'Mountain Harvest')}</name></author>
+    <summary>{xml_escape(item['excerpt'] or '')}</summary>
+  </entry>
+"""
+    yield "</feed>\n"
+
+
+def news_feed(request):
+    """Atom feed of the latest news, cached until a news row changes."""
+    base = _get_base_url(request)
+    cache = _caches["news"]
+    key = ("feed", base)
+    cached = cache.get(key)
+    if cached is None:
+        generation = cache.generation()
+        try:
+            items = NewsRepository.get_feed_items(limit=getattr(settings, 'NEWS_FEED_SIZE', 20))
+        except DatabaseError as e:
+            logger.error(f"News feed unavailable: {e}")
+            return HttpResponse("Feed temporarily unavailable", status=503, content_type="text/plain")
+        # Validators depend only on the rows, so every worker agrees on them
+        signature = repr([(base,)] + [(item["id"], _iso(item["updated_at"])) for item in items])
+        etag = '"' + hashlib.sha1(signature.encode("utf-8")).hexdigest() + '"'
+        updated = max((item["updated_at"] for item in items if item["updated_at"]), default=None)
+        last_modified = int(updated.timestamp()) if updated else int(time.time())
+        body = None
+    else:
+        etag, last_modified, body = cached
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if body is not None:
+            response = HttpResponse(body, content_type=_ATOM)
+        else:
+            def store(data: bytes) -> None:
+                cache.set(key, (etag, last_modified, data), generation)
+            response = StreamingHttpResponse(_caching(_iter_feed(base, items), store), content_type=_ATOM)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'public, max-age=300'
+    return response
 
 
 def robots(request):
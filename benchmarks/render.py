@@ -0,0 +1,103 @@
+"""Time SSR rendering: the regex-based renderers before the compiled index.html template vs the current ones.
+
+The baseline is loaded from git history (the commit before the template,
+``--baseline``), not kept in the app. Home fragments (product cards, news
+cards, pagination) come from the current HomeViews on both sides, so the
+home comparison measures page assembly only. Mock data, no database:
+
+    python benchmarks/render.py [--iterations 2000] [--baseline REV]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mountain_harvest.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.services.news_service import NewsService  # noqa: E402
+from api.services.product_service import ProductService  # noqa: E402
+from api.views.frontend_views import _get_index_html  # noqa: E402
+from api.views.home_views import HomeViews  # noqa: E402
+from api.views.html_template import compile_template  # noqa: E402
+from api.views.product_views import ProductViews  # noqa: E402
+
+# Last commit with the regex-based renderers
+BASELINE = "504c2f0"
+_FRAGMENTS = ("_build_url", "_render_products", "_render_product_pagination", "_render_news", "_render_news_pagination")
+
+
+def load_baseline(rev: str, path: str) -> types.ModuleType:
+    """Import a module as it was at `rev`."""
+    source = subprocess.run(
+        ["git", "show", f"{rev}:{path}"], cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    module = types.ModuleType(f"baseline_{Path(path).stem}")
+    exec(compile(source, f"{rev}:{path}", "exec"), module.__dict__)
+    return module
+
+
+def time_call(func, iterations: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--baseline', default=BASELINE, help=f'git revision of the previous renderers (default {BASELINE})')
+    args = parser.parse_args()
+
+    base_html = _get_index_html()
+    if not base_html:
+        sys.exit("public/index.html not found")
+    n = args.iterations
+    template = compile_template(base_html)
+
+    old_home = load_baseline(args.baseline, "api/views/home_views.py").HomeViews
+    for name in _FRAGMENTS:
+        setattr(old_home, name, staticmethod(getattr(HomeViews, name)))
+    old_product = load_baseline(args.baseline, "api/views/product_views.py").ProductViews
+
+    products_page = {"items": ProductService._mock_products() * 4, "page": 2, "total_pages": 5}
+    news_page = {"items": NewsService._mock_news() * 6, "page": 1, "total_pages": 3}
+    filters = {"search": "rau"}
+    product = dict(ProductService._mock_products()[0], meta_description="Cà chua cherry hữu cơ Đà Lạt")
+    url = "https://mountainharvest.vn/products/1/"
+
+    cases = [
+        (
+            "home",
+            lambda: old_home.render_home(base_html, products_page, news_page, filters),
+            lambda: HomeViews.render_home(base_html, products_page, news_page, filters),
+        ),
+        (
+            "product detail",
+            lambda: old_product.render_detail(base_html, product, url),
+            lambda: ProductViews.render_detail(base_html, product, url),
+        ),
+    ]
+    print(f"index.html: {len(base_html.encode('utf-8'))} bytes, {len(template.slots)} slots, {n} iterations, baseline {args.baseline}")
+    for label, before, after in cases:
+        # Later changes to the renderers may legitimately change the markup
+        same = "identical output" if before() == after() else "output differs from baseline"
+        before_us, after_us = time_call(before, n), time_call(after, n)
+        print(
+            f"  {label:<16} baseline {before_us:9.1f} us  current {after_us:9.1f} us  "
+            f"x{before_us / after_us:5.1f}  ({same})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -30,11 +30,13 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'api',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.invalidation.CacheInvalidationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -121,3 +123,53 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Admin credentials (from environment)
 ADMIN_USER = os.getenv('ADMIN_USER', '')
 ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', '')
+
+# Product search backend: 'fts' (weighted tsvector + GIN) or 'ilike' (plain icontains)
+PRODUCT_SEARCH_BACKEND = os.getenv('PRODUCT_SEARCH_BACKEND', 'fts')
+
+# Product listings expected to match more rows than this report an EXPLAIN
+# estimate instead of COUNT(*) (0 = always exact)
+CATALOG_COUNT_ESTIMATE_THRESHOLD = int(os.getenv('CATALOG_COUNT_ESTIMATE_THRESHOLD', '10000'))
+# Lifetime of cached product totals, facet counts and search suggestions;
+# bounds staleness across workers when CACHE_INVALIDATION is off
+CATALOG_CACHE_TTL = int(os.getenv('CATALOG_CACHE_TTL', '300'))
+
+# Serve non-search product listings from an in-process columnar snapshot
+# (requires NumPy); reloaded from Postgres after CATALOG_SNAPSHOT_TTL seconds
+CATALOG_SNAPSHOT = os.getenv('CATALOG_SNAPSHOT', 'False') == 'True'
+CATALOG_SNAPSHOT_TTL = int(os.getenv('CATALOG_SNAPSHOT_TTL', '300'))
+
+# Service result cache for product/news listings: 'local' (per-process LRU),
+# 'django' (CACHES[RESULT_CACHE_ALIAS], shared by workers; must be a shared
+# cache such as Redis/Memcached, a LocMem alias falls back to 'local') or 'off'.
+# Entries are invalidated by repository writes, not by TTL.
+RESULT_CACHE_BACKEND = os.getenv('RESULT_CACHE_BACKEND', 'local')
+RESULT_CACHE_ALIAS = os.getenv('RESULT_CACHE_ALIAS', 'default')
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '2048'))
+
+# Rendered news/product/page detail pages (per process, purged on admin edit);
+# TTL bounds staleness across workers, 0 disables
+PAGE_CACHE_TTL = int(os.getenv('PAGE_CACHE_TTL', '300'))
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv('PAGE_CACHE_MAX_ENTRIES', '1000'))
+# Re-render pages affected by admin saves on a background thread after commit
+PAGE_REGENERATION = os.getenv('PAGE_REGENERATION', 'True') == 'True'
+
+# URLs per child sitemap (sitemap.xml is an index of sitemap-<section>-<n>.xml)
+SITEMAP_CHUNK_SIZE = int(os.getenv('SITEMAP_CHUNK_SIZE', '50000'))
+# Entries in the /news/feed.xml Atom feed
+NEWS_FEED_SIZE = int(os.getenv('NEWS_FEED_SIZE', '20'))
+# Related news kept per article (TF-IDF, requires NumPy) and the lifetime of
+# the in-process vector matrix used to update them on admin saves
+RELATED_NEWS_K = int(os.getenv('RELATED_NEWS_K', '10'))
+RELATED_NEWS_TTL = int(os.getenv('RELATED_NEWS_TTL', '300'))
+
+# How other workers learn about admin writes: 'poll' (read new cache_events at
+# most every CACHE_INVALIDATION_POLL_INTERVAL seconds; serverless-safe),
+# 'listen' (Postgres LISTEN/NOTIFY on a background thread, for long-running
+# workers) or 'off'
+CACHE_INVALIDATION = os.getenv('CACHE_INVALIDATION', 'poll')
+CACHE_INVALIDATION_POLL_INTERVAL = float(os.getenv('CACHE_INVALIDATION_POLL_INTERVAL', '5'))
+
+# Stream the SSR home page (head and hero first, then each grid as its query
+# completes); needs a server/proxy that does not buffer responses
+SSR_STREAMING = os.getenv('SSR_STREAMING', 'False') == 'True'
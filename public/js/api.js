@@ -154,6 +154,19 @@ const ApiClient = {
     }
   },
 
+  bootstrap: {
+    _pending: null,
+    /**
+     * Site config, footer pages and the first products/news pages in one
+     * request; shared by every caller on the page (revalidated with its ETag)
+     * @returns {Promise<Object>} Response data
+     */
+    load() {
+      if (!this._pending) this._pending = ApiClient.get('/api/bootstrap');
+      return this._pending;
+    }
+  },
+
   newsletter: {
     async subscribe(email) {
       return ApiClient.post('/api/newsletter/subscribe', { email });
@@ -198,9 +198,16 @@ function initNavbarScroll() {
 
 initNavbarScroll();
 
+// Part of the shared /api/bootstrap response, or null to use the dedicated endpoint
+async function bootstrapPart(name) {
+  if (!ApiClient.bootstrap) return null;
+  const response = await ApiClient.bootstrap.load();
+  return response.ok && response.data && response.data[name] ? { ok: true, data: response.data[name] } : null;
+}
+
 async function loadSiteConfig() {
   try {
-    const response = await ApiClient.site.getConfig();
+    const response = (await bootstrapPart('site')) || await ApiClient.site.getConfig();
     if (!response.ok || !response.data) {
       console.warn('Site config load failed:', response.error);
       return;
@@ -322,6 +329,7 @@ async function loadSiteConfig() {
       filterCat.innerHTML = '<option value="">Danh mục: Tất cả</option>' +
         categories.map(c => `<option value="${escapeHtml(c)}">${escapeHtml(c)}</option>`).join('');
       filterCat.value = urlCategory && categories.includes(urlCategory) ? urlCategory : '';
+      if (typeof renderFacetCounts === 'function') renderFacetCounts();
     }
 
     // Header category dropdown
@@ -387,7 +395,7 @@ async function loadSiteConfig() {
 
 async function loadFooterPages() {
   try {
-    const response = await ApiClient.pages.list();
+    const response = (await bootstrapPart('pages')) || await ApiClient.pages.list();
     if (!response.ok) {
       console.warn('Footer pages load failed:', response.error);
       return;
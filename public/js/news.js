@@ -29,8 +29,15 @@ async function loadNews(page) {
   setNewsPaginationLoading(true);
   
   try {
-    const res = await fetch('/api/news?page=' + page + '&limit=' + NEWS_PER_PAGE);
-    const data = res.ok ? await res.json() : {};
+    // The first page is part of the page-load bootstrap response
+    const boot = page === 1 && typeof bootstrapPart === 'function' ? await bootstrapPart('news') : null;
+    let data;
+    if (boot) {
+      data = boot.data;
+    } else {
+      const res = await fetch('/api/news?page=' + page + '&limit=' + NEWS_PER_PAGE);
+      data = res.ok ? await res.json() : {};
+    }
     newsData = Array.isArray(data.items) ? data.items : [];
     newsTotal = typeof data.total === 'number' ? data.total : newsData.length;
     newsPage = typeof data.page === 'number' ? data.page : 1;
@@ -72,11 +79,15 @@ function renderNewsPagination() {
   const nextDisabled = newsPage >= newsTotalPages || newsLoading ? ' opacity-50 pointer-events-none' : '';
   
   let html = '<a href="#" data-page="prev" class="inline-flex items-center justify-center w-9 h-9 border border-warm-300 rounded-lg hover:bg-warm-200 text-warm-700 transition' + prevDisabled + '"><i class="fas fa-chevron-left"></i></a>';
-  for (let p = 1; p <= newsTotalPages; p++) {
+  Utils.pageWindow(newsPage, newsTotalPages).forEach(function (p) {
+    if (p === null) {
+      html += '<span class="inline-flex items-center justify-center w-9 h-9 text-warm-700">&hellip;</span>';
+      return;
+    }
     const active = p === newsPage ? ' bg-brand-green text-white border-brand-green' : ' border-warm-300 hover:bg-warm-200 text-warm-700';
     const disabled = newsLoading && p !== newsPage ? ' opacity-50 pointer-events-none' : '';
     html += '<a href="#" data-page="' + p + '" class="inline-flex items-center justify-center w-9 h-9 border rounded-lg transition' + active + disabled + '">' + p + '</a>';
-  }
+  });
   html += '<a href="#" data-page="next" class="inline-flex items-center justify-center w-9 h-9 border border-warm-300 rounded-lg hover:bg-warm-200 text-warm-700 transition' + nextDisabled + '"><i class="fas fa-chevron-right"></i></a>';
   el.innerHTML = html;
   el.querySelectorAll('a[data-page]').forEach(function (a) {
@@ -6,6 +6,7 @@ const PRODUCTS_PER_PAGE = 8;
 let products = [];
 let productsPage = 1, productsTotal = 0, productsTotalPages = 0;
 let productsLoading = false;
+let productFacets = null;
 
 function getFilterState() {
   const searchEl = document.getElementById('filter-search');
@@ -20,7 +21,7 @@ function getFilterState() {
 
 function buildProductsUrl(page) {
   const f = getFilterState();
-  const params = new URLSearchParams({ page: String(page), limit: String(PRODUCTS_PER_PAGE), sort: f.sort });
+  const params = new URLSearchParams({ page: String(page), limit: String(PRODUCTS_PER_PAGE), sort: f.sort, view: 'card' });
   if (f.search) params.set('search', f.search);
   if (f.category) params.set('category', f.category);
   if (f.price) params.set('price', f.price);
@@ -28,6 +29,49 @@ function buildProductsUrl(page) {
   return '/api/products?' + params.toString();
 }
 
+function buildFacetsUrl() {
+  const f = getFilterState();
+  const params = new URLSearchParams();
+  if (f.search) params.set('search', f.search);
+  if (f.category) params.set('category', f.category);
+  if (f.price) params.set('price', f.price);
+  if (f.standard) params.set('standard', f.standard);
+  return '/api/products/facets?' + params.toString();
+}
+
+async function loadFacets() {
+  if (!document.getElementById('filter-form')) return;
+  try {
+    const res = await fetch(buildFacetsUrl());
+    if (!res.ok) return;
+    productFacets = await res.json();
+  } catch (e) {
+    console.warn('Facets API failed', e);
+    return;
+  }
+  renderFacetCounts();
+}
+
+function applyFacetCounts(selectId, facets) {
+  const sel = document.getElementById(selectId);
+  if (!sel || !Array.isArray(facets)) return;
+  const counts = {};
+  facets.forEach(function (f) { counts[f.value] = f.count; });
+  Array.from(sel.options).forEach(function (opt) {
+    if (!opt.value) return;
+    if (!opt.dataset.label) opt.dataset.label = opt.textContent;
+    opt.textContent = opt.dataset.label + ' (' + (counts[opt.value] || 0) + ')';
+  });
+}
+
+// Called again by main.js after it rebuilds the category options
+function renderFacetCounts() {
+  if (!productFacets) return;
+  applyFacetCounts('filter-category', productFacets.categories);
+  applyFacetCounts('filter-price', productFacets.price);
+  applyFacetCounts('filter-standard', productFacets.standards);
+}
+
 function showProductsLoading() {
   const container = document.getElementById('product-list');
   if (!container) return;
@@ -70,6 +114,7 @@ async function loadProducts(page) {
   renderProducts();
   renderProductPagination();
   renderActiveFilters();
+  loadFacets();
 }
 
 function setPaginationLoading(loading) {
@@ -94,11 +139,15 @@ function renderProductPagination() {
   const nextDisabled = productsPage >= productsTotalPages || productsLoading ? ' opacity-50 pointer-events-none' : '';
   
   let html = '<a href="#" data-page="prev" class="inline-flex items-center justify-center w-9 h-9 border border-warm-300 rounded-lg hover:bg-warm-200 text-warm-700 transition' + prevDisabled + '"><i class="fas fa-chevron-left"></i></a>';
-  for (let p = 1; p <= productsTotalPages; p++) {
+  Utils.pageWindow(productsPage, productsTotalPages).forEach(function (p) {
+    if (p === null) {
+      html += '<span class="inline-flex items-center justify-center w-9 h-9 text-warm-700">&hellip;</span>';
+      return;
+    }
     const active = p === productsPage ? ' bg-brand-green text-white border-brand-green' : ' border-warm-300 hover:bg-warm-200 text-warm-700';
     const disabled = productsLoading && p !== productsPage ? ' opacity-50 pointer-events-none' : '';
     html += '<a href="#" data-page="' + p + '" class="inline-flex items-center justify-center w-9 h-9 border rounded-lg transition' + active + disabled + '">' + p + '</a>';
-  }
+  });
   html += '<a href="#" data-page="next" class="inline-flex items-center justify-center w-9 h-9 border border-warm-300 rounded-lg hover:bg-warm-200 text-warm-700 transition' + nextDisabled + '"><i class="fas fa-chevron-right"></i></a>';
   el.innerHTML = html;
   el.querySelectorAll('a[data-page]').forEach(function (a) {
@@ -205,9 +254,18 @@ function renderProducts() {
 `).join('');
 }
 
-function openProductModal(id) {
+async function openProductModal(id) {
   const product = products.find(p => p.id === id);
   if (!product) return;
+  // Listing rows are card projections; fetch the full product on first open
+  if (product.description === undefined) {
+    try {
+      const res = await fetch('/api/products/' + id);
+      if (res.ok) Object.assign(product, await res.json());
+    } catch (e) {
+      console.warn('Product detail API failed', e);
+    }
+  }
 
   const modal = document.getElementById('product-modal');
   const content = document.getElementById('modal-content');
@@ -235,7 +293,7 @@ function openProductModal(id) {
                 ${product.unit ? `<span class="text-base font-normal text-warm-600 ml-1">${product.unit}</span>` : ''}
             </div>
 
-            <p class="text-warm-700 mb-6 leading-relaxed">${product.description}</p>
+            <p class="text-warm-700 mb-6 leading-relaxed">${product.description || ''}</p>
 
             <div class="flex gap-3">
                  <div class="inline-flex items-center border border-warm-300 rounded-lg">
@@ -306,3 +364,44 @@ function closeModal() {
   modal.classList.add('hidden');
   document.body.style.overflow = '';
 }
+
+let suggestTicket = 0;
+
+async function loadSuggestions(query) {
+  const list = document.getElementById('filter-search-suggestions');
+  if (!list) return;
+  const q = (query || '').trim();
+  const ticket = ++suggestTicket;
+  if (!q) { list.innerHTML = ''; return; }
+  let data;
+  try {
+    const res = await fetch('/api/products/suggest?' + new URLSearchParams({ q: q }).toString());
+    if (!res.ok) return;
+    data = await res.json();
+  } catch (e) {
+    console.warn('Suggest API failed', e);
+    return;
+  }
+  // A newer keystroke already asked for suggestions
+  if (ticket !== suggestTicket) return;
+  const names = (data.products || []).map(p => p.name).concat(data.categories || []);
+  list.innerHTML = names.map(n => `<option value="${Utils.escapeHtml(n)}"></option>`).join('');
+}
+
+function initSearchSuggestions() {
+  const searchEl = document.getElementById('filter-search');
+  if (!searchEl || !document.getElementById('filter-search-suggestions')) return;
+  const debounced = Utils.debounce(loadSuggestions, 120);
+  searchEl.addEventListener('input', function () { debounced(searchEl.value); });
+}
+
+function initProductFilters() {
+  loadFacets();
+  initSearchSuggestions();
+}
+
+if (document.readyState === 'loading') {
+  document.addEventListener('DOMContentLoaded', initProductFilters);
+} else {
+  initProductFilters();
+}
@@ -85,6 +85,32 @@ const Utils = {
     };
   },
 
+  /**
+   * Page numbers for a pagination bar: first, last and `radius` pages around
+   * the current one (same window as the server-rendered bar)
+   * @param {number} page - Current page
+   * @param {number} total - Total pages
+   * @param {number} radius - Pages on each side of the current one (default: 2)
+   * @returns {Array<number|null>} Page numbers, null where pages are skipped
+   */
+  pageWindow(page, total, radius = 2) {
+    const lo = Math.max(1, page - radius);
+    const hi = Math.min(total, page + radius);
+    const pages = [];
+    if (lo > 1) {
+      pages.push(1);
+      if (lo > 3) pages.push(null);
+      else if (lo === 3) pages.push(2);
+    }
+    for (let p = lo; p <= hi; p++) pages.push(p);
+    if (hi < total) {
+      if (hi < total - 2) pages.push(null);
+      else if (hi === total - 2) pages.push(total - 1);
+      pages.push(total);
+    }
+    return pages;
+  },
+
   /**
    * Parse URL parameters
    * @param {string} url - URL string (default: window.location.search)
@@ -11,7 +11,7 @@ CREATE TABLE IF NOT EXISTS products (
     unit VARCHAR(50),
     image TEXT,
     rating DECIMAL(2,1) DEFAULT 0,
-    reviews INTEGER DEFAULT 0,
+    reviews INTEGER NOT NULL DEFAULT 0,
     is_hot BOOLEAN DEFAULT FALSE,
     discount VARCHAR(20),
     tags JSONB DEFAULT '[]',